@@ -0,0 +1,99 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+"""
+Measures how many requests per second the protocol handlers can encode, for
+write-heavy workloads: QUERY, EXECUTE and BATCH messages carrying inserts,
+and EXECUTE messages inserting a large blob.
+
+No cluster is needed. Run with the Cython extensions built to compare the
+Python encoder with the Cython one::
+
+    python benchmarks/encode_messages.py --num-messages 100000
+"""
+
+from optparse import OptionParser
+import os.path
+import sys
+import time
+import uuid
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from dse import ConsistencyLevel, ProtocolVersion
+from dse.cqltypes import BytesType, Int32Type, UTF8Type, UUIDType, DoubleType
+from dse.protocol import QueryMessage, ExecuteMessage, BatchMessage, ProtocolHandler, _ProtocolHandler
+from dse.query import BatchType
+
+QUERY_ID = uuid.uuid4().bytes
+INSERT = u"INSERT INTO testkeyspace.testtable (k, a, b, c) VALUES (?, ?, ?, ?)"
+
+
+def make_params(i, protocol_version):
+    return [Int32Type.serialize(i, protocol_version),
+            UTF8Type.serialize(u'value %d' % i, protocol_version),
+            UUIDType.serialize(uuid.UUID(int=i), protocol_version),
+            DoubleType.serialize(i / 3.0, protocol_version)]
+
+
+def make_messages(kind, batch_size, blob_size, protocol_version):
+    params = make_params(42, protocol_version)
+    if kind == 'query':
+        return QueryMessage(u"INSERT INTO testkeyspace.testtable (k, a) VALUES (42, 'value 42')",
+                            ConsistencyLevel.LOCAL_ONE, timestamp=1500000000000000)
+    elif kind == 'execute':
+        return ExecuteMessage(QUERY_ID, params, ConsistencyLevel.LOCAL_ONE, timestamp=1500000000000000)
+    elif kind == 'blob':
+        params = [Int32Type.serialize(42, protocol_version), BytesType.serialize(os.urandom(blob_size), protocol_version)]
+        return ExecuteMessage(QUERY_ID, params, ConsistencyLevel.LOCAL_ONE, timestamp=1500000000000000)
+    else:
+        queries = [(True, QUERY_ID, make_params(i, protocol_version)) for i in range(batch_size)]
+        return BatchMessage(BatchType.UNLOGGED, queries, ConsistencyLevel.LOCAL_ONE, timestamp=1500000000000000)
+
+
+def run(handler, msg, num_messages, protocol_version):
+    encode = handler.encode_message
+    start = time.time()
+    for i in range(num_messages):
+        encode(msg, i & 0x7fff, protocol_version, None, False)
+    return num_messages / (time.time() - start)
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-n', '--num-messages', type='int', default=100000,
+                      help='number of messages to encode per run [default: %default]')
+    parser.add_option('--batch-size', type='int', default=20,
+                      help='statements per BATCH message [default: %default]')
+    parser.add_option('--blob-size', type='int', default=65536,
+                      help='size of the blob inserted by blob messages [default: %default]')
+    parser.add_option('--protocol-version', type='int', default=ProtocolVersion.V4,
+                      help='native protocol version [default: %default]')
+    options, args = parser.parse_args()
+
+    handlers = [('python', _ProtocolHandler)]
+    if ProtocolHandler is not _ProtocolHandler:
+        handlers.append(('cython', ProtocolHandler))
+    else:
+        print("Cython extensions are not built; only measuring the Python encoder")
+
+    for kind in ('query', 'execute', 'batch', 'blob'):
+        msg = make_messages(kind, options.batch_size, options.blob_size, options.protocol_version)
+        results = []
+        for name, handler in handlers:
+            rate = run(handler, msg, options.num_messages, options.protocol_version)
+            results.append(rate)
+            print("%-8s %-7s %12.0f requests/sec" % (kind, name, rate))
+        if len(results) > 1:
+            print("%-8s speedup %12.2fx" % (kind, results[1] / results[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,9 @@
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 
 cdef class BytesIOReader:
-    cdef bytes buf
+    cdef object buf
+    cdef Py_buffer view
+    cdef bint has_view
     cdef char *buf_ptr
     cdef Py_ssize_t pos
     cdef Py_ssize_t size
@@ -7,16 +7,31 @@
 #
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
+
+
 cdef class BytesIOReader:
     """
     This class provides efficient support for reading bytes from a 'bytes' buffer,
-    by returning char * values directly without allocating intermediate objects.
+    or any other object supporting the buffer protocol (e.g. a memoryview over a
+    connection's read buffer), by returning char * values directly without
+    allocating intermediate objects.
     """
 
-    def __init__(self, bytes buf):
+    def __init__(self, buf):
+        if self.has_view:
+            PyBuffer_Release(&self.view)
+            self.has_view = False
+        PyObject_GetBuffer(buf, &self.view, PyBUF_SIMPLE)
+        self.has_view = True
         self.buf = buf
-        self.size = len(buf)
-        self.buf_ptr = self.buf
+        self.size = self.view.len
+        self.buf_ptr = <char *> self.view.buf
+        self.pos = 0
+
+    def __dealloc__(self):
+        if self.has_view:
+            PyBuffer_Release(&self.view)
 
     cdef char *read(self, Py_ssize_t n = -1) except NULL:
         """Read at most size bytes from the file
@@ -26,7 +26,7 @@ from six.moves import filter, range, queue as Queue
 import socket
 import sys
 import time
-from threading import Lock, RLock, Thread, Event
+from threading import Lock, RLock, Thread, Event, current_thread
 
 import weakref
 from weakref import WeakValueDictionary
@@ -35,11 +35,16 @@ try:
 except ImportError:
     from dse.util import WeakSet  # NOQA
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None  # NOQA
+
 from dse import (ConsistencyLevel, AuthenticationFailed,
                  OperationTimedOut, SchemaTargetType,
                  DriverException, ProtocolVersion)
 from dse.connection import (ConnectionException, ConnectionShutdown,
-                            ConnectionHeartbeat, ProtocolVersionUnsupported)
+                            ConnectionHeartbeat, ProtocolVersionUnsupported, HashedWheelTimer)
 from dse import ProtocolVersion
 from dse.cqltypes import UserType
 from dse.encoder import Encoder
@@ -69,6 +74,7 @@ from dse.query import (SimpleStatement, PreparedStatement, BoundStatement,
                        BatchStatement, bind_params, QueryTrace, HostTargetingStatement,
                        named_tuple_factory, dict_factory, tuple_factory, FETCH_SIZE_UNSET)
 from dse.timestamps import MonotonicTimestampGenerator
+from dse.util import OrderedDict
 
 
 if six.PY3:
@@ -90,7 +96,8 @@ def _is_gevent_monkey_patched():
 
 # default to gevent when we are monkey patched with gevent, eventlet when
 # monkey patched with eventlet, otherwise if libev is available, use that as
-# the default because it's fastest. Otherwise, use asyncore.
+# the default because it's fastest. Otherwise, use selectors, falling back
+# to asyncore where that is not available.
 if _is_gevent_monkey_patched():
     from dse.io.geventreactor import GeventConnection as DefaultConnection
 elif _is_eventlet_monkey_patched():
@@ -99,7 +106,10 @@ else:
     try:
         from dse.io.libevreactor import LibevConnection as DefaultConnection  # NOQA
     except ImportError:
-        from dse.io.asyncorereactor import AsyncoreConnection as DefaultConnection  # NOQA
+        try:
+            from dse.io.selectorreactor import SelectorConnection as DefaultConnection  # NOQA
+        except ImportError:
+            from dse.io.asyncorereactor import AsyncoreConnection as DefaultConnection  # NOQA
 
 # Forces load of utf8 encoding module to avoid deadlock that occurs
 # if code that is being imported tries to import the module in a seperate
@@ -110,6 +120,16 @@ else:
 log = logging.getLogger(__name__)
 
 _NOT_SET = object()
+_QUEUED = object()
+
+DEFAULT_MIN_REQUESTS = 64
+DEFAULT_MAX_REQUESTS = 1024
+
+DEFAULT_MIN_CONNECTIONS_PER_LOCAL_HOST = 1
+DEFAULT_MAX_CONNECTIONS_PER_LOCAL_HOST = 8
+
+DEFAULT_MIN_CONNECTIONS_PER_REMOTE_HOST = 1
+DEFAULT_MAX_CONNECTIONS_PER_REMOTE_HOST = 2
 
 
 class NoHostAvailable(Exception):
@@ -633,13 +653,17 @@ class Cluster(object):
     I/O with Cassandra.  These are the current options:
 
     * :class:`dse.io.asyncorereactor.AsyncoreConnection`
+    * :class:`dse.io.selectorreactor.SelectorConnection`
     * :class:`dse.io.libevreactor.LibevConnection`
     * :class:`dse.io.eventletreactor.EventletConnection` (requires monkey-patching - see doc for details)
     * :class:`dse.io.geventreactor.GeventConnection` (requires monkey-patching - see doc for details)
     * :class:`dse.io.twistedreactor.TwistedConnection`
+    * :class:`dse.io.asyncioreactor.AsyncioConnection`
 
-    By default, ``AsyncoreConnection`` will be used, which uses
-    the ``asyncore`` module in the Python standard library.
+    By default, ``SelectorConnection`` will be used, which uses the
+    ``selectors`` module in the Python standard library (``epoll`` on Linux).
+    Where ``selectors`` is not available (Python 2), ``AsyncoreConnection``
+    is used instead.
 
     If ``libev`` is installed, ``LibevConnection`` will be used instead.
 
@@ -725,6 +749,23 @@ class Cluster(object):
     an extra roundtrip for one or more client requests.
     """
 
+    reprepare_concurrency = 100
+    """
+    The maximum number of PREPARE requests in flight at once when repreparing statements on a node that
+    comes up (see :attr:`.reprepare_on_up`). Another statement is sent as soon as one of them is answered.
+
+    The time taken to reprepare all statements on a node is logged, and reported by the ``reprepare_timer``
+    metric.
+    """
+
+    reprepare_timeout = 5.0
+    """
+    Timeout, in seconds, to wait for each response when repreparing statements on a node that comes up.
+
+    This also bounds how long requests that got an unprepared error wait for the statement to be re-prepared, as
+    requests for the same statement and host share one PREPARE. Once it expires, they move on to the next host.
+    """
+
     connect_timeout = 5
     """
     Timeout, in seconds, for creating new connections.
@@ -733,6 +774,44 @@ class Cluster(object):
     establishment, options passing, and authentication.
     """
 
+    max_pending_requests_per_host = 0
+    """
+    The maximum number of requests that may wait, per host, for a connection
+    to free up a request ID.
+
+    When every connection to a host is carrying as many requests as it can,
+    a request is added to the host's FIFO queue (up to this many requests)
+    without blocking the calling thread, and is sent as soon as an in-flight
+    request completes. Once the queue is full, the next host in the query
+    plan is tried.
+
+    By default (0), there is no queue, and borrowing a connection blocks for
+    up to :attr:`~.Cluster.pending_request_timeout` seconds instead.
+
+    The current queue depth is reported by the ``pending_requests`` metric.
+    """
+
+    pending_request_timeout = 2.0
+    """
+    The maximum time, in seconds, a request waits for a connection to a host
+    to free up a request ID before moving to the next host in the query plan.
+    """
+
+    use_timing_wheel = False
+    """
+    If :const:`True`, request timeouts and speculative execution timers are
+    scheduled on a :class:`~.HashedWheelTimer`, driven by a single
+    :attr:`~.Cluster.connection_class` timer, rather than each being added to
+    the reactor's timer heap.
+
+    Request timers are almost always canceled before they expire, and the
+    reactor keeps canceled timers until their deadline; at high request
+    rates, the timing wheel keeps that overhead constant, at the cost of
+    timers firing up to one tick (50 ms) late.
+
+    This must be set before :meth:`~.Cluster.connect` is called.
+    """
+
     timestamp_generator = None
     """
     An object, shared between all sessions created by this cluster instance,
@@ -788,6 +867,27 @@ class Cluster(object):
     _idle_heartbeat = None
     _protocol_version_explicit = False
     _discount_down_events = True
+    _timing_wheel = None
+
+    _core_connections_per_host = {
+        HostDistance.LOCAL: DEFAULT_MIN_CONNECTIONS_PER_LOCAL_HOST,
+        HostDistance.REMOTE: DEFAULT_MIN_CONNECTIONS_PER_REMOTE_HOST
+    }
+
+    _max_connections_per_host = {
+        HostDistance.LOCAL: DEFAULT_MAX_CONNECTIONS_PER_LOCAL_HOST,
+        HostDistance.REMOTE: DEFAULT_MAX_CONNECTIONS_PER_REMOTE_HOST
+    }
+
+    _min_requests_per_connection = {
+        HostDistance.LOCAL: DEFAULT_MIN_REQUESTS,
+        HostDistance.REMOTE: DEFAULT_MIN_REQUESTS
+    }
+
+    _max_requests_per_connection = {
+        HostDistance.LOCAL: DEFAULT_MAX_REQUESTS,
+        HostDistance.REMOTE: DEFAULT_MAX_REQUESTS
+    }
 
     _user_types = None
     """
@@ -817,12 +917,17 @@ class Cluster(object):
                  schema_event_refresh_window=2,
                  topology_event_refresh_window=10,
                  connect_timeout=5,
+                 max_pending_requests_per_host=0,
+                 pending_request_timeout=2.0,
+                 use_timing_wheel=False,
                  schema_metadata_enabled=True,
                  token_metadata_enabled=True,
                  address_translator=None,
                  status_event_refresh_window=2,
                  prepare_on_all_hosts=True,
                  reprepare_on_up=True,
+                 reprepare_concurrency=100,
+                 reprepare_timeout=5.0,
                  execution_profiles=None,
                  allow_beta_protocol_version=False,
                  timestamp_generator=None):
@@ -901,8 +1006,18 @@ class Cluster(object):
         self.topology_event_refresh_window = topology_event_refresh_window
         self.status_event_refresh_window = status_event_refresh_window
         self.connect_timeout = connect_timeout
+        self.max_pending_requests_per_host = max_pending_requests_per_host
+        self.pending_request_timeout = pending_request_timeout
+        self.use_timing_wheel = use_timing_wheel
         self.prepare_on_all_hosts = prepare_on_all_hosts
         self.reprepare_on_up = reprepare_on_up
+        self.reprepare_concurrency = reprepare_concurrency
+        self.reprepare_timeout = reprepare_timeout
+
+        self._core_connections_per_host = self._core_connections_per_host.copy()
+        self._max_connections_per_host = self._max_connections_per_host.copy()
+        self._min_requests_per_connection = self._min_requests_per_connection.copy()
+        self._max_requests_per_connection = self._max_requests_per_connection.copy()
 
         self._listeners = set()
         self._listener_lock = Lock()
@@ -1016,6 +1131,83 @@ class Cluster(object):
         if not_done:
             raise OperationTimedOut("Failed to create all new connection pools in the %ss timeout.")
 
+    def get_min_requests_per_connection(self, host_distance):
+        return self._min_requests_per_connection[host_distance]
+
+    def set_min_requests_per_connection(self, host_distance, min_requests):
+        """
+        Sets a threshold for concurrent requests per connection, below which
+        connections will be considered for disposal (down to core connections;
+        see :meth:`~Cluster.set_core_connections_per_host`).
+        """
+        if min_requests < 0 or min_requests >= self._max_requests_per_connection[host_distance]:
+            raise ValueError("min_requests must be non-negative and less than the max_requests for this host_distance (%d)" %
+                             (self._max_requests_per_connection[host_distance],))
+        self._min_requests_per_connection[host_distance] = min_requests
+
+    def get_max_requests_per_connection(self, host_distance):
+        return self._max_requests_per_connection[host_distance]
+
+    def set_max_requests_per_connection(self, host_distance, max_requests):
+        """
+        Sets a threshold for concurrent requests per connection, above which new
+        connections will be created to a host (up to max connections;
+        see :meth:`~Cluster.set_max_connections_per_host`).
+        """
+        if max_requests < 1 or max_requests > 32768 or \
+                max_requests <= self._min_requests_per_connection[host_distance]:
+            raise ValueError("max_requests must be 1-32768 and greater than the min_requests for this host_distance (%d)" %
+                             (self._min_requests_per_connection[host_distance],))
+        self._max_requests_per_connection[host_distance] = max_requests
+
+    def get_core_connections_per_host(self, host_distance):
+        """
+        Gets the minimum number of connections per Session that will be opened
+        for each host with :class:`~.HostDistance` equal to `host_distance`.
+        The default is 1 for :attr:`~HostDistance.LOCAL` and
+        :attr:`~HostDistance.REMOTE`.
+        """
+        return self._core_connections_per_host[host_distance]
+
+    def set_core_connections_per_host(self, host_distance, core_connections):
+        """
+        Sets the minimum number of connections per Session that will be opened
+        for each host with :class:`~.HostDistance` equal to `host_distance`.
+        The default is 1 for :attr:`~HostDistance.LOCAL` and
+        :attr:`~HostDistance.REMOTE`.
+
+        Increasing this value opens the additional connections on existing
+        pools right away.
+        """
+        if core_connections < 1 or core_connections > self._max_connections_per_host[host_distance]:
+            raise ValueError("core_connections must be at least 1 and no more than the max_connections for this host_distance (%d)" %
+                             (self._max_connections_per_host[host_distance],))
+        old = self._core_connections_per_host[host_distance]
+        self._core_connections_per_host[host_distance] = core_connections
+        if old < core_connections:
+            self._ensure_core_connections()
+
+    def get_max_connections_per_host(self, host_distance):
+        """
+        Gets the maximum number of connections per Session that will be opened
+        for each host with :class:`~.HostDistance` equal to `host_distance`.
+        The default is 8 for :attr:`~HostDistance.LOCAL` and 2 for
+        :attr:`~HostDistance.REMOTE`.
+        """
+        return self._max_connections_per_host[host_distance]
+
+    def set_max_connections_per_host(self, host_distance, max_connections):
+        """
+        Sets the maximum number of connections per Session that will be opened
+        for each host with :class:`~.HostDistance` equal to `host_distance`.
+        The default is 8 for :attr:`~HostDistance.LOCAL` and 2 for
+        :attr:`~HostDistance.REMOTE`.
+        """
+        if max_connections < self._core_connections_per_host[host_distance]:
+            raise ValueError("max_connections must be at least the core_connections for this host_distance (%d)" %
+                             (self._core_connections_per_host[host_distance],))
+        self._max_connections_per_host[host_distance] = max_connections
+
     def connection_factory(self, address, *args, **kwargs):
         """
         Called to create a new connection with proper configuration.
@@ -1024,6 +1216,15 @@ class Cluster(object):
         kwargs = self._make_connection_kwargs(address, kwargs)
         return self.connection_class.factory(address, self.connect_timeout, *args, **kwargs)
 
+    def _create_request_timer(self, timeout, callback):
+        """
+        Schedules a per-request timer, honoring :attr:`use_timing_wheel`.
+        Intended for internal use only.
+        """
+        if self._timing_wheel:
+            return self._timing_wheel.create_timer(timeout, callback)
+        return self.connection_class.create_timer(timeout, callback)
+
     def _make_connection_factory(self, host, *args, **kwargs):
         kwargs = self._make_connection_kwargs(host.address, kwargs)
         return partial(self.connection_class.factory, host.address, self.connect_timeout, *args, **kwargs)
@@ -1070,6 +1271,8 @@ class Cluster(object):
                 log.debug("Connecting to cluster, contact points: %s; protocol version: %s",
                           self.contact_points, self.protocol_version)
                 self.connection_class.initialize_reactor()
+                if self.use_timing_wheel:
+                    self._timing_wheel = HashedWheelTimer(self.connection_class.create_timer)
                 _register_cluster_shutdown(self)
                 for address in self.contact_points_resolved:
                     host, new = self.add_host(address, signal=False)
@@ -1624,30 +1827,31 @@ class Cluster(object):
             return
 
         log.debug("Preparing all known prepared statements against host %s", host)
+        start_time = time.time()
         connection = None
         try:
             connection = self.connection_factory(host.address)
-            statements = self._prepared_statements.values()
+            with self._prepared_statement_lock:
+                statements = list(self._prepared_statements.values())
+
+            # statements without a keyspace first, so that each keyspace is only set once
+            statements.sort(key=lambda s: (s.keyspace is not None, s.keyspace))
             for keyspace, ks_statements in groupby(statements, lambda s: s.keyspace):
                 if keyspace is not None:
                     connection.set_keyspace_blocking(keyspace)
 
-                # prepare 10 statements at a time
-                ks_statements = list(ks_statements)
-                chunks = []
-                for i in range(0, len(ks_statements), 10):
-                    chunks.append(ks_statements[i:i + 10])
-
-                for ks_chunk in chunks:
-                    messages = [PrepareMessage(query=s.query_string) for s in ks_chunk]
-                    # TODO: make this timeout configurable somehow?
-                    responses = connection.wait_for_responses(*messages, timeout=5.0, fail_on_error=False)
-                    for success, response in responses:
-                        if not success:
-                            log.debug("Got unexpected response when preparing "
-                                      "statement on host %s: %r", host, response)
-
-            log.debug("Done preparing all known prepared statements against host %s", host)
+                messages = [PrepareMessage(query=s.query_string) for s in ks_statements]
+                responses = connection.wait_for_responses(*messages, timeout=self.reprepare_timeout,
+                                                          fail_on_error=False, max_in_flight=self.reprepare_concurrency)
+                for success, response in responses:
+                    if not success:
+                        log.debug("Got unexpected response when preparing "
+                                  "statement on host %s: %r", host, response)
+
+            elapsed = time.time() - start_time
+            log.info("Prepared %d statements against host %s in %.3f seconds", len(statements), host, elapsed)
+            if self.metrics is not None:
+                self.metrics.reprepare_timer.addValue(elapsed)
         except OperationTimedOut as timeout:
             log.warning("Timed out trying to prepare all statements on host %s: %s", host, timeout)
         except (ConnectionException, socket.error) as exc:
@@ -1780,6 +1984,8 @@ class Session(object):
     _profile_manager = None
     _metrics = None
     _request_init_callbacks = None
+    _reprepare_lock = None
+    _pending_reprepares = None
 
     def __init__(self, cluster, hosts, keyspace=None):
         self.cluster = cluster
@@ -1792,6 +1998,8 @@ class Session(object):
         self._metrics = cluster.metrics
         self._request_init_callbacks = []
         self._protocol_version = self.cluster.protocol_version
+        self._reprepare_lock = Lock()
+        self._pending_reprepares = {}
 
         self.encoder = Encoder()
 
@@ -1896,6 +2104,29 @@ class Session(object):
         future.send_request()
         return future
 
+    def execute_aio(self, query, parameters=None, trace=False, custom_payload=None, timeout=_NOT_SET,
+                    execution_profile=EXEC_PROFILE_DEFAULT, paging_state=None, execute_as=None):
+        """
+        Execute the given query and return an ``asyncio`` future resolving to
+        its :class:`.ResultSet`. This must be called from the thread running the
+        event loop, usually from within a coroutine.
+
+        See :meth:`Session.execute` for parameter definitions.
+
+        Example usage::
+
+            >>> async def print_users(session):
+            ...     results = await session.execute_aio("SELECT * FROM users")
+            ...     async for user_row in results:
+            ...         print(user_row)
+
+        When the cluster uses :class:`~dse.io.asyncioreactor.AsyncioConnection` on
+        the same loop, the future is completed directly by the loop; otherwise
+        the result is handed over with ``call_soon_threadsafe``.
+        """
+        future = self.execute_async(query, parameters, trace, custom_payload, timeout, execution_profile, paging_state, execute_as)
+        return _asyncio_result(future)
+
     def execute_graph(self, query, parameters=None, trace=False, execution_profile=EXEC_PROFILE_GRAPH_DEFAULT, execute_as=None):
         """
         Executes a Gremlin query string or SimpleGraphStatement synchronously,
@@ -1947,6 +2178,14 @@ class Session(object):
             future.send_request()
         return future
 
+    def execute_graph_aio(self, query, parameters=None, trace=False, execution_profile=EXEC_PROFILE_GRAPH_DEFAULT, execute_as=None):
+        """
+        Like :meth:`.execute_graph_async`, but returns an ``asyncio`` future
+        resolving to the :class:`.ResultSet`. See :meth:`.execute_aio`.
+        """
+        future = self.execute_graph_async(query, parameters, trace, execution_profile, execute_as)
+        return _asyncio_result(future)
+
     def _transform_params(self, parameters):
         if not isinstance(parameters, dict):
             raise ValueError('The parameters must be a dictionary. Unnamed parameters are not allowed.')
@@ -2179,6 +2418,45 @@ class Session(object):
             except Exception:
                 log.exception("Error preparing query for host %s:", host)
 
+    def _add_reprepare_callback(self, host, query_id, callback):
+        """
+        Adds ``callback`` to those called with the response to re-preparing
+        ``query_id`` on ``host``. If no such PREPARE is in flight yet, a new
+        :class:`._PendingReprepare` is returned, and the caller is expected
+        to send the PREPARE; otherwise :const:`None` is returned.
+        Intended for internal use only.
+        """
+        key = (host, query_id)
+        with self._reprepare_lock:
+            pending = self._pending_reprepares.get(key)
+            if pending is None:
+                pending = self._pending_reprepares[key] = _PendingReprepare(callback)
+                return pending
+            pending.callbacks.append(callback)
+            return None
+
+    def _on_reprepared(self, host, query_id, pending, response):
+        """
+        Calls the callbacks waiting on ``pending`` for ``query_id`` to be
+        re-prepared on ``host`` with the PREPARE response, or the exception
+        preventing it. Only the first call for ``pending`` has an effect, so
+        a response arriving after the wait timed out is ignored.
+        Intended for internal use only.
+        """
+        key = (host, query_id)
+        with self._reprepare_lock:
+            if self._pending_reprepares.get(key) is pending:
+                del self._pending_reprepares[key]
+            callbacks, pending.callbacks = pending.callbacks, []
+            timer, pending.timer = pending.timer, None
+        if timer:
+            timer.cancel()
+        for callback in callbacks:
+            try:
+                callback(response)
+            except Exception:
+                log.exception("Error handling response to re-preparing statement on host %s:", host)
+
     def shutdown(self):
         """
         Close all connections.  ``Session`` instances should not be used
@@ -2297,6 +2575,7 @@ class Session(object):
                     future = self.remove_pool(host)
                 else:
                     pool.host_distance = distance
+                    pool.ensure_core_connections()
             if future:
                 futures.add(future)
         return futures
@@ -3126,6 +3405,17 @@ def refresh_schema_and_set_result(control_conn, response_future, connection, **k
         response_future._set_final_result(None)
 
 
+class _PendingReprepare(object):
+    """
+    The requests waiting for a statement to be re-prepared on a host, and the
+    timer bounding that wait. See :meth:`.Session._add_reprepare_callback`.
+    """
+
+    def __init__(self, callback):
+        self.callbacks = [callback]
+        self.timer = None
+
+
 class ResponseFuture(object):
     """
     An asynchronous response delivery mechanism that is returned from calls
@@ -3226,10 +3516,10 @@ class ResponseFuture(object):
             spec_delay = self._spec_execution_plan.next_execution(self._current_host)
             if spec_delay >= 0:
                 if self._time_remaining is None or self._time_remaining > spec_delay:
-                    self._timer = self.session.cluster.connection_class.create_timer(spec_delay, self._on_speculative_execute)
+                    self._timer = self.session.cluster._create_request_timer(spec_delay, self._on_speculative_execute)
                     return
             if self._time_remaining is not None:
-                self._timer = self.session.cluster.connection_class.create_timer(self._time_remaining, self._on_timeout)
+                self._timer = self.session.cluster._create_request_timer(self._time_remaining, self._on_timeout)
 
     def _cancel_timer(self):
         if self._timer:
@@ -3273,7 +3563,8 @@ class ResponseFuture(object):
         for host in self.query_plan:
             req_id = self._query(host)
             if req_id is not None:
-                self._req_id = req_id
+                if req_id is not _QUEUED:
+                    self._req_id = req_id
                 return True
             if self.timeout is not None and time.time() - self._start_time > self.timeout:
                 self._on_timeout()
@@ -3297,10 +3588,95 @@ class ResponseFuture(object):
 
         self._current_host = host
 
-        connection = None
+        cluster = self.session.cluster
+        max_pending = cluster.max_pending_requests_per_host
+        if max_pending:
+            try:
+                connection, request_id = pool.borrow_connection(timeout=0)
+            except NoConnectionsAvailable:
+                # wait in the host's queue rather than blocking this thread
+                try:
+                    pool.enqueue_borrow(partial(self._send_queued, host, pool, message, cb),
+                                        max_pending, cluster.pending_request_timeout)
+                except NoConnectionsAvailable as exc:
+                    log.debug("The request queue for host %s is full, moving to the next host", host)
+                    self._errors[host] = exc
+                    if self._metrics is not None:
+                        self._metrics.on_queue_full()
+                    return None
+                except Exception as exc:
+                    log.debug("Error querying host %s", host, exc_info=True)
+                    self._errors[host] = exc
+                    return None
+                if self._metrics is not None:
+                    self._metrics.on_request_queued()
+                return _QUEUED
+            except Exception as exc:
+                log.debug("Error querying host %s", host, exc_info=True)
+                self._errors[host] = exc
+                if self._metrics is not None:
+                    self._metrics.on_connection_error()
+                return None
+            return self._send(host, pool, connection, request_id, message, cb)
+
+        try:
+            connection, request_id = pool.borrow_connection(timeout=cluster.pending_request_timeout)
+        except NoConnectionsAvailable as exc:
+            log.debug("All connections for host %s are at capacity, moving to the next host", host)
+            self._errors[host] = exc
+            return None
+        except Exception as exc:
+            log.debug("Error querying host %s", host, exc_info=True)
+            self._errors[host] = exc
+            if self._metrics is not None:
+                self._metrics.on_connection_error()
+            return None
+        return self._send(host, pool, connection, request_id, message, cb)
+
+    def _send_queued(self, host, pool, message, cb, connection, request_id):
+        """
+        Called by the host's pool once a queued request gets a connection, or
+        with ``connection=None`` and an exception once it cannot.
+
+        A request sent with its own ``cb``, such as a PREPARE made on behalf
+        of other requests, reports failures through ``cb`` rather than
+        sending this future's message to the next host.
+        """
+        if connection is None:
+            log.debug("Request queued for host %s was not sent: %s", host, request_id)
+            self._errors[host] = request_id
+            if self._metrics is not None and isinstance(request_id, NoConnectionsAvailable):
+                self._metrics.on_queue_timeout()
+            if cb is not None:
+                cb(ConnectionException("Request queued for host %s was not sent: %r" % (host, request_id), host))
+            elif not self._event.is_set():
+                self.send_request()
+            return
+
+        if self._event.is_set():
+            # timed out or otherwise completed while queued
+            connection.release_request_id(request_id)
+            pool.return_connection(connection)
+            if cb is not None:
+                cb(ConnectionException("Request queued for host %s was not sent: the request completed" % (host,), host))
+            return
+
+        if self._send(host, pool, connection, request_id, message, cb) is None:
+            if cb is not None:
+                cb(ConnectionException("Failed to send request to host %s: %r" % (host, self._errors.get(host)), host))
+            else:
+                self.send_request()
+        elif cb is None:
+            self._req_id = request_id
+
+    def _get_decoder(self):
+        column_projection = getattr(self.query, 'column_projection', None)
+        if column_projection:
+            return partial(self._protocol_handler.decode_message, column_projection=frozenset(column_projection))
+        return self._protocol_handler.decode_message
+
+    def _send(self, host, pool, connection, request_id, message, cb):
         try:
-            # TODO get connectTimeout from cluster settings
-            connection, request_id = pool.borrow_connection(timeout=2.0)
             self._connection = connection
             result_meta = self.prepared_statement.result_metadata if self.prepared_statement else []
 
@@ -3309,7 +3685,7 @@ class ResponseFuture(object):
 
             self.request_encoded_size = connection.send_msg(message, request_id, cb=cb,
                                                             encoder=self._protocol_handler.encode_message,
-                                                            decoder=self._protocol_handler.decode_message,
+                                                            decoder=self._get_decoder(),
                                                             result_metadata=result_meta)
             self.attempted_hosts.append(host)
             return request_id
@@ -3394,12 +3770,21 @@ class ResponseFuture(object):
         self._start_timer()
         self.send_request()
 
-    def _reprepare(self, prepare_message, host, connection, pool):
-        cb = partial(self.session.submit, self._execute_after_prepare, host, connection, pool)
+    def _reprepare(self, query_id, pending, prepare_message, host, connection, pool):
+        session = self.session
+        # don't let requests wait forever on a PREPARE that is never answered
+        pending.timer = session.cluster._create_request_timer(
+            session.cluster.reprepare_timeout,
+            partial(session._on_reprepared, host, query_id, pending, ConnectionException(
+                "Timed out re-preparing statement on host %s" % (host,), host)))
+
+        cb = partial(session._on_reprepared, host, query_id, pending)
         request_id = self._query(host, prepare_message, cb=cb)
         if request_id is None:
-            # try to submit the original prepared statement on some other host
-            self.send_request()
+            # try to submit the original prepared statement on some other host,
+            # along with the requests waiting for this one to be re-prepared
+            session._on_reprepared(host, query_id, pending, ConnectionException(
+                "Failed to send PREPARE to host %s: %r" % (host, self._errors.get(host)), host))
 
     def _set_result(self, host, connection, pool, response):
         try:
@@ -3473,6 +3858,7 @@ class ResponseFuture(object):
                     # need to retry against a different host here
                     log.warning("Host %s is overloaded, retrying against a different "
                                 "host", host)
+                    self._errors[host] = response
                     self._retry(reuse_connection=False, consistency_level=None, host=host)
                     return
                 elif isinstance(response, IsBootstrappingErrorMessage):
@@ -3512,12 +3898,21 @@ class ResponseFuture(object):
                                        (current_keyspace, prepared_keyspace)))
                         return
 
+                    # requests hitting the same unprepared statement share a single
+                    # PREPARE, and are executed again once it completes
+                    callback = partial(self.session.submit, self._execute_after_prepare, host, connection, pool)
+                    pending = self.session._add_reprepare_callback(host, query_id, callback)
+                    if pending is None:
+                        log.debug("Waiting for statement to be re-prepared against host %s: %s",
+                                  host, prepared_statement.query_string)
+                        return
+
                     log.debug("Re-preparing unrecognized prepared statement against host %s: %s",
                               host, prepared_statement.query_string)
                     prepare_message = PrepareMessage(query=prepared_statement.query_string)
                     # since this might block, run on the executor to avoid hanging
                     # the event loop thread
-                    self.session.submit(self._reprepare, prepare_message, host, connection, pool)
+                    self.session.submit(self._reprepare, query_id, pending, prepare_message, host, connection, pool)
                     return
                 else:
                     if hasattr(response, 'to_exception'):
@@ -3563,7 +3958,7 @@ class ResponseFuture(object):
 
     def _handle_continuous_paging_first_response(self, connection, response):
         self._continuous_paging_session = connection.new_continuous_paging_session(response.stream_id,
-                                                                                   self._protocol_handler.decode_message,
+                                                                                   self._get_decoder(),
                                                                                    self.row_factory)
         self._set_final_result(self._continuous_paging_session.results())
         self._continuous_paging_session.on_message(response)
@@ -3583,7 +3978,8 @@ class ResponseFuture(object):
         if pool:
             pool.return_connection(connection)
 
-        if self._final_exception:
+        if self._event.is_set():
+            # completed (timed out, for instance) while waiting on the PREPARE
             return
 
         if isinstance(response, ResultMessage):
@@ -3854,6 +4250,11 @@ class ResponseFuture(object):
             self._callbacks = []
             self._errbacks = []
 
+    def _remove_callbacks(self, callback, errback):
+        with self._callback_lock:
+            self._callbacks = [c for c in self._callbacks if c[0] is not callback]
+            self._errbacks = [e for e in self._errbacks if e[0] is not errback]
+
     def __str__(self):
         result = "(no result yet)" if self._final_result is _NOT_SET else self._final_result
         return "<ResponseFuture: query='%s' request_id=%s result=%s exception=%s coordinator_host=%s>" \
@@ -3861,6 +4262,56 @@ class ResponseFuture(object):
     __repr__ = __str__
 
 
+def _on_asyncio_loop(response_future, callback, errback):
+    """
+    Arranges for ``callback(response)`` or ``errback(exc)`` to run on the
+    thread running the current ``asyncio`` loop once ``response_future``
+    completes, and then unregisters them. The handlers are called inline when
+    the response arrives on the loop thread, and handed over with
+    ``call_soon_threadsafe`` otherwise.
+    """
+    loop = asyncio.get_event_loop()
+    loop_thread = current_thread()
+
+    def dispatch(fn, arg):
+        response_future._remove_callbacks(on_result, on_error)
+        if current_thread() is loop_thread:
+            fn(arg)
+        else:
+            loop.call_soon_threadsafe(fn, arg)
+
+    def on_result(response):
+        dispatch(callback, response)
+
+    def on_error(exc):
+        dispatch(errback, exc)
+
+    response_future.add_callbacks(on_result, on_error)
+    if response_future._event.is_set():
+        # completed while registering; make sure neither handler lingers
+        response_future._remove_callbacks(on_result, on_error)
+
+
+def _asyncio_result(response_future):
+    """
+    Returns an ``asyncio`` future resolving to the :class:`.ResultSet` of
+    ``response_future``.
+    """
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+
+    def on_result(response):
+        if not future.done():
+            future.set_result(ResultSet(response_future, response))
+
+    def on_error(exc):
+        if not future.done():
+            future.set_exception(exc)
+
+    _on_asyncio_loop(response_future, on_result, on_error)
+    return future
+
+
 class QueryExhausted(Exception):
     """
     Raised when :meth:`.ResponseFuture.start_fetching_next_page()` is called and
@@ -3872,6 +4323,67 @@ class QueryExhausted(Exception):
     pass
 
 
+class _ColumnBuffer(object):
+    """
+    Collects the NumPy arrays of a column, page after page, into a single
+    array that grows geometrically and is trimmed to size at the end.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.data = None
+        self.mask = None
+
+    def append(self, arr):
+        import numpy as np
+
+        data = np.ma.getdata(arr)
+        mask = np.ma.getmask(arr)
+        if self.data is None:
+            self.data = np.empty(max(self.capacity, len(data)), dtype=data.dtype)
+        elif data.dtype != self.data.dtype:
+            # e.g. a wider text column than in previous pages
+            self.data = self.data.astype(np.promote_types(self.data.dtype, data.dtype))
+
+        end = self.size + len(data)
+        if end > len(self.data):
+            self._grow(max(end, 2 * len(self.data)))
+        self.data[self.size:end] = data
+        if mask is not np.ma.nomask:
+            if self.mask is None:
+                self.mask = np.zeros(len(self.data), dtype=np.bool_)
+            self.mask[self.size:end] = mask
+        self.size = end
+
+    def _grow(self, capacity):
+        import numpy as np
+
+        data = np.empty(capacity, dtype=self.data.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
+        if self.mask is not None:
+            mask = np.zeros(capacity, dtype=np.bool_)
+            mask[:self.size] = self.mask[:self.size]
+            self.mask = mask
+
+    def finish(self):
+        import numpy as np
+
+        data, mask = self.data, self.mask
+        if len(data) > self.size:
+            if data.dtype.hasobject:
+                data = data[:self.size].copy()
+            else:
+                # shrinks in place, without copying
+                data.resize(self.size, refcheck=False)
+            if mask is not None:
+                mask.resize(self.size, refcheck=False)
+        if mask is not None:
+            return np.ma.MaskedArray(data, mask=mask)
+        return data
+
+
 class ResultSet(object):
     """
     An iterator over the rows from a query result. Also supplies basic equality
@@ -3939,6 +4451,49 @@ class ResultSet(object):
 
     __next__ = next
 
+    def __aiter__(self):
+        if self.response_future._continuous_paging_session:
+            raise DriverException("Asynchronous iteration is not supported with continuous paging")
+        if self._list_mode:
+            self._page_iter = iter(self._current_rows)
+        else:
+            self.__iter__()
+        return self
+
+    def __anext__(self):
+        """
+        Returns an ``asyncio`` future for the next row. Pages are fetched
+        asynchronously, without blocking the event loop.
+        """
+        future = asyncio.get_event_loop().create_future()
+        self._next_row_aio(future)
+        return future
+
+    def _next_row_aio(self, future):
+        for row in self._page_iter:
+            future.set_result(row)
+            return
+
+        if self._list_mode or not self.response_future.has_more_pages:
+            if not self._list_mode:
+                self._current_rows = []
+            future.set_exception(StopAsyncIteration())
+            return
+
+        def on_page(response):
+            if future.done():
+                return
+            self._set_current_rows(response)
+            self._page_iter = iter(self._current_rows)
+            self._next_row_aio(future)
+
+        def on_error(exc):
+            if not future.done():
+                future.set_exception(exc)
+
+        self.response_future.start_fetching_next_page()
+        _on_asyncio_loop(self.response_future, on_page, on_error)
+
     def fetch_next_page(self):
         """
         Manually, synchronously fetch the next page. Supplied for manually retrieving pages
@@ -3952,6 +4507,39 @@ class ResultSet(object):
         else:
             self._current_rows = []
 
+    def all_columns(self, as_dataframe=False, expected_rows=None):
+        """
+        Returns the entire result of a query decoded with
+        :attr:`.NumpyProtocolHandler` (or ``NumpyNativeProtocolHandler``)
+        as a single dict mapping column names to NumPy arrays, fetching any
+        remaining pages. If `as_dataframe` is :const:`True`, it is returned as
+        a ``pandas.DataFrame`` instead.
+
+        Pages are copied into column arrays as they arrive, rather than kept
+        around to be concatenated. The arrays start with room for
+        `expected_rows` rows, or for one page of the statement's
+        ``fetch_size`` when there are more pages, and double in size when
+        they run out of room.
+        """
+        if expected_rows is None:
+            fetch_size = getattr(self.response_future.message, 'fetch_size', None)
+            expected_rows = fetch_size if self.has_more_pages and fetch_size else 0
+
+        buffers = None
+        for page in self:
+            if not isinstance(page, Mapping):
+                raise DriverException("all_columns() requires results decoded with NumpyProtocolHandler")
+            if buffers is None:
+                buffers = OrderedDict((name, _ColumnBuffer(expected_rows)) for name in page)
+            for name, arr in page.items():
+                buffers[name].append(arr)
+
+        columns = OrderedDict((name, buf.finish()) for name, buf in (buffers or {}).items())
+        if as_dataframe:
+            import pandas
+            return pandas.DataFrame(columns, columns=list(columns))
+        return columns
+
     def _set_current_rows(self, result):
         if isinstance(result, Mapping):
             self._current_rows = [result] if result else []
@@ -11,12 +11,16 @@
 from collections import namedtuple
 from heapq import heappush, heappop
 from itertools import cycle
+import math
 import six
 from six.moves import xrange, zip
-from threading import Condition
+from threading import Condition, Lock
 import sys
+import time
 
-from dse.cluster import ResultSet
+from dse import OperationTimedOut, Timeout, Unavailable
+from dse.cluster import NoHostAvailable, ResultSet
+from dse.protocol import OverloadedErrorMessage
 
 import logging
 log = logging.getLogger(__name__)
@@ -30,7 +34,9 @@ def execute_concurrent(session, statements_and_parameters, concurrency=100, rais
     ``parameters`` item must be a sequence or :const:`None`.
 
     The `concurrency` parameter controls how many statements will be executed
-    concurrently. You can experiment with higher levels of concurrency.
+    concurrently. You can experiment with higher levels of concurrency, or pass
+    an :class:`.AdaptiveConcurrency` to have it adjusted to what the cluster
+    keeps up with.
 
     If `raise_on_first_error` is left as :const:`True`, execution will stop
     after the first failed statement and the corresponding exception will be
@@ -71,7 +77,7 @@ def execute_concurrent(session, statements_and_parameters, concurrency=100, rais
                 process_user(result[0])  # result will be a list of rows
 
     """
-    if concurrency <= 0:
+    if not isinstance(concurrency, AdaptiveConcurrency) and concurrency <= 0:
         raise ValueError("concurrency must be greater than 0")
 
     if not statements_and_parameters:
@@ -81,6 +87,143 @@ def execute_concurrent(session, statements_and_parameters, concurrency=100, rais
     return executor.execute(concurrency, raise_on_first_error)
 
 
+_BACKOFF_ERRORS = (Timeout, Unavailable, OperationTimedOut, OverloadedErrorMessage)
+
+
+def _is_backoff_error(exc):
+    if isinstance(exc, NoHostAvailable):
+        return any(isinstance(e, _BACKOFF_ERRORS) for e in exc.errors.values())
+    return isinstance(exc, _BACKOFF_ERRORS)
+
+
+class AdaptiveConcurrency(object):
+    """
+    A limit on the number of statements in flight that adapts to the
+    cluster's capacity, for the ``concurrency`` parameter of
+    :func:`.execute_concurrent`.
+
+    The limit follows an additive increase, multiplicative decrease scheme.
+    It grows by about one each time ``limit`` statements complete, as long as
+    at least half of the limit is in use. It is multiplied by ``backoff_ratio``
+    when a statement fails with, or is retried after, a timeout, unavailable
+    or overloaded error, or when the 99th percentile latency of the last
+    ``window`` statements exceeds ``tolerance`` times :attr:`baseline_p99`.
+    There is at most one decrease per ``limit`` completions, so that a burst
+    of errors from the same round of requests only counts once.
+
+    The same instance may be passed to several calls to carry the learned
+    limit over. Its attributes can be read while statements are executing,
+    for instance to report progress::
+
+        concurrency = AdaptiveConcurrency(initial_limit=50, max_limit=2000)
+        for success, result in execute_concurrent(session, statements_and_params,
+                                                  concurrency=concurrency, results_generator=True):
+            ...
+        log.info("Finished with a limit of %d (p99 %.3fs)", concurrency.limit, concurrency.p99)
+    """
+
+    limit = None
+    """
+    The current limit, as a float. ``int(limit)`` statements, and at least
+    one, are kept in flight.
+    """
+
+    latency = None
+    """
+    Exponentially weighted moving average of the latency, in seconds, of
+    successful statements.
+    """
+
+    p99 = None
+    """
+    99th percentile latency, in seconds, over the last full window.
+    """
+
+    baseline_p99 = None
+    """
+    The 99th percentile latency that :attr:`p99` is compared against. It is
+    the lowest window p99 seen, drifting slowly towards higher values so that
+    lasting changes are eventually accepted.
+    """
+
+    latency_smoothing = 0.1
+    baseline_drift = 0.1
+
+    def __init__(self, initial_limit=20, min_limit=1, max_limit=1000, backoff_ratio=0.9, tolerance=2.0, window=100):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.window = window
+
+        self._lock = Lock()
+        self._samples = []
+        self._completed = 0
+        self._last_backoff = None
+
+    def on_success(self, latency, in_flight, retried_errors=()):
+        """
+        Records a statement that succeeded after ``latency`` seconds, while
+        ``in_flight`` statements were executing. ``retried_errors`` are the
+        errors of earlier attempts that were retried, which back off as
+        in :meth:`on_error`.
+        """
+        with self._lock:
+            self._completed += 1
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += (latency - self.latency) * self.latency_smoothing
+
+            self._samples.append(latency)
+            if len(self._samples) >= self.window:
+                self._samples.sort()
+                self.p99 = self._samples[int(math.ceil(len(self._samples) * 0.99)) - 1]
+                self._samples = []
+                if self.baseline_p99 is None or self.p99 < self.baseline_p99:
+                    self.baseline_p99 = self.p99
+                else:
+                    rising = self.p99 > self.tolerance * self.baseline_p99
+                    self.baseline_p99 += (self.p99 - self.baseline_p99) * self.baseline_drift
+                    if rising:
+                        self._backoff()
+                        return
+
+            if any(_is_backoff_error(e) for e in retried_errors):
+                self._backoff()
+            elif in_flight >= self.limit / 2:
+                self.limit = min(self.limit + 1.0 / self.limit, self.max_limit)
+
+    def on_error(self, exc, retried_errors=()):
+        """
+        Records a statement that failed with ``exc``, backing off if it, or
+        one of the ``retried_errors`` of earlier attempts, indicates that
+        the cluster is overloaded.
+        """
+        with self._lock:
+            self._completed += 1
+            if _is_backoff_error(exc) or any(_is_backoff_error(e) for e in retried_errors):
+                self._backoff()
+
+    def _backoff(self):
+        # lock must be held
+        if self._last_backoff is not None and self._completed - self._last_backoff < self.limit:
+            return
+        self._last_backoff = self._completed
+        self.limit = max(self.limit * self.backoff_ratio, self.min_limit)
+        log.debug("Reduced concurrency limit to %.1f", self.limit)
+
+    def __repr__(self):
+        return "%s(limit=%.1f, latency=%r, p99=%r, baseline_p99=%r)" % (
+            self.__class__.__name__, self.limit, self.latency, self.p99, self.baseline_p99)
+
+
 class _ConcurrentExecutor(object):
 
     max_error_recursion = 100
@@ -94,23 +237,41 @@ class _ConcurrentExecutor(object):
         self._current = 0
         self._exec_count = 0
         self._exec_depth = 0
+        self._in_flight = 0
+        self._limit = None
 
     def execute(self, concurrency, fail_fast):
         self._fail_fast = fail_fast
         self._results_queue = []
         self._current = 0
         self._exec_count = 0
+        self._in_flight = 0
         with self._condition:
-            for n in xrange(concurrency):
-                if not self._execute_next():
-                    break
+            if isinstance(concurrency, AdaptiveConcurrency):
+                self._limit = concurrency
+                self._execute_more()
+            else:
+                for n in xrange(concurrency):
+                    if not self._execute_next():
+                        break
         return self._results()
 
+    def _execute_more(self):
+        # lock must be held
+        if self._limit is None:
+            return self._execute_next()
+        executed = False
+        limit = max(1, int(self._limit.limit))
+        while self._in_flight < limit and self._execute_next():
+            executed = True
+        return executed
+
     def _execute_next(self):
         # lock must be held
         try:
             (idx, (statement, params)) = next(self._enum_statements)
             self._exec_count += 1
+            self._in_flight += 1
             self._execute(idx, statement, params)
             return True
         except StopIteration:
@@ -120,7 +281,7 @@ class _ConcurrentExecutor(object):
         self._exec_depth += 1
         try:
             future = self.session.execute_async(statement, params, timeout=None)
-            args = (future, idx)
+            args = (future, idx, time.time())
             future.add_callbacks(
                 callback=self._on_success, callback_args=args,
                 errback=self._on_error, errback_args=args)
@@ -138,11 +299,18 @@ class _ConcurrentExecutor(object):
                 self.session.submit(self._put_result, e, idx, False)
         self._exec_depth -= 1
 
-    def _on_success(self, result, future, idx):
+    def _on_success(self, result, future, idx, start_time):
         future.clear_callbacks()
+        if self._limit is not None:
+            with self._condition:
+                in_flight = self._in_flight
+            # timeouts and overloaded hosts that were retried are recorded on the future
+            self._limit.on_success(time.time() - start_time, in_flight, future._errors.values())
         self._put_result(ResultSet(future, result), idx, True)
 
-    def _on_error(self, result, future, idx):
+    def _on_error(self, result, future, idx, start_time):
+        if self._limit is not None:
+            self._limit.on_error(result, future._errors.values())
         self._put_result(result, idx, False)
 
     @staticmethod
@@ -159,7 +327,8 @@ class ConcurrentExecutorGenResults(_ConcurrentExecutor):
     def _put_result(self, result, idx, success):
         with self._condition:
             heappush(self._results_queue, (idx, ExecutionResult(success, result)))
-            self._execute_next()
+            self._in_flight -= 1
+            self._execute_more()
             self._condition.notify()
 
     def _results(self):
@@ -191,11 +360,12 @@ class ConcurrentExecutorListResults(_ConcurrentExecutor):
         self._results_queue.append((idx, ExecutionResult(success, result)))
         with self._condition:
             self._current += 1
+            self._in_flight -= 1
             if not success and self._fail_fast:
                 if not self._exception:
                     self._exception = result
                 self._condition.notify()
-            elif not self._execute_next() and self._current == self._exec_count:
+            elif not self._execute_more() and self._current == self._exec_count:
                 self._condition.notify()
 
     def _results(self):
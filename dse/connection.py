@@ -12,14 +12,13 @@ from collections import defaultdict, deque
 import errno
 from functools import wraps, partial
 from heapq import heappush, heappop
-import io
 import logging
 import six
 from six.moves import range
 import socket
 import struct
 import sys
-from threading import Thread, Event, RLock, Condition
+from threading import Thread, Event, Lock, RLock, Condition
 import time
 
 try:
@@ -66,8 +65,11 @@ else:
         return int32_pack(len(byts)) + lz4.compress(byts)[4:]
 
     def lz4_decompress(byts):
-        # flip from big-endian to little-endian
-        return lz4.decompress(byts[3::-1] + byts[4:])
+        # flip from big-endian to little-endian; byts may be a memoryview
+        # into the connection's read buffer
+        header = bytearray(byts[:4])
+        header.reverse()
+        return lz4.decompress(bytes(header + byts[4:]))
 
     locally_supported_compressions['lz4'] = (lz4_compress, lz4_decompress)
 
@@ -80,7 +82,7 @@ else:
     def decompress(byts):
         if byts == '\x00':
             return ''
-        return snappy.decompress(byts)
+        return snappy.decompress(memoryview(byts).tobytes())
     locally_supported_compressions['snappy'] = (snappy.compress, decompress)
 
 
@@ -116,9 +118,216 @@ class _Frame(object):
         return "ver({0}); flags({1:04b}); stream({2}); op({3}); offset({4}); len({5})".format(self.version, self.flags, self.stream, self.opcode, self.body_offset, self.end_pos - self.body_offset)
 
 
+class _ReadBuffer(object):
+    """
+    Preallocated buffer of bytes read from a connection's socket.
+
+    Sockets read directly into the free space at the end of the buffer with
+    :meth:`recv_into`, and the buffer grows to fit the largest read requested
+    of it, so its storage is reused across frames rather than reallocated.
+
+    Frames are parsed in place: headers are unpacked directly from the
+    buffer and complete bodies are handed out as ``memoryview`` slices
+    instead of copies. Consumed bytes are reclaimed when the buffer drains,
+    or compacted once the consumed prefix grows past
+    :attr:`compact_threshold` or the free space at the end is too small for
+    the next read. Storage still referenced by a body handed out
+    earlier is never written to again; the buffer moves to new storage
+    instead.
+    """
+
+    compact_threshold = 65536
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._pos
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def write(self, data):
+        size = len(data)
+        self._reserve(size)
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def recv_into(self, sock, size):
+        """
+        Reads up to ``size`` bytes from ``sock`` directly into the buffer,
+        returning the number of bytes read. Socket errors are propagated.
+        """
+        received = sock.recv_into(self.reserve(size), size)
+        self._end += received
+        return received
+
+    def reserve(self, size):
+        """
+        Returns a writable ``memoryview`` over the next ``size`` free bytes.
+        Bytes written to it are added to the buffer by :meth:`commit`.
+        """
+        self._reserve(size)
+        return memoryview(self._buf)[self._end:self._end + size]
+
+    def commit(self, size):
+        self._end += size
+
+    def getvalue(self):
+        return bytes(self._buf[self._pos:self._end])
+
+    def byte_at(self, offset):
+        return self._buf[self._pos + offset]
+
+    def unpack_from(self, fmt, offset):
+        return fmt.unpack_from(self._buf, self._pos + offset)
+
+    def view(self, start, end):
+        """
+        Returns a ``memoryview`` over bytes ``[start, end)`` of the unconsumed
+        data, without copying.
+        """
+        return memoryview(self._buf)[self._pos + start:self._pos + end]
+
+    def consume(self, size):
+        self._pos += size
+        if self._pos >= self._end:
+            if self._is_exported():
+                self._buf = bytearray(len(self._buf))
+            self._pos = self._end = 0
+        elif self._pos >= self.compact_threshold:
+            try:
+                del self._buf[:self._pos]
+            except BufferError:
+                self._move(len(self._buf) - self._pos)
+            else:
+                self._end -= self._pos
+                self._pos = 0
+
+    def _reserve(self, size):
+        if self._end + size > len(self._buf):
+            needed = len(self) + size
+            if needed <= len(self._buf) and not self._is_exported():
+                # fits once the consumed prefix is dropped: move the partial
+                # frame left at the end to the front of the same storage
+                remaining = len(self)
+                self._buf[:remaining] = self._buf[self._pos:self._end]
+                self._pos = 0
+                self._end = remaining
+            else:
+                # drop the consumed prefix while growing
+                self._move(needed)
+
+    def _is_exported(self):
+        # resizing fails while a body view handed out earlier is alive
+        try:
+            self._buf.append(0)
+        except BufferError:
+            return True
+        del self._buf[-1]
+        return False
+
+    def _move(self, capacity):
+        size = len(self)
+        buf = bytearray(max(capacity, size))
+        buf[:size] = memoryview(self._buf)[self._pos:self._end]
+        self._buf = buf
+        self._pos = 0
+        self._end = size
+
+
+class _WriteQueue(object):
+    """
+    Outgoing frames waiting to be written to a non-blocking socket.
+
+    Each call to :meth:`send` gathers queued frames, up to ``flush_threshold``
+    bytes, into a single vectored ``sendmsg()``. A partially sent frame stays
+    at the head of the queue and the remainder is tracked as an offset, so
+    frames are never re-sliced. Frames may be appended from any thread, but
+    only one thread may send.
+    """
+
+    max_buffers = 1024
+    """
+    Maximum number of buffers passed to one ``sendmsg()`` call (``IOV_MAX``
+    on Linux and BSD).
+    """
+
+    def __init__(self, flush_threshold):
+        self.flush_threshold = flush_threshold
+        self._frames = deque()
+        self._offset = 0
+        self._size = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return self._size - self._offset
+
+    def append(self, data):
+        with self._lock:
+            self._frames.append(data)
+            self._size += len(data)
+
+    def send(self, sock):
+        """
+        Writes as much of the queue as ``sock`` accepts in one call and
+        returns the number of bytes sent. Socket errors are propagated.
+        """
+        buffers = self._gather()
+        if not buffers:
+            return 0
+
+        if len(buffers) == 1:
+            sent = sock.send(buffers[0])
+        elif _can_sendmsg(sock):
+            sent = sock.sendmsg(buffers)
+        else:
+            # no vectored I/O (Python 2, TLS): still a single syscall
+            sent = sock.send(b''.join(buffers))
+
+        self._advance(sent)
+        return sent
+
+    def _gather(self):
+        buffers = []
+        remaining = self.flush_threshold
+        offset = self._offset
+        with self._lock:
+            for frame in self._frames:
+                view = memoryview(frame)[offset:offset + remaining]
+                buffers.append(view)
+                remaining -= len(view)
+                offset = 0
+                if remaining <= 0 or len(buffers) >= self.max_buffers:
+                    break
+        return buffers
+
+    def _advance(self, sent):
+        with self._lock:
+            offset = self._offset + sent
+            frames = self._frames
+            while frames and offset >= len(frames[0]):
+                size = len(frames.popleft())
+                offset -= size
+                self._size -= size
+            self._offset = offset if frames else 0
+
+
 
 NONBLOCKING = (errno.EAGAIN, errno.EWOULDBLOCK)
 
+_socket_type = socket.socket
+_HAS_SENDMSG = hasattr(_socket_type, 'sendmsg')
+
+
+def _can_sendmsg(sock):
+    # SSLSocket.sendmsg() exists, but raises NotImplementedError
+    return (_HAS_SENDMSG and isinstance(sock, _socket_type) and
+            not (ssl and isinstance(sock, ssl.SSLSocket)))
+
 
 class ConnectionException(Exception):
     """
@@ -256,7 +465,16 @@ class Connection(object):
     CALLBACK_ERR_THREAD_THRESHOLD = 100
 
     in_buffer_size = 4096
-    out_buffer_size = 4096
+    """
+    The smallest read requested of the socket. Once a frame header has been
+    read, reads are sized to the rest of the frame instead.
+    """
+
+    out_buffer_size = 65536
+    """
+    The flush threshold for outgoing data: queued frames are coalesced into
+    socket writes of up to this many bytes.
+    """
 
     cql_version = None
     protocol_version = ProtocolVersion.MAX_SUPPORTED
@@ -269,19 +487,16 @@ class Connection(object):
     ssl_options = None
     last_error = None
 
-    # The current number of operations that are in flight. More precisely,
-    # the number of request IDs that are currently in use.
-    in_flight = 0
-
     # Max concurrent requests allowed per connection. This is set optimistically high, allowing
     # all request ids to be used. Normally concurrency would be controlled
     # at a higher level by the application or concurrent.execute_concurrent. This attribute
     # is for lower-level integrations that want some upper bound without reimplementing.
     max_in_flight = 2 ** 15
 
-    # A set of available request IDs.  This will not initially include all
-    # request IDs in order to save memory, but the set will grow if it is
-    # exhausted.
+    # The free request IDs. This will not initially include all request IDs
+    # in order to save memory, but more are issued if it is exhausted. IDs are
+    # taken and returned with the atomic deque.popleft() and deque.append(),
+    # so no lock is needed outside of issuing new IDs.
     request_ids = None
 
     # Tracks the highest used request ID in order to help with growing the
@@ -295,6 +510,10 @@ class Connection(object):
 
     msg_received = False
 
+    # Number of socket reads made, and bytes received by them
+    recv_count = 0
+    recv_bytes = 0
+
     is_unsupported_proto_version = False
 
     is_control_connection = False
@@ -312,6 +531,10 @@ class Connection(object):
 
     _check_hostname = False
 
+    # set by connection classes that verify hostnames through SSLContext.check_hostname,
+    # rather than with ssl.match_hostname (removed in Python 3.12)
+    _ssl_context_checks_hostname = False
+
     def __init__(self, host='127.0.0.1', port=9042, authenticator=None,
                  ssl_options=None, sockopts=None, compression=True,
                  cql_version=None, protocol_version=ProtocolVersion.MAX_SUPPORTED, is_control_connection=False,
@@ -330,12 +553,12 @@ class Connection(object):
         self.allow_beta_protocol_version = allow_beta_protocol_version
         self._push_watchers = defaultdict(set)
         self._requests = {}
-        self._iobuf = io.BytesIO()
+        self._iobuf = _ReadBuffer()
         self._continuous_paging_sessions = {}
 
         if ssl_options:
             self._check_hostname = bool(self.ssl_options.pop('check_hostname', False))
-            if self._check_hostname:
+            if self._check_hostname and not self._ssl_context_checks_hostname:
                 if not getattr(ssl, 'match_hostname', None):
                     raise RuntimeError("ssl_options specify 'check_hostname', but ssl.match_hostname is not provided. "
                                        "Patch or upgrade Python to use this option.")
@@ -487,17 +710,35 @@ class Connection(object):
             t.daemon = True
             t.start()
 
+    @property
+    def in_flight(self):
+        """
+        The current number of operations that are in flight. More precisely,
+        the number of request IDs that are currently in use.
+        """
+        return self.highest_request_id + 1 - len(self.request_ids)
+
     def get_request_id(self):
         """
-        This must be called while self.lock is held.
+        Takes a free request ID, or returns :const:`None` if all of them are
+        in use. The ID is freed once the response to the request using it has
+        been processed.
         """
         try:
             return self.request_ids.popleft()
         except IndexError:
-            self.highest_request_id += 1
-            # in_flight checks should guarantee this
-            assert self.highest_request_id <= self.max_request_id
-            return self.highest_request_id
+            with self.lock:
+                if self.highest_request_id >= self.max_request_id:
+                    return None
+                self.highest_request_id += 1
+                return self.highest_request_id
+
+    def release_request_id(self, request_id):
+        """
+        Frees a request ID taken with :meth:`get_request_id` that ended up
+        not being used to send a request.
+        """
+        self.request_ids.append(request_id)
 
     def handle_pushed(self, response):
         log.debug("Message pushed from server: %r", response)
@@ -508,15 +749,21 @@ class Connection(object):
                 log.exception("Pushed event handler errored, ignoring:")
 
     def send_msg(self, msg, request_id, cb, encoder=ProtocolHandler.encode_message, decoder=ProtocolHandler.decode_message, result_metadata=None):
-        if self.is_defunct:
-            raise ConnectionShutdown("Connection to %s is defunct" % self.host)
-        elif self.is_closed:
-            raise ConnectionShutdown("Connection to %s is closed" % self.host)
-
-        # queue the decoder function with the request
-        # this allows us to inject custom functions per request to encode, decode messages
-        self._requests[request_id] = (cb, decoder, result_metadata)
-        msg = encoder(msg, request_id, self.protocol_version, compressor=self.compressor, allow_beta_protocol_version=self.allow_beta_protocol_version)
+        try:
+            if self.is_defunct:
+                raise ConnectionShutdown("Connection to %s is defunct" % self.host)
+            elif self.is_closed:
+                raise ConnectionShutdown("Connection to %s is closed" % self.host)
+
+            # queue the decoder function with the request
+            # this allows us to inject custom functions per request to encode, decode messages
+            self._requests[request_id] = (cb, decoder, result_metadata)
+            msg = encoder(msg, request_id, self.protocol_version, compressor=self.compressor, allow_beta_protocol_version=self.allow_beta_protocol_version)
+        except Exception:
+            # nothing was sent, so no response will free the request ID
+            self._requests.pop(request_id, None)
+            self.request_ids.append(request_id)
+            raise
         self.push(msg)
         return len(msg)
 
@@ -531,30 +778,41 @@ class Connection(object):
 
         If fail_on_error was left as True and one of the requests
         failed, the corresponding Exception will be raised.
+
+        If max_in_flight is set, no more than that many of the messages
+        are awaiting a response at any time, and the next one is sent as
+        soon as a response arrives. The timeout then bounds the wait for
+        each of those responses rather than the whole call.
         """
         if self.is_closed or self.is_defunct:
             raise ConnectionShutdown("Connection %s is already closed" % (self, ))
         timeout = kwargs.get('timeout')
         fail_on_error = kwargs.get('fail_on_error', True)
+        max_in_flight = kwargs.get('max_in_flight')
         waiter = ResponseWaiter(self, len(msgs), fail_on_error)
 
         # busy wait for sufficient space on the connection
         messages_sent = 0
         while True:
-            needed = len(msgs) - messages_sent
-            with self.lock:
-                available = min(needed, self.max_request_id - self.in_flight + 1)
-                request_ids = [self.get_request_id() for _ in range(available)]
-                self.in_flight += available
-
-            for i, request_id in enumerate(request_ids):
-                self.send_msg(msgs[messages_sent + i],
+            while messages_sent < len(msgs):
+                if max_in_flight and messages_sent - waiter.received >= max_in_flight:
+                    break
+                request_id = self.get_request_id()
+                if request_id is None:
+                    break
+                self.send_msg(msgs[messages_sent],
                               request_id,
-                              partial(waiter.got_response, index=messages_sent + i))
-            messages_sent += available
+                              partial(waiter.got_response, index=messages_sent))
+                messages_sent += 1
 
             if messages_sent == len(msgs):
                 break
+            elif max_in_flight and messages_sent - waiter.received >= max_in_flight:
+                waiter.progress.clear()
+                if messages_sent - waiter.received >= max_in_flight and not waiter.progress.wait(timeout):
+                    raise OperationTimedOut()
+                if waiter.error:
+                    raise waiter.error
             else:
                 if timeout is not None:
                     timeout -= 0.01
@@ -595,25 +853,52 @@ class Connection(object):
 
     @defunct_on_error
     def _read_frame_header(self):
-        buf = self._iobuf.getvalue()
+        buf = self._iobuf
         pos = len(buf)
         if pos:
-            version = int_from_buf_item(buf[0]) & PROTOCOL_VERSION_MASK
+            version = buf.byte_at(0) & PROTOCOL_VERSION_MASK
             if version not in ProtocolVersion.SUPPORTED_VERSIONS:
                 raise ProtocolError("This version of the driver does not support protocol version %d" % version)
             frame_header = frame_header_v3
             # this frame header struct is everything after the version byte
             header_size = frame_header.size + 1
             if pos >= header_size:
-                flags, stream, op, body_len = frame_header.unpack_from(buf, 1)
+                flags, stream, op, body_len = buf.unpack_from(frame_header, 1)
                 if body_len < 0:
                     raise ProtocolError("Received negative body length: %r" % body_len)
                 self._current_frame = _Frame(version, flags, stream, op, header_size, body_len + header_size)
         return pos
 
+    def _next_read_size(self):
+        """
+        Returns how many bytes to read next: the rest of the current frame if
+        its header has been read, and at least :attr:`in_buffer_size`.
+        """
+        if not self._current_frame and len(self._iobuf):
+            self._read_frame_header()
+        if self._current_frame:
+            return max(self.in_buffer_size, self._current_frame.end_pos - len(self._iobuf))
+        return self.in_buffer_size
+
+    def _recv_into_buffer(self, sock, size):
+        """
+        Reads up to ``size`` bytes from ``sock`` into the read buffer and
+        returns the number of bytes read.
+        """
+        received = self._iobuf.recv_into(sock, size)
+        self.recv_count += 1
+        self.recv_bytes += received
+        return received
+
+    @property
+    def bytes_per_recv(self):
+        """
+        The average number of bytes received by each socket read.
+        """
+        return float(self.recv_bytes) / self.recv_count if self.recv_count else 0.0
+
     def _reset_frame(self):
-        self._iobuf = io.BytesIO(self._iobuf.read())
-        self._iobuf.seek(0, 2)  # io.SEEK_END == 2 (constant not present in 2.6)
+        self._iobuf.consume(self._current_frame.end_pos)
         self._current_frame = None
 
     def process_io_buffer(self):
@@ -621,7 +906,7 @@ class Connection(object):
             if not self._current_frame:
                 pos = self._read_frame_header()
             else:
-                pos = self._iobuf.tell()
+                pos = len(self._iobuf)
 
             if not self._current_frame or pos < self._current_frame.end_pos:
                 # we don't have a complete header yet or we
@@ -630,9 +915,11 @@ class Connection(object):
                 return
             else:
                 frame = self._current_frame
-                self._iobuf.seek(frame.body_offset)
-                msg = self._iobuf.read(frame.end_pos - frame.body_offset)
+                msg = self._iobuf.view(frame.body_offset, frame.end_pos)
                 self.process_msg(frame, msg)
+                # drop our reference so the buffer can be reused in place
+                # unless the decoder kept the view
+                del msg
                 self._reset_frame()
 
     @defunct_on_error
@@ -658,12 +945,21 @@ class Connection(object):
                                header.flags, header.opcode, body, self.decompressor, result_metadata)
         except Exception as exc:
             log.exception("Error decoding response from Cassandra. "
-                          "%s; buffer: %r", header, self._iobuf.getvalue())
+                          "%s; body: %r", header, bytearray(body))
             if callback is not None:
                 callback(exc)
             self.defunct(exc)
             return
 
+        # Free the request ID before running the callback, so that it already
+        # counts as available when the callback returns the connection to its
+        # pool. The first page of a continuous paging session keeps it until
+        # the session ends.
+        release_early = (stream_id >= 0 and stream_id not in self._continuous_paging_sessions and
+                         getattr(response, 'continuous_paging_seq', None) is None)
+        if release_early:
+            self.request_ids.append(stream_id)
+
         try:
             if stream_id >= 0:
                 if isinstance(response, ProtocolException):
@@ -680,9 +976,8 @@ class Connection(object):
             log.exception("Callback handler errored, ignoring:")
 
         # done after callback because the callback might signal this as a paging session
-        if stream_id >= 0 and stream_id not in self._continuous_paging_sessions:
-            with self.lock:
-                self.request_ids.append(stream_id)
+        if stream_id >= 0 and not release_early and stream_id not in self._continuous_paging_sessions:
+            self.request_ids.append(stream_id)
 
     def new_continuous_paging_session(self, stream_id, decoder, row_factory):
         session = ContinuousPagingSession(stream_id, decoder, row_factory, self)
@@ -692,8 +987,7 @@ class Connection(object):
     def remove_continuous_paging_session(self, stream_id):
         try:
             self._continuous_paging_sessions.pop(stream_id)
-            with self.lock:
-                self.request_ids.append(stream_id)
+            self.request_ids.append(stream_id)
         except KeyError:
             pass
 
@@ -902,19 +1196,14 @@ class Connection(object):
                 callback(self, self.defunct(ConnectionException(
                     "Problem while setting keyspace: %r" % (result,), self.host)))
 
-        request_id = None
-        # we use a busy wait on the lock here because:
+        # we use a busy wait here because:
         # - we'll only spin if the connection is at max capacity, which is very
         #   unlikely for a set_keyspace call
         # - it allows us to avoid signaling a condition every time a request completes
-        while True:
-            with self.lock:
-                if self.in_flight < self.max_request_id:
-                    request_id = self.get_request_id()
-                    self.in_flight += 1
-                    break
-
+        request_id = self.get_request_id()
+        while request_id is None:
             time.sleep(0.001)
+            request_id = self.get_request_id()
 
         self.send_msg(query, request_id, process_result)
 
@@ -945,10 +1234,13 @@ class ResponseWaiter(object):
         self.error = None
         self.responses = [None] * num_responses
         self.event = Event()
+        self.progress = Event()
+
+    @property
+    def received(self):
+        return len(self.responses) - self.pending
 
     def got_response(self, response, index):
-        with self.connection.lock:
-            self.connection.in_flight -= 1
         if isinstance(response, Exception):
             if hasattr(response, 'to_exception'):
                 response = response.to_exception()
@@ -964,6 +1256,7 @@ class ResponseWaiter(object):
                 self.responses[index] = response
 
         self.pending -= 1
+        self.progress.set()
         if not self.pending:
             self.event.set()
 
@@ -994,13 +1287,12 @@ class HeartbeatFuture(object):
         self.owner = owner
         log.debug("Sending options message heartbeat on idle connection (%s) %s",
                   id(connection), connection.host)
-        with connection.lock:
-            if connection.in_flight <= connection.max_request_id:
-                connection.in_flight += 1
-                connection.send_msg(OptionsMessage(), connection.get_request_id(), self._options_callback)
-            else:
-                self._exception = Exception("Failed to send heartbeat because connection 'in_flight' exceeds threshold")
-                self._event.set()
+        request_id = connection.get_request_id()
+        if request_id is not None:
+            connection.send_msg(OptionsMessage(), request_id, self._options_callback)
+        else:
+            self._exception = Exception("Failed to send heartbeat because connection 'in_flight' exceeds threshold")
+            self._event.set()
 
     def wait(self, timeout):
         self._event.wait(timeout)
@@ -1069,9 +1361,6 @@ class ConnectionHeartbeat(Thread):
                     connection = f.connection
                     try:
                         f.wait(self._interval)
-                        # TODO: move this, along with connection locks in pool, down into Connection
-                        with connection.lock:
-                            connection.in_flight -= 1
                         connection.reset_idle()
                     except Exception as e:
                         log.warning("Heartbeat failed for connection (%s) to %s",
@@ -1168,3 +1457,112 @@ class TimerManager(object):
             return self._queue[0][0]
         except IndexError:
             pass
+
+
+class _WheelTimer(Timer):
+
+    tick = None
+    bucket = None
+
+    def __init__(self, wheel, timeout, callback):
+        self._wheel = wheel
+        Timer.__init__(self, timeout, callback)
+
+    def cancel(self):
+        self.canceled = True
+        self._wheel._remove(self)
+
+
+class HashedWheelTimer(object):
+    """
+    A hashed timing wheel, for scheduling large numbers of timers that are
+    usually canceled before they expire, such as request timeouts.
+
+    Timers are hashed by expiry tick into one of ``ticks_per_wheel`` buckets,
+    so creating and canceling a timer is O(1), and canceled timers are
+    dropped right away rather than waiting to expire. Expired timers are run
+    in batches, once per ``tick_duration`` seconds, so they may fire up to one
+    tick late.
+
+    The wheel is driven by a single timer created with ``create_timer`` (one
+    of the :meth:`.Connection.create_timer` implementations), which is only
+    scheduled while timers are pending; callbacks therefore run on the
+    reactor's event loop, like other timers. See
+    :attr:`.Cluster.use_timing_wheel`.
+    """
+
+    def __init__(self, create_timer, tick_duration=0.05, ticks_per_wheel=512):
+        if ticks_per_wheel & (ticks_per_wheel - 1):
+            raise ValueError("ticks_per_wheel must be a power of two")
+        self._create_timer = create_timer
+        self.tick_duration = tick_duration
+        self._mask = ticks_per_wheel - 1
+        self._wheel = [set() for _ in range(ticks_per_wheel)]
+        self._lock = Lock()
+        self._start = time.time()
+        self._tick = 0  # the last tick serviced
+        self._count = 0
+        self._driver = None
+
+    def create_timer(self, timeout, callback):
+        """
+        Schedules ``callback`` to run in ``timeout`` seconds, and returns a
+        timer that may be canceled.
+        """
+        timer = _WheelTimer(self, timeout, callback)
+        if timeout < 0:
+            return timer
+
+        tick = int((timer.end - self._start) / self.tick_duration) + 1
+        with self._lock:
+            timer.tick = max(tick, self._tick + 1)
+            timer.bucket = self._wheel[timer.tick & self._mask]
+            timer.bucket.add(timer)
+            self._count += 1
+            if self._driver is None:
+                self._schedule()
+        return timer
+
+    def __len__(self):
+        return self._count
+
+    def _remove(self, timer):
+        with self._lock:
+            bucket = timer.bucket
+            if bucket is not None and timer in bucket:
+                bucket.remove(timer)
+                timer.bucket = None
+                self._count -= 1
+
+    def _schedule(self):
+        # called with the lock held
+        delay = self._start + (self._tick + 1) * self.tick_duration - time.time()
+        self._driver = self._create_timer(max(delay, 0), self._on_tick)
+
+    def _on_tick(self):
+        expired = []
+        with self._lock:
+            self._driver = None
+            now_tick = int((time.time() - self._start) / self.tick_duration)
+            # when more than a full turn behind, every bucket is visited once
+            first = max(self._tick + 1, now_tick - self._mask)
+            for tick in range(first, now_tick + 1):
+                bucket = self._wheel[tick & self._mask]
+                if bucket:
+                    due = [t for t in bucket if t.tick <= now_tick]
+                    for timer in due:
+                        bucket.remove(timer)
+                        timer.bucket = None
+                    expired.extend(due)
+            self._tick = max(self._tick, now_tick)
+            self._count -= len(expired)
+            if self._count:
+                self._schedule()
+
+        for timer in expired:
+            if timer.canceled:
+                continue
+            try:
+                timer.callback()
+            except Exception:
+                log.exception("Exception while servicing timeout callback: ")
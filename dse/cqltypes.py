@@ -23,6 +23,7 @@ the corresponding CQL or Cassandra type strings.
 # .from_cql_literal() and .as_cql_literal() classmethods (or whatever).
 
 from __future__ import absolute_import  # to enable import io from stdlib
+from array import array
 from binascii import unhexlify
 import calendar
 from collections import namedtuple
@@ -1080,6 +1081,47 @@ class PointType(CassandraType):
         return util.Point(*point.unpack_from(byts, 5))  # ofs = endian byte + int type
 
 
+_wkb_count_le = struct.Struct('<i')
+_wkb_count_be = struct.Struct('>i')
+
+
+def _wkb_count(byts, offset, is_little_endian):
+    return (_wkb_count_le if is_little_endian else _wkb_count_be).unpack_from(byts, offset)[0]
+
+
+def _coord_array_from_wkb(byts, offset, num_points, is_little_endian):
+    """
+    Reads num_points (x, y) points at offset into an array('d') of x, y values
+    """
+    end = offset + num_points * point_le.size
+    if num_points < 0 or end > len(byts):
+        raise ValueError("Invalid WKB: %d points at offset %d in %d bytes" % (num_points, offset, len(byts)))
+    coords = array('d')
+    if six.PY2:
+        coords.fromstring(byts[offset:end])
+    else:
+        coords.frombytes(memoryview(byts)[offset:end])
+    if is_little_endian != util.is_little_endian:
+        coords.byteswap()
+    return coords
+
+
+def _coord_array_to_wkb(geom):
+    """
+    Returns the point count and little endian points of a geometry with
+    coords, using its coord_array when it has one (see dse.util.LineString)
+    """
+    coords = getattr(geom, 'coord_array', None)
+    if coords is None:
+        # e.g. shapely geometries
+        num_points = len(geom.coords)
+        return struct.pack('<I' + 'dd' * num_points, num_points, *(d for coord in geom.coords for d in coord))
+    if not util.is_little_endian:
+        coords = array('d', coords)
+        coords.byteswap()
+    return _wkb_count_le.pack(len(coords) // 2) + (coords.tostring() if six.PY2 else coords.tobytes())
+
+
 class LineStringType(CassandraType):
     typename = 'LineStringType'
 
@@ -1087,15 +1129,13 @@ class LineStringType(CassandraType):
 
     @staticmethod
     def serialize(val, protocol_version):
-        num_points = len(val.coords)
-        return LineStringType._type + struct.pack('<I' + 'dd' * num_points, num_points, *(d for coords in val.coords for d in coords))
+        return LineStringType._type + _coord_array_to_wkb(val)
 
     @staticmethod
     def deserialize(byts, protocol_version):
         is_little_endian = bool(_ord(byts[0]))
-        point = point_le if is_little_endian else point_be
-        coords = ((point.unpack_from(byts, offset) for offset in range(1 + 4 + 4, len(byts), point.size)))  # start = endian + int type + int count
-        return util.LineString(coords)
+        num_points = _wkb_count(byts, 5, is_little_endian)  # ofs = endian byte + int type
+        return util.LineString._from_coord_array(_coord_array_from_wkb(byts, 9, num_points, is_little_endian))
 
 
 class PolygonType(CassandraType):
@@ -1109,12 +1149,11 @@ class PolygonType(CassandraType):
         buf = io.BytesIO(PolygonType._type)
         buf.seek(0, 2)
 
-        if val.exterior.coords:
+        if getattr(val.exterior, 'coord_array', None) or val.exterior.coords:
             num_rings = 1 + len(val.interiors)
             buf.write(PolygonType._ring_count(num_rings))
             for ring in chain((val.exterior,), val.interiors):
-                num_points = len(ring.coords)
-                buf.write(struct.pack('<I' + 'dd' * num_points, num_points, *(d for coord in ring.coords for d in coord)))
+                buf.write(_coord_array_to_wkb(ring))
         else:
             buf.write(PolygonType._ring_count(0))
         return buf.getvalue()
@@ -1122,23 +1161,16 @@ class PolygonType(CassandraType):
     @staticmethod
     def deserialize(byts, protocol_version):
         is_little_endian = bool(_ord(byts[0]))
-        if is_little_endian:
-            int_fmt = '<i'
-            point = point_le
-        else:
-            int_fmt = '>i'
-            point = point_be
         p = 5
-        ring_count = struct.unpack_from(int_fmt, byts, p)[0]
+        ring_count = _wkb_count(byts, p, is_little_endian)
         p += 4
         rings = []
         for _ in range(ring_count):
-            point_count = struct.unpack_from(int_fmt, byts, p)[0]
+            point_count = _wkb_count(byts, p, is_little_endian)
             p += 4
-            end = p + point_count * point.size
-            rings.append([point.unpack_from(byts, offset) for offset in range(p, end, point.size)])
-            p = end
-        return util.Polygon(exterior=rings[0], interiors=rings[1:]) if rings else util.Polygon()
+            rings.append(_coord_array_from_wkb(byts, p, point_count, is_little_endian))
+            p += point_count * point_le.size
+        return util.Polygon._from_coord_arrays(rings[0], rings[1:]) if rings else util.Polygon()
 
 
 class BoundKind(object):
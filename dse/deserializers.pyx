@@ -9,6 +9,7 @@
 
 
 from libc.stdint cimport int32_t, uint16_t
+from cpython.array cimport array, clone
 
 include 'cython_marshal.pyx'
 from dse.buffer cimport Buffer, to_bytes, slice_buffer
@@ -17,6 +18,7 @@ from dse.cython_utils cimport datetime_from_timestamp
 from cython.view cimport array as cython_array
 from dse.tuple cimport tuple_new, tuple_set
 
+import array as pyarray
 import socket
 from decimal import Decimal
 from uuid import UUID
@@ -186,19 +188,19 @@ cdef class _DesParameterizedType(Deserializer):
     cdef Deserializer[::1] deserializers
     cdef Py_ssize_t subtypes_len
 
-    def __init__(self, cqltype):
+    def __init__(self, cqltype, overrides=None):
         super().__init__(cqltype)
         self.subtypes = cqltype.subtypes
-        self.deserializers = make_deserializers(cqltype.subtypes)
+        self.deserializers = make_deserializers(cqltype.subtypes, overrides=overrides)
         self.subtypes_len = len(self.subtypes)
 
 
 cdef class _DesSingleParamType(_DesParameterizedType):
     cdef Deserializer deserializer
 
-    def __init__(self, cqltype):
+    def __init__(self, cqltype, overrides=None):
         assert cqltype.subtypes and len(cqltype.subtypes) == 1, cqltype.subtypes
-        super().__init__(cqltype)
+        super().__init__(cqltype, overrides)
         self.deserializer = self.deserializers[0]
 
 
@@ -281,8 +283,8 @@ cdef class DesMapType(_DesParameterizedType):
 
     cdef Deserializer key_deserializer, val_deserializer
 
-    def __init__(self, cqltype):
-        super().__init__(cqltype)
+    def __init__(self, cqltype, overrides=None):
+        super().__init__(cqltype, overrides)
         self.key_deserializer = self.deserializers[0]
         self.val_deserializer = self.deserializers[1]
 
@@ -415,6 +417,255 @@ cdef class DesFrozenType(_DesSingleParamType):
     cdef deserialize(self, Buffer *buf, int protocol_version):
         return from_binary(self.deserializer, buf, protocol_version)
 
+#--------------------------------------------------------------------------
+# DSE geometry types (WKB), DateRange and Duration
+
+# WKB values carry their own byte order: <flag><int type>[...], where a
+# non-zero flag means little endian, as in cqltypes
+cdef enum:
+    WKB_HEADER_SIZE = 5
+    POINT_SIZE = 16
+
+cdef inline double _unpack_double(const char *src, bint little):
+    cdef double ret
+    cdef char *out = <char*> &ret
+    cdef Py_ssize_t i
+    if little == is_little_endian:
+        memcpy(out, src, sizeof(double))
+    else:
+        for i in range(sizeof(double)):
+            out[sizeof(double) - i - 1] = src[i]
+    return ret
+
+
+cdef inline int32_t _unpack_int32(const char *src, bint little):
+    cdef int32_t ret
+    cdef char *out = <char*> &ret
+    cdef Py_ssize_t i
+    if little == is_little_endian:
+        memcpy(out, src, sizeof(int32_t))
+    else:
+        for i in range(sizeof(int32_t)):
+            out[sizeof(int32_t) - i - 1] = src[i]
+    return ret
+
+
+cdef inline bint _wkb_little_endian(Buffer *buf) except -1:
+    return buf_read(buf, WKB_HEADER_SIZE)[0] != 0
+
+
+cdef inline Py_ssize_t _wkb_count(Buffer *buf, Py_ssize_t offset, bint little) except -1:
+    """Read the point or ring count at offset"""
+    if offset + 4 > buf.size:
+        raise IndexError("Requested more than length of buffer")
+    cdef int32_t count = _unpack_int32(buf.ptr + offset, little)
+    if count < 0:
+        raise ValueError("Invalid WKB count: %d" % count)
+    return count
+
+
+cdef array _double_array_template = pyarray.array('d')
+
+cdef array _unpack_coord_array(Buffer *buf, Py_ssize_t offset, Py_ssize_t count, bint little):
+    """Unpack count points at offset as a flat array('d') of x, y values"""
+    cdef array res
+    cdef const char *src
+    cdef double *out
+    cdef Py_ssize_t i
+    if offset + count * POINT_SIZE > buf.size:
+        raise IndexError("Requested more than length of buffer")
+    res = clone(_double_array_template, 2 * count, False)
+    src = buf.ptr + offset
+    out = res.data.as_doubles
+    if little == is_little_endian:
+        memcpy(out, src, count * POINT_SIZE)
+    else:
+        for i in range(2 * count):
+            out[i] = _unpack_double(src, little)
+            src += 8
+    return res
+
+
+cdef class DesPointType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef bint little = _wkb_little_endian(buf)
+        if WKB_HEADER_SIZE + POINT_SIZE > buf.size:
+            raise IndexError("Requested more than length of buffer")
+        return util.Point(_unpack_double(buf.ptr + WKB_HEADER_SIZE, little),
+                          _unpack_double(buf.ptr + WKB_HEADER_SIZE + 8, little))
+
+
+cdef class DesLineStringType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef bint little = _wkb_little_endian(buf)
+        cdef Py_ssize_t count = _wkb_count(buf, WKB_HEADER_SIZE, little)
+        return util.LineString._from_coord_array(_unpack_coord_array(buf, WKB_HEADER_SIZE + 4, count, little))
+
+
+cdef class DesPolygonType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef bint little = _wkb_little_endian(buf)
+        cdef Py_ssize_t p = WKB_HEADER_SIZE
+        cdef Py_ssize_t ring_count, point_count, i
+        cdef list rings
+
+        ring_count = _wkb_count(buf, p, little)
+        if not ring_count:
+            return util.Polygon()
+        p += 4
+        rings = []
+        for i in range(ring_count):
+            point_count = _wkb_count(buf, p, little)
+            p += 4
+            rings.append(_unpack_coord_array(buf, p, point_count, little))
+            p += point_count * POINT_SIZE
+        return util.Polygon._from_coord_arrays(rings[0], rings[1:])
+
+
+# These produce the coordinates as flat arrays of doubles (x0, y0, x1, y1, ...)
+# rather than geometry objects, for applications handing them to numerical
+# code. They are selected per protocol handler with COORD_ARRAY_DESERIALIZERS
+# (see find_deserializer and protocol.cython_protocol_handler).
+cdef class DesLineStringTypeCoordArray(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef bint little = _wkb_little_endian(buf)
+        cdef Py_ssize_t count = _wkb_count(buf, WKB_HEADER_SIZE, little)
+        return _unpack_coord_array(buf, WKB_HEADER_SIZE + 4, count, little)
+
+
+cdef class DesPolygonTypeCoordArrays(Deserializer):
+    """Produces a list of coordinate arrays, the exterior ring first"""
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef bint little = _wkb_little_endian(buf)
+        cdef Py_ssize_t p = WKB_HEADER_SIZE
+        cdef Py_ssize_t ring_count, point_count, i
+        cdef list rings = []
+
+        ring_count = _wkb_count(buf, p, little)
+        p += 4
+        for i in range(ring_count):
+            point_count = _wkb_count(buf, p, little)
+            p += 4
+            rings.append(_unpack_coord_array(buf, p, point_count, little))
+            p += point_count * POINT_SIZE
+        return rings
+
+
+cdef dict _date_range_precisions = cqltypes.DateRangeType._precision_int_to_str_map
+
+cdef _date_range_bound(Buffer *buf, Py_ssize_t offset):
+    cdef Buffer bound_buf
+    slice_buffer(buf, &bound_buf, offset, 9)
+    cdef int64_t time = unpack_num[int64_t](&bound_buf)
+    slice_buffer(buf, &bound_buf, offset + 8, 1)
+    cdef int8_t precision = unpack_num[int8_t](&bound_buf)
+    if precision not in _date_range_precisions:
+        # let the cqltype raise its usual error
+        cqltypes.DateRangeType._decode_precision(precision)
+    return util.DateRangeBound(time, _date_range_precisions[precision])
+
+
+cdef class DesDateRangeType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        # <type>[<time0><precision0>[<time1><precision1>]]
+        cdef int8_t type_ = unpack_num[int8_t](buf)
+
+        if type_ == 0:  # SINGLE_DATE
+            return util.DateRange(value=_date_range_bound(buf, 1))
+        if type_ == 1:  # CLOSED_RANGE
+            return util.DateRange(lower_bound=_date_range_bound(buf, 1),
+                                  upper_bound=_date_range_bound(buf, 10))
+        if type_ == 2:  # OPEN_RANGE_HIGH
+            return util.DateRange(lower_bound=_date_range_bound(buf, 1),
+                                  upper_bound=util.OPEN_BOUND)
+        if type_ == 3:  # OPEN_RANGE_LOW
+            return util.DateRange(lower_bound=util.OPEN_BOUND,
+                                  upper_bound=_date_range_bound(buf, 1))
+        if type_ == 4:  # BOTH_OPEN_RANGE
+            return util.DateRange(lower_bound=util.OPEN_BOUND,
+                                  upper_bound=util.OPEN_BOUND)
+        if type_ == 5:  # SINGLE_DATE_OPEN
+            return util.DateRange(value=util.OPEN_BOUND)
+        raise ValueError('Could not deserialize %r' % (to_bytes(buf),))
+
+
+cdef inline int64_t _vint_unpack(Buffer *buf, Py_ssize_t *offset) except? -1:
+    """Unpack the zig-zag encoded vint at offset, see marshal.vints_unpack"""
+    cdef Py_ssize_t n = offset[0]
+    cdef uint8_t first_byte = <uint8_t> buf.ptr[n]
+    cdef uint64_t val
+    cdef int num_extra_bytes = 0
+
+    while num_extra_bytes < 8 and first_byte & (0x80 >> num_extra_bytes):
+        num_extra_bytes += 1
+    if n + num_extra_bytes >= buf.size:
+        raise IndexError("Requested more than length of buffer")
+
+    val = first_byte & (0xff >> num_extra_bytes)
+    for n in range(n + 1, n + 1 + num_extra_bytes):
+        val = (val << 8) | <uint8_t> buf.ptr[n]
+    offset[0] += 1 + num_extra_bytes
+    return <int64_t> (val >> 1) ^ -<int64_t> (val & 1)
+
+
+cdef class DesDurationType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef Py_ssize_t offset = 0
+        cdef int64_t values[3]
+        cdef int i = 0
+        while offset < buf.size:
+            if i == 3:
+                raise ValueError("too many values to unpack (expected 3)")
+            values[i] = _vint_unpack(buf, &offset)
+            i += 1
+        if i != 3:
+            raise ValueError("not enough values to unpack (expected 3, got %d)" % i)
+        return util.Duration(values[0], values[1], values[2])
+
+#--------------------------------------------------------------------------
+# Raw deserializers, returning primitive values rather than rich types:
+# timestamps as int milliseconds since the epoch, UUIDs and inet addresses
+# as their bytes, and decimals as (unscaled, scale) tuples
+
+cdef class DesRawDateType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        return unpack_num[int64_t](buf)
+
+
+cdef class DesRawUUIDType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        return to_bytes(buf)
+
+
+cdef class DesRawDecimalType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        cdef Buffer varint_buf
+        slice_buffer(buf, &varint_buf, 4, buf.size - 4)
+
+        cdef int32_t scale = unpack_num[int32_t](buf)
+        return varint_unpack(&varint_buf), scale
+
+
+cdef class DesRawInetAddressType(DesRawUUIDType):
+    pass
+
+
+# Deserializer overrides (see find_deserializer) for the raw deserializers
+RAW_DESERIALIZERS = {
+    'DateType': DesRawDateType,
+    'TimestampType': DesRawDateType,
+    'UUIDType': DesRawUUIDType,
+    'TimeUUIDType': DesRawUUIDType,
+    'DecimalType': DesRawDecimalType,
+    'InetAddressType': DesRawInetAddressType,
+}
+
+# Deserializer overrides for geometries as coordinate arrays
+COORD_ARRAY_DESERIALIZERS = {
+    'LineStringType': DesLineStringTypeCoordArray,
+    'PolygonType': DesPolygonTypeCoordArrays,
+}
+
 #--------------------------------------------------------------------------
 
 cdef _ret_empty(Deserializer deserializer, Py_ssize_t buf_size):
@@ -443,21 +694,54 @@ cdef class GenericDeserializer(Deserializer):
     def __repr__(self):
         return "GenericDeserializer(%s)" % (self.cqltype,)
 
+
+cdef class SkipDeserializer(Deserializer):
+    """
+    Stands in for the deserializer of a column left out of a column
+    projection: its values are not deserialized, but returned as None
+    """
+
+    def __init__(self, cqltype):
+        super().__init__(cqltype)
+        self.empty_binary_ok = True
+
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        return None
+
+    def __repr__(self):
+        return "SkipDeserializer(%s)" % (self.cqltype,)
+
 #--------------------------------------------------------------------------
 # Helper utilities
 
-def make_deserializers(cqltypes):
-    """Create an array of Deserializers for each given cqltype in cqltypes"""
+def make_deserializers(cqltypes, skipped=None, overrides=None):
+    """
+    Create an array of Deserializers for each given cqltype in cqltypes.
+    skipped optionally flags, for each cqltype, whether its values are to be
+    skipped rather than deserialized. See find_deserializer for overrides.
+    """
     cdef Deserializer[::1] deserializers
-    return obj_array([find_deserializer(ct) for ct in cqltypes])
+    if skipped:
+        return obj_array([SkipDeserializer(ct) if skip else find_deserializer(ct, overrides)
+                          for ct, skip in zip(cqltypes, skipped)])
+    return obj_array([find_deserializer(ct, overrides) for ct in cqltypes])
 
 
 cdef dict classes = globals()
 
-cpdef Deserializer find_deserializer(cqltype):
-    """Find a deserializer for a cqltype"""
+cpdef Deserializer find_deserializer(cqltype, dict overrides=None):
+    """
+    Find a deserializer for a cqltype.
+
+    overrides optionally maps cqltype names to the Deserializer classes to use
+    instead of the default ones, for the cqltype and the types nested in it
+    (e.g. RAW_DESERIALIZERS).
+    """
     name = 'Des' + cqltype.__name__
 
+    if overrides and cqltype.__name__ in overrides:
+        return overrides[cqltype.__name__](cqltype)
+
     if name in globals():
         cls = classes[name]
     elif issubclass(cqltype, cqltypes.ListType):
@@ -483,6 +767,8 @@ cpdef Deserializer find_deserializer(cqltype):
     else:
         cls = GenericDeserializer
 
+    if overrides and issubclass(cls, _DesParameterizedType):
+        return cls(cqltype, overrides)
     return cls(cqltype)
 
 
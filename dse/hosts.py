@@ -11,10 +11,11 @@
 Connection pooling and host management.
 """
 
-from functools import total_ordering
+from collections import deque
+from functools import partial, total_ordering
 import logging
 import time
-from threading import Lock, RLock, Condition
+from threading import RLock, Condition
 import weakref
 try:
     from weakref import WeakSet
@@ -298,25 +299,47 @@ class _HostReconnectionHandler(_ReconnectionHandler):
             return True
 
 
+_MIN_TRASH_INTERVAL = 10
+
+
 class HostConnection(object):
+    """
+    A pool of connections to a single host.
+
+    The pool opens :meth:`.Cluster.get_core_connections_per_host` connections up
+    front, and grows up to :meth:`.Cluster.get_max_connections_per_host` when
+    every open connection carries at least
+    :meth:`.Cluster.get_max_requests_per_connection` in-flight requests. Excess
+    connections are trashed again once their load drops to
+    :meth:`.Cluster.get_min_requests_per_connection` or less.
+
+    When every connection is at capacity, requests may wait in a bounded FIFO
+    queue (see :meth:`enqueue_borrow`), which is drained as responses free up
+    request IDs.
+    """
 
     host = None
     host_distance = None
     is_shutdown = False
 
     _session = None
-    _connection = None
+    _connections = None
     _lock = None
     _keyspace = None
+    _scheduled_for_creation = 0
+    _next_trash_allowed_at = 0
+    _waiters = 0
 
     def __init__(self, host, host_distance, session):
         self.host = host
         self.host_distance = host_distance
         self._session = weakref.proxy(session)
-        self._lock = Lock()
-        # this is used in conjunction with the connection streams. Not using the connection lock because the connection can be replaced in the lifetime of the pool.
+        self._lock = RLock()
+        # this is used in conjunction with the connection streams. Not using the connection lock because connections can be replaced in the lifetime of the pool.
         self._stream_available_condition = Condition(self._lock)
-        self._is_replacing = False
+        self._connections = []
+        self._trash = set()
+        self._pending = deque()
 
         if host_distance == HostDistance.IGNORED:
             log.debug("Not opening connection to ignored host %s", self.host)
@@ -325,74 +348,308 @@ class HostConnection(object):
             log.debug("Not opening connection to remote host %s", self.host)
             return
 
-        log.debug("Initializing connection for host %s", self.host)
-        self._connection = session.cluster.connection_factory(host.address)
+        log.debug("Initializing connection pool for host %s", self.host)
+        core_conns = session.cluster.get_core_connections_per_host(host_distance)
         self._keyspace = session.keyspace
-        if self._keyspace:
-            self._connection.set_keyspace_blocking(self._keyspace)
-        log.debug("Finished initializing connection for host %s", self.host)
+        connections = []
+        try:
+            for _ in range(core_conns):
+                conn = session.cluster.connection_factory(host.address)
+                connections.append(conn)
+                if self._keyspace:
+                    conn.set_keyspace_blocking(self._keyspace)
+        except Exception:
+            for conn in connections:
+                conn.close()
+            raise
+        self._connections = connections
+        self._next_trash_allowed_at = time.time()
+        log.debug("Finished initializing connection pool for host %s", self.host)
 
     def borrow_connection(self, timeout):
         if self.is_shutdown:
             raise ConnectionException(
                 "Pool for %s is shutdown" % (self.host,), self.host)
 
-        conn = self._connection
-        if not conn:
+        conns = self._connections
+        if not conns:
+            self.ensure_core_connections()
             raise NoConnectionsAvailable()
 
+        cluster = self._session.cluster
+        max_reqs = cluster.get_max_requests_per_connection(self.host_distance)
+        max_conns = cluster.get_max_connections_per_host(self.host_distance)
+
         start = time.time()
         remaining = timeout
         while True:
-            with conn.lock:
-                if conn.in_flight <= conn.max_request_id:
-                    conn.in_flight += 1
-                    return conn, conn.get_request_id()
+            least_busy = min(conns, key=lambda c: c.in_flight)
+            request_id = least_busy.get_request_id()
+            if request_id is not None:
+                in_flight = least_busy.in_flight
+                break
             if timeout is not None:
                 remaining = timeout - time.time() + start
                 if remaining < 0:
-                    break
+                    raise NoConnectionsAvailable("All request IDs are currently in use")
             with self._stream_available_condition:
-                self._stream_available_condition.wait(remaining)
+                # register before checking again, so that a request ID freed
+                # in between is either seen here or signaled by its return
+                self._waiters += 1
+                try:
+                    if all(c.in_flight > c.max_request_id for c in self._connections):
+                        self._stream_available_condition.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            if self.is_shutdown:
+                raise ConnectionException(
+                    "Pool for %s is shutdown" % (self.host,), self.host)
+            conns = self._connections
+            if not conns:
+                raise NoConnectionsAvailable()
+
+        # even the least busy connection is carrying a lot of requests; open another
+        # one if we are allowed to
+        if in_flight >= max_reqs and len(conns) < max_conns:
+            self._maybe_spawn_new_connection()
 
-        raise NoConnectionsAvailable("All request IDs are currently in use")
+        return least_busy, request_id
 
     def return_connection(self, connection):
-        with connection.lock:
-            connection.in_flight -= 1
-        with self._stream_available_condition:
-            self._stream_available_condition.notify()
-
-        if (connection.is_defunct or connection.is_closed) and not connection.signaled_error:
-            log.debug("Defunct or closed connection (%s) returned to pool, potentially "
-                      "marking host %s as down", id(connection), self.host)
-            is_down = self._session.cluster.signal_connection_failure(
-                self.host, connection.last_error, is_host_addition=False)
-            connection.signaled_error = True
-            if is_down:
-                self.shutdown()
-            else:
-                self._connection = None
+        # the request ID has already been freed by the connection
+        in_flight = connection.in_flight
+
+        if connection.is_defunct or connection.is_closed:
+            if not connection.signaled_error:
+                log.debug("Defunct or closed connection (%s) returned to pool, potentially "
+                          "marking host %s as down", id(connection), self.host)
+                is_down = self._session.cluster.signal_connection_failure(
+                    self.host, connection.last_error, is_host_addition=False)
+                connection.signaled_error = True
+                if is_down:
+                    self.shutdown()
+                else:
+                    self._replace(connection)
+            return
+
+        if connection in self._trash:
+            if in_flight == 0:
                 with self._lock:
-                    if self._is_replacing:
+                    if connection not in self._trash:
                         return
-                    self._is_replacing = True
-                    self._session.submit(self._replace, connection)
+                    self._trash.remove(connection)
+                log.debug("Closing trashed connection (%s) to %s", id(connection), self.host)
+                connection.close()
+            return
 
-    def _replace(self, connection):
-        log.debug("Replacing connection (%s) to %s", id(connection), self.host)
+        cluster = self._session.cluster
+        core_conns = cluster.get_core_connections_per_host(self.host_distance)
+        min_reqs = cluster.get_min_requests_per_connection(self.host_distance)
+        # the worst outcome of a race on in_flight here is a suboptimal pool
+        # size, which the next return corrects
+        if len(self._connections) > core_conns and in_flight <= min_reqs and \
+                time.time() >= self._next_trash_allowed_at:
+            self._maybe_trash_connection(connection)
+
+        if self._pending:
+            self._drain_pending()
+
+        if self._waiters:
+            with self._stream_available_condition:
+                self._stream_available_condition.notify()
+
+    def enqueue_borrow(self, callback, max_pending, timeout):
+        """
+        Queues ``callback(connection, request_id)`` to be called, in FIFO
+        order, once a request ID is free on one of the pool's connections.
+        This does not block: the callback is usually made from the event
+        loop, as responses free up request IDs.
+
+        If the request is still queued after ``timeout`` seconds, or the pool
+        shuts down, ``callback(None, exc)`` is called instead. Raises
+        :exc:`.NoConnectionsAvailable` if ``max_pending`` requests are already
+        queued.
+        """
+        with self._lock:
+            if self.is_shutdown:
+                raise ConnectionException(
+                    "Pool for %s is shutdown" % (self.host,), self.host)
+            if len(self._pending) >= max_pending:
+                raise NoConnectionsAvailable(
+                    "The request queue for host %s is full (%d requests)" % (self.host, max_pending))
+            pending = [callback, None]
+            self._pending.append(pending)
+
+        pending[1] = self._session.cluster._create_request_timer(
+            timeout, partial(self._expire_pending, pending, timeout))
+        # a request ID may have been freed before the request was queued
+        self._drain_pending()
+
+    def _drain_pending(self):
+        while self._pending:
+            conns = self._connections
+            if not conns:
+                return
+            least_busy = min(conns, key=lambda c: c.in_flight)
+            with self._lock:
+                if not self._pending:
+                    return
+                pending = self._pending.popleft()
+            request_id = least_busy.get_request_id()
+            if request_id is None:
+                with self._lock:
+                    self._pending.appendleft(pending)
+                return
+
+            callback, timer = pending
+            if timer:
+                timer.cancel()
+            cluster = self._session.cluster
+            if least_busy.in_flight >= cluster.get_max_requests_per_connection(self.host_distance) and \
+                    len(conns) < cluster.get_max_connections_per_host(self.host_distance):
+                self._maybe_spawn_new_connection()
+            try:
+                callback(least_busy, request_id)
+            except Exception:
+                log.exception("Unexpected error sending a queued request to host %s:", self.host)
+
+    def _expire_pending(self, pending, timeout):
+        with self._lock:
+            try:
+                self._pending.remove(pending)
+            except ValueError:
+                # already sent
+                return
+        pending[0](None, NoConnectionsAvailable(
+            "Timed out after %s seconds waiting for a connection to host %s" % (timeout, self.host)))
+
+    @property
+    def pending_count(self):
+        """
+        The number of requests queued waiting for a free connection.
+        """
+        return len(self._pending)
+
+    def _maybe_spawn_new_connection(self):
+        max_conns = self._session.cluster.get_max_connections_per_host(self.host_distance)
+        with self._lock:
+            if self.is_shutdown:
+                return
+            if len(self._connections) + self._scheduled_for_creation >= max_conns:
+                return
+            self._scheduled_for_creation += 1
+
+        log.debug("Submitting task for creation of new connection to %s", self.host)
+        self._session.submit(self._create_new_connection)
+
+    def _create_new_connection(self):
+        try:
+            self._add_conn_if_under_max()
+        except Exception:
+            log.exception("Unexpectedly failed to create new connection to %s", self.host)
+        finally:
+            with self._lock:
+                self._scheduled_for_creation -= 1
+
+    def _add_conn_if_under_max(self):
+        """
+        Opens a new connection if the pool is below its maximum size. Returns
+        :const:`False` if an attempt was made and failed, :const:`True` otherwise.
+        """
+        max_conns = self._session.cluster.get_max_connections_per_host(self.host_distance)
+        with self._lock:
+            if self.is_shutdown or len(self._connections) >= max_conns:
+                return True
+
+        log.debug("Opening new connection to host %s", self.host)
         try:
             conn = self._session.cluster.connection_factory(self.host.address)
             if self._keyspace:
                 conn.set_keyspace_blocking(self._keyspace)
-            self._connection = conn
-        except Exception:
-            log.warning("Failed reconnecting %s. Retrying." % (self.host.address,))
-            self._session.submit(self._replace, connection)
+        except AuthenticationFailed as exc:
+            log.warning("Failed to add new connection to pool for host %s: %s", self.host, exc)
+            return False
+        except Exception as exc:
+            log.warning("Failed to add new connection to pool for host %s: %s", self.host, exc)
+            if self._session.cluster.signal_connection_failure(self.host, exc, is_host_addition=False):
+                self.shutdown()
+            return False
+
+        with self._lock:
+            if self.is_shutdown:
+                conn.close()
+                return True
+            # copy on write, so borrowers can iterate without holding the lock
+            self._connections = self._connections + [conn]
+            self._next_trash_allowed_at = time.time() + _MIN_TRASH_INTERVAL
+            self._stream_available_condition.notify_all()
+        log.debug("Added new connection (%s) to pool for host %s", id(conn), self.host)
+        if self._pending:
+            self._drain_pending()
+        return True
+
+    def _maybe_trash_connection(self, connection):
+        core_conns = self._session.cluster.get_core_connections_per_host(self.host_distance)
+        with self._lock:
+            if connection not in self._connections or len(self._connections) <= core_conns:
+                return
+            new_connections = self._connections[:]
+            new_connections.remove(connection)
+            self._connections = new_connections
+            self._next_trash_allowed_at = time.time() + _MIN_TRASH_INTERVAL
+            self._trash.add(connection)
+
+        if connection.in_flight == 0:
+            with self._lock:
+                self._trash.discard(connection)
+            log.debug("Closing unused connection (%s) to %s", id(connection), self.host)
+            connection.close()
         else:
+            log.debug("Trashed connection (%s) to %s", id(connection), self.host)
+
+    def _replace(self, connection):
+        with self._lock:
+            if connection not in self._connections:
+                return
+            new_connections = self._connections[:]
+            new_connections.remove(connection)
+            self._connections = new_connections
+            self._scheduled_for_creation += 1
+
+        log.debug("Replacing connection (%s) to %s", id(connection), self.host)
+        connection.close()
+        self._session.submit(self._retrying_replace)
+
+    def _retrying_replace(self):
+        replaced = False
+        try:
+            replaced = self._add_conn_if_under_max()
+        except Exception:
+            log.exception("Failed replacing connection to %s", self.host)
+        if replaced or self.is_shutdown:
             with self._lock:
-                self._is_replacing = False
-                self._stream_available_condition.notify()
+                self._scheduled_for_creation -= 1
+        else:
+            log.warning("Failed reconnecting %s. Retrying." % (self.host.address,))
+            self._session.submit(self._retrying_replace)
+
+    def ensure_core_connections(self):
+        """
+        Schedules the creation of connections until the pool holds the
+        configured number of core connections.
+        """
+        if self.is_shutdown or self.host_distance == HostDistance.IGNORED:
+            return
+        cluster = self._session.cluster
+        if self.host_distance == HostDistance.REMOTE and not cluster.connect_to_remote_hosts:
+            return
+
+        core_conns = cluster.get_core_connections_per_host(self.host_distance)
+        with self._lock:
+            to_create = core_conns - (len(self._connections) + self._scheduled_for_creation)
+            for _ in range(to_create):
+                self._scheduled_for_creation += 1
+                self._session.submit(self._create_new_connection)
 
     def shutdown(self):
         with self._lock:
@@ -401,33 +658,61 @@ class HostConnection(object):
             else:
                 self.is_shutdown = True
             self._stream_available_condition.notify_all()
-
-        if self._connection:
-            self._connection.close()
+            connections = self._connections
+            trash = list(self._trash)
+            self._trash.clear()
+            pending = list(self._pending)
+            self._pending.clear()
+
+        for conn in connections:
+            conn.close()
+        for conn in trash:
+            conn.close()
+
+        if pending:
+            exc = ConnectionException("Pool for %s is shutdown" % (self.host,), self.host)
+            for callback, timer in pending:
+                if timer:
+                    timer.cancel()
+                callback(None, exc)
 
     def _set_keyspace_for_all_conns(self, keyspace, callback):
-        if self.is_shutdown or not self._connection:
+        if self.is_shutdown:
+            return
+
+        connections = self._connections
+        if not connections:
+            # connections opened later pick the keyspace up from the pool
+            self._keyspace = keyspace
+            callback(self, [])
             return
 
+        remaining_callbacks = set(connections)
+        errors = []
+
         def connection_finished_setting_keyspace(conn, error):
             self.return_connection(conn)
-            errors = [] if not error else [error]
-            callback(self, errors)
+            with self._lock:
+                remaining_callbacks.discard(conn)
+                if error:
+                    errors.append(error)
+                done = not remaining_callbacks
+            if done:
+                callback(self, errors)
 
         self._keyspace = keyspace
-        self._connection.set_keyspace_async(keyspace, connection_finished_setting_keyspace)
+        for conn in connections:
+            conn.set_keyspace_async(keyspace, connection_finished_setting_keyspace)
 
     def get_connections(self):
-        c = self._connection
-        return [c] if c else []
+        return list(self._connections)
 
     def get_state(self):
-        connection = self._connection
-        open_count = 1 if connection and not (connection.is_closed or connection.is_defunct) else 0
-        in_flights = [connection.in_flight] if connection else []
-        return {'shutdown': self.is_shutdown, 'open_count': open_count, 'in_flights': in_flights}
+        connections = self._connections
+        in_flights = [c.in_flight for c in connections]
+        return {'shutdown': self.is_shutdown, 'open_count': self.open_count, 'in_flights': in_flights,
+                'pending_requests': self.pending_count}
 
     @property
     def open_count(self):
-        connection = self._connection
-        return 1 if connection and not (connection.is_closed or connection.is_defunct) else 0
+        return sum(1 for c in self._connections if not (c.is_closed or c.is_defunct))
@@ -0,0 +1,348 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+import asyncio
+import atexit
+from functools import partial
+import logging
+from threading import Lock, Thread, current_thread
+import time
+import weakref
+
+try:
+    import ssl
+except ImportError:
+    ssl = None  # NOQA
+
+from dse.connection import Connection, ConnectionException, ConnectionShutdown, Timer, TimerManager
+
+log = logging.getLogger(__name__)
+
+
+def _cleanup(loop_weakref):
+    loop = loop_weakref()
+    if loop is not None:
+        loop._cleanup()
+
+
+def _ssl_context(ssl_options, check_hostname=False):
+    """
+    Builds an ``ssl.SSLContext`` from ``ssl.wrap_socket()`` style kwargs, as
+    accepted by :attr:`.Cluster.ssl_options`. The hostname is verified by
+    the context during the handshake if ``check_hostname`` is set.
+    """
+    context = ssl.SSLContext(ssl_options.get('ssl_version', ssl.PROTOCOL_SSLv23))
+    if ssl_options.get('certfile'):
+        context.load_cert_chain(ssl_options['certfile'], ssl_options.get('keyfile'))
+    context.check_hostname = False
+    context.verify_mode = ssl_options.get('cert_reqs', ssl.CERT_NONE)
+    if ssl_options.get('ca_certs'):
+        context.load_verify_locations(ssl_options['ca_certs'])
+    if ssl_options.get('ciphers'):
+        context.set_ciphers(ssl_options['ciphers'])
+    if check_hostname:
+        # this also requires a certificate if cert_reqs did not
+        context.check_hostname = True
+    return context
+
+
+class AsyncioLoop(object):
+    """
+    Wraps the ``asyncio`` event loop shared by all :class:`.AsyncioConnection`
+    instances, along with the driver timers scheduled on it.
+
+    If no loop is given, a private loop is created and run in a daemon thread.
+    """
+
+    _lock = None
+    _thread = None
+    _thread_ident = None
+    _timeout_handle = None
+    _timeout = None
+
+    def __init__(self, loop=None):
+        self._lock = Lock()
+        self._timers = TimerManager()
+        self._owns_loop = loop is None
+        self.loop = asyncio.new_event_loop() if loop is None else loop
+        if not self._owns_loop:
+            self.loop.call_soon_threadsafe(self._set_thread_ident)
+
+    def maybe_start(self):
+        with self._lock:
+            if self._owns_loop and not self._thread:
+                self._thread = Thread(target=self._run_loop, name="dse_driver_event_loop")
+                self._thread.daemon = True
+                self._thread.start()
+                atexit.register(partial(_cleanup, weakref.ref(self)))
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._set_thread_ident()
+        self.loop.run_forever()
+        log.debug("Asyncio event loop has exited")
+
+    def _set_thread_ident(self):
+        self._thread_ident = current_thread().ident
+
+    def _cleanup(self):
+        if self._thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                log.warning("Event loop thread could not be joined, so "
+                            "shutdown may not be clean. Please call "
+                            "Cluster.shutdown() to avoid this.")
+            else:
+                self.loop.close()
+            log.debug("Event loop thread was joined")
+            self._thread = None
+
+    def in_loop_thread(self):
+        return self._thread_ident == current_thread().ident
+
+    def call_soon(self, fn, *args):
+        """
+        Runs ``fn(*args)`` on the loop; this is safe to call from any thread.
+        """
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def add_timer(self, timer):
+        self._timers.add_timer(timer)
+        # the timeout handle may only be modified from the loop thread
+        if self.in_loop_thread():
+            self._schedule_timeout(timer.end)
+        else:
+            self.loop.call_soon_threadsafe(self._schedule_timeout, timer.end)
+
+    def _schedule_timeout(self, next_timeout):
+        if next_timeout:
+            if self._timeout_handle is not None:
+                if next_timeout >= self._timeout:
+                    return
+                self._timeout_handle.cancel()
+            delay = max(next_timeout - time.time(), 0)
+            self._timeout_handle = self.loop.call_later(delay, self._on_loop_timer)
+            self._timeout = next_timeout
+
+    def _on_loop_timer(self):
+        self._timeout_handle = None
+        self._timers.service_timeouts()
+        self._schedule_timeout(self._timers.next_timeout)
+
+
+class _AsyncioProtocol(getattr(asyncio, 'BufferedProtocol', asyncio.Protocol)):
+    """
+    Forwards transport events to an :class:`.AsyncioConnection`. Where
+    ``asyncio.BufferedProtocol`` is available (Python 3.7+), the transport
+    reads directly into the connection's read buffer.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def connection_made(self, transport):
+        self.connection.client_connection_made(transport)
+
+    def get_buffer(self, sizehint):
+        return self.connection.get_read_buffer()
+
+    def buffer_updated(self, nbytes):
+        self.connection.handle_read_into(nbytes)
+
+    def data_received(self, data):
+        self.connection.handle_read(data)
+
+    def connection_lost(self, exc):
+        self.connection.handle_close(exc)
+
+
+class AsyncioConnection(Connection):
+    """
+    An implementation of :class:`.Connection` that uses an ``asyncio`` event
+    loop, with a transport and protocol per connection.
+
+    By default, connections share a private loop run in a daemon thread.
+    Applications running their own loop can hand it to the driver with
+    :meth:`.set_event_loop` before connecting; responses are then processed on
+    that loop, and awaitables from :meth:`.Session.execute_aio` complete
+    without a thread handoff. Note that :meth:`.Cluster.connect` blocks while
+    connections are opened, so in that case it must be called from another
+    thread (e.g. ``loop.run_in_executor``).
+    """
+
+    _loop = None
+    _loop_lock = Lock()
+
+    _ssl_context_checks_hostname = True
+
+    _transport = None
+    _connect_task = None
+    _read_view = None
+
+    @classmethod
+    def initialize_reactor(cls):
+        with cls._loop_lock:
+            if not cls._loop:
+                cls._loop = AsyncioLoop()
+
+    @classmethod
+    def set_event_loop(cls, loop):
+        """
+        Runs all connections of this class on ``loop``, an ``asyncio`` event
+        loop owned and run by the application. This must be called before any
+        :class:`.Cluster` using this connection class connects.
+        """
+        with cls._loop_lock:
+            cls._loop = AsyncioLoop(loop)
+
+    @classmethod
+    def handle_fork(cls):
+        with cls._loop_lock:
+            cls._loop = None
+
+    @classmethod
+    def create_timer(cls, timeout, callback):
+        timer = Timer(timeout, callback)
+        cls._loop.add_timer(timer)
+        return timer
+
+    @classmethod
+    def factory(cls, host, timeout, *args, **kwargs):
+        if cls._loop and cls._loop.in_loop_thread():
+            raise ConnectionException("Connections cannot be opened from the event loop thread, "
+                                      "as that would block the loop they depend on", host)
+        return super(AsyncioConnection, cls).factory(host, timeout, *args, **kwargs)
+
+    def __init__(self, *args, **kwargs):
+        Connection.__init__(self, *args, **kwargs)
+
+        self._pending_writes = []
+        self._pushed = []
+        self._push_lock = Lock()
+
+        self._loop.maybe_start()
+        self._loop.call_soon(self._add_connection)
+
+    def _add_connection(self):
+        if self.is_closed:
+            return
+        ssl_context = server_hostname = None
+        if self.ssl_options:
+            if not ssl:
+                self.defunct(RuntimeError("This version of Python was not compiled with SSL support"))
+                return
+            ssl_context = _ssl_context(self.ssl_options, self._check_hostname)
+            server_hostname = self.host
+
+        loop = self._loop.loop
+        coro = loop.create_connection(partial(_AsyncioProtocol, self), self.host, self.port,
+                                      ssl=ssl_context, server_hostname=server_hostname)
+        self._connect_task = asyncio.ensure_future(coro, loop=loop)
+        timeout_handle = loop.call_later(self.connect_timeout, self._connect_task.cancel) if self.connect_timeout else None
+        self._connect_task.add_done_callback(partial(self._connect_done, timeout_handle))
+
+    def _connect_done(self, timeout_handle, task):
+        if timeout_handle:
+            timeout_handle.cancel()
+        if task.cancelled():
+            self.defunct(ConnectionException("Timed out connecting to %s:%s" % (self.host, self.port), self.host))
+        elif task.exception():
+            self.defunct(task.exception())
+
+    def client_connection_made(self, transport):
+        """
+        Called by the protocol once the transport is connected.
+        """
+        with self.lock:
+            if self.is_closed:
+                transport.close()
+                return
+            self._transport = transport
+
+        if self.sockopts:
+            sock = transport.get_extra_info('socket')
+            for args in self.sockopts:
+                sock.setsockopt(*args)
+        pending, self._pending_writes = self._pending_writes, None
+        for data in pending:
+            transport.write(data)
+        self._send_options_message()
+
+    def close(self):
+        with self.lock:
+            if self.is_closed:
+                return
+            self.is_closed = True
+
+        log.debug("Closing connection (%s) to %s", id(self), self.host)
+        self._loop.call_soon(self._close_transport)
+        log.debug("Closed socket to %s", self.host)
+
+        if not self.is_defunct:
+            self.error_all_requests(
+                ConnectionShutdown("Connection to %s was closed" % self.host))
+            # don't leave in-progress operations hanging
+            self.connected_event.set()
+
+    def _close_transport(self):
+        if self._transport:
+            self._transport.close()
+        elif self._connect_task:
+            self._connect_task.cancel()
+
+    def handle_close(self, exc=None):
+        if exc:
+            self.defunct(exc)
+        else:
+            log.debug("Connection %s closed by server", self)
+            self.close()
+
+    def handle_read(self, data):
+        self._iobuf.write(data)
+        self.process_io_buffer()
+
+    def get_read_buffer(self):
+        self._read_view = self._iobuf.reserve(self._next_read_size())
+        return self._read_view
+
+    def handle_read_into(self, nbytes):
+        # the transport is done with the view; release it so the buffer
+        # storage can be reused once the frames are processed
+        self._read_view.release()
+        self._read_view = None
+        self._iobuf.commit(nbytes)
+        self.recv_count += 1
+        self.recv_bytes += nbytes
+        self.process_io_buffer()
+
+    def push(self, data):
+        # transports are not thread-safe; write inline when already on the loop
+        if self._loop.in_loop_thread():
+            self._write(data)
+            return
+
+        # otherwise frames pushed before the loop gets to them are coalesced
+        # into a single write, and a single wakeup of the loop
+        with self._push_lock:
+            self._pushed.append(data)
+            schedule = len(self._pushed) == 1
+        if schedule:
+            self._loop.call_soon(self._flush_pushed)
+
+    def _flush_pushed(self):
+        with self._push_lock:
+            pushed, self._pushed = self._pushed, []
+        self._write(pushed[0] if len(pushed) == 1 else b''.join(pushed))
+
+    def _write(self, data):
+        if self._transport is not None:
+            if not self._transport.is_closing():
+                self._transport.write(data)
+        elif self._pending_writes is not None:
+            self._pending_writes.append(data)
@@ -7,7 +7,6 @@
 #
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 import atexit
-from collections import deque
 from functools import partial
 import logging
 import os
@@ -17,8 +16,6 @@ from threading import Lock, Thread
 import time
 import weakref
 
-from six.moves import range
-
 try:
     from weakref import WeakSet
 except ImportError:
@@ -31,7 +28,7 @@ try:
 except ImportError:
     ssl = None  # NOQA
 
-from dse.connection import Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager
+from dse.connection import Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager, _WriteQueue
 
 log = logging.getLogger(__name__)
 
@@ -288,8 +285,8 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
     def __init__(self, *args, **kwargs):
         Connection.__init__(self, *args, **kwargs)
 
-        self.deque = deque()
-        self.deque_lock = Lock()
+        self._write_queue = _WriteQueue(self.out_buffer_size)
+        self._write_lock = Lock()
 
         self._connect_socket()
         asyncore.dispatcher.__init__(self, self._socket, _dispatcher_map)
@@ -334,36 +331,31 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
 
     def handle_write(self):
         while True:
-            with self.deque_lock:
-                try:
-                    next_msg = self.deque.popleft()
-                except IndexError:
+            with self._write_lock:
+                if not self._write_queue:
                     self._writable = False
                     return
 
             try:
-                sent = self.send(next_msg)
+                sent = self._write_queue.send(self.socket)
                 self._readable = True
             except socket.error as err:
-                if (err.args[0] in NONBLOCKING):
-                    with self.deque_lock:
-                        self.deque.appendleft(next_msg)
-                else:
+                if err.args[0] not in NONBLOCKING:
                     self.defunct(err)
                 return
             else:
-                if sent < len(next_msg):
-                    with self.deque_lock:
-                        self.deque.appendleft(next_msg[sent:])
-                    if sent == 0:
-                        return
+                if sent == 0:
+                    return
 
     def handle_read(self):
         try:
             while True:
-                buf = self.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
-                if len(buf) < self.in_buffer_size:
+                size = self._next_read_size()
+                received = self._recv_into_buffer(self.socket, size)
+                if not received:
+                    self.handle_close()
+                    return
+                if received < size:
                     break
         except socket.error as err:
             if ssl and isinstance(err, ssl.SSLError):
@@ -374,22 +366,14 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
                 self.defunct(err)
                 return
 
-        if self._iobuf.tell():
+        if len(self._iobuf):
             self.process_io_buffer()
             if not self._requests and not self.is_control_connection:
                 self._readable = False
 
     def push(self, data):
-        sabs = self.out_buffer_size
-        if len(data) > sabs:
-            chunks = []
-            for i in range(0, len(data), sabs):
-                chunks.append(data[i:i + sabs])
-        else:
-            chunks = [data]
-
-        with self.deque_lock:
-            self.deque.extend(chunks)
+        self._write_queue.append(data)
+        with self._write_lock:
             self._writable = True
         self._loop.wake_loop()
 
@@ -8,15 +8,13 @@
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 import gevent
 import gevent.event
-from gevent.queue import Queue
+from gevent.queue import Queue, Empty
 from gevent import socket
 import gevent.ssl
 
 import logging
 import time
 
-from six.moves import range
-
 from dse.connection import Connection, ConnectionShutdown, Timer, TimerManager
 
 
@@ -103,8 +101,7 @@ class GeventConnection(Connection):
     def handle_write(self):
         while True:
             try:
-                next_msg = self._write_queue.get()
-                self._socket.sendall(next_msg)
+                self._socket.sendall(self._next_write())
             except socket.error as err:
                 log.debug("Exception in send for %s: %s", self, err)
                 self.defunct(err)
@@ -113,21 +110,34 @@ class GeventConnection(Connection):
     def handle_read(self):
         while True:
             try:
-                buf = self._socket.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
+                received = self._recv_into_buffer(self._socket, self._next_read_size())
             except socket.error as err:
                 log.debug("Exception in read for %s: %s", self, err)
                 self.defunct(err)
                 return  # leave the read loop
 
-            if buf and self._iobuf.tell():
+            if received and len(self._iobuf):
                 self.process_io_buffer()
             else:
                 log.debug("Connection %s closed by server", self)
                 self.close()
                 return
 
+    def _next_write(self):
+        """
+        Waits for the next queued frame, and coalesces it with any others
+        already queued, up to :attr:`~.Connection.out_buffer_size` bytes.
+        """
+        frames = [self._write_queue.get()]
+        size = len(frames[0])
+        while size < self.out_buffer_size:
+            try:
+                frame = self._write_queue.get_nowait()
+            except Empty:
+                break
+            frames.append(frame)
+            size += len(frame)
+        return frames[0] if len(frames) == 1 else b''.join(frames)
+
     def push(self, data):
-        chunk_size = self.out_buffer_size
-        for i in range(0, len(data), chunk_size):
-            self._write_queue.put(data[i:i + chunk_size])
+        self._write_queue.put(data)
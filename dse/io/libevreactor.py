@@ -7,7 +7,6 @@
 #
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 import atexit
-from collections import deque
 from functools import partial
 import logging
 import os
@@ -17,10 +16,8 @@ from threading import Lock, Thread
 import time
 import weakref
 
-from six.moves import range
-
 from dse.connection import (Connection, ConnectionShutdown,
-                                  NONBLOCKING, Timer, TimerManager)
+                                  NONBLOCKING, Timer, TimerManager, _WriteQueue)
 try:
     import dse.io.libevwrapper as libev
 except ImportError:
@@ -171,12 +168,12 @@ class LibevLoop(object):
     def _loop_will_run(self, prepare):
         changed = False
         for conn in self._live_conns:
-            if not conn.deque and conn._write_watcher_is_active:
+            if not conn._write_queue and conn._write_watcher_is_active:
                 if conn._write_watcher:
                     conn._write_watcher.stop()
                 conn._write_watcher_is_active = False
                 changed = True
-            elif conn.deque and not conn._write_watcher_is_active:
+            elif conn._write_queue and not conn._write_watcher_is_active:
                 conn._write_watcher.start()
                 conn._write_watcher_is_active = True
                 changed = True
@@ -250,8 +247,7 @@ class LibevConnection(Connection):
     def __init__(self, *args, **kwargs):
         Connection.__init__(self, *args, **kwargs)
 
-        self.deque = deque()
-        self._deque_lock = Lock()
+        self._write_queue = _WriteQueue(self.out_buffer_size)
         self._connect_socket()
         self._socket.setblocking(0)
 
@@ -292,26 +288,16 @@ class LibevConnection(Connection):
             self.defunct(exc)
             return
 
-        while True:
-            try:
-                with self._deque_lock:
-                    next_msg = self.deque.popleft()
-            except IndexError:
-                return
-
+        while self._write_queue:
             try:
-                sent = self._socket.send(next_msg)
+                sent = self._write_queue.send(self._socket)
             except socket.error as err:
-                if (err.args[0] in NONBLOCKING):
-                    with self._deque_lock:
-                        self.deque.appendleft(next_msg)
-                else:
+                if err.args[0] not in NONBLOCKING:
                     self.defunct(err)
                 return
             else:
-                if sent < len(next_msg):
-                    with self._deque_lock:
-                        self.deque.appendleft(next_msg[sent:])
+                if sent == 0:
+                    return
 
     def handle_read(self, watcher, revents, errno=None):
         if revents & libev.EV_ERROR:
@@ -324,9 +310,8 @@ class LibevConnection(Connection):
             return
         try:
             while True:
-                buf = self._socket.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
-                if len(buf) < self.in_buffer_size:
+                size = self._next_read_size()
+                if self._recv_into_buffer(self._socket, size) < size:
                     break
         except socket.error as err:
             if ssl and isinstance(err, ssl.SSLError):
@@ -337,21 +322,12 @@ class LibevConnection(Connection):
                 self.defunct(err)
                 return
 
-        if self._iobuf.tell():
+        if len(self._iobuf):
             self.process_io_buffer()
         else:
             log.debug("Connection %s closed by server", self)
             self.close()
 
     def push(self, data):
-        sabs = self.out_buffer_size
-        if len(data) > sabs:
-            chunks = []
-            for i in range(0, len(data), sabs):
-                chunks.append(data[i:i + sabs])
-        else:
-            chunks = [data]
-
-        with self._deque_lock:
-            self.deque.extend(chunks)
-            self._libevloop.notify()
+        self._write_queue.append(data)
+        self._libevloop.notify()
@@ -0,0 +1,432 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+import atexit
+from functools import partial
+from itertools import count
+import logging
+import os
+import selectors
+import socket
+from threading import Lock, Thread, current_thread
+import time
+import weakref
+
+try:
+    import ssl
+except ImportError:
+    ssl = None  # NOQA
+
+from dse.connection import Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager, _WriteQueue
+
+log = logging.getLogger(__name__)
+
+_READ = selectors.EVENT_READ
+_READ_WRITE = selectors.EVENT_READ | selectors.EVENT_WRITE
+
+
+def _cleanup(loop_weakref):
+    loop = loop_weakref()
+    if loop is not None:
+        loop._cleanup()
+
+
+class SelectorLoop(object):
+    """
+    An event loop over the best ``selectors`` implementation available on the
+    platform (epoll on Linux, kqueue on BSD and macOS), run in a daemon thread.
+
+    Sockets are always registered for reads, and for writes only while their
+    connection has data queued. Changes requested from other threads are
+    handed to the loop, which is woken through a socket pair.
+
+    Each loop has its own timers, and keeps track of the time it spends
+    waiting for events, so that its utilization can be reported.
+    """
+
+    def __init__(self):
+        self._pid = os.getpid()
+        self._lock = Lock()
+        self._started = False
+        self._shutdown = False
+        self._thread = None
+        self._thread_ident = None
+
+        self._selector = selectors.DefaultSelector()
+        self._timers = TimerManager()
+        self._next_timeout = None
+
+        self._idle_time = 0.0
+        self._select_started = None
+        self._sampled_at = time.time()
+        self._sampled_idle = 0.0
+
+        # registration changes requested from other threads, applied by the loop
+        self._changes = []
+        self._changes_lock = Lock()
+
+        self._notified = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(0)
+        self._wake_w.setblocking(0)
+        self._selector.register(self._wake_r, _READ)
+
+        atexit.register(partial(_cleanup, weakref.ref(self)))
+
+    def maybe_start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        log.debug("Starting selector event loop (%s)", type(self._selector).__name__)
+        self._thread = Thread(target=self._run_loop, name="dse_driver_event_loop")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def in_loop_thread(self):
+        return self._thread_ident == current_thread().ident
+
+    def notify(self):
+        if not self._notified:
+            self._notified = True
+            try:
+                self._wake_w.send(b'x')
+            except socket.error:
+                # the buffer is full, so the loop will wake anyway
+                pass
+
+    def _clear_notification(self):
+        # drain before resetting the flag, so that a notify() racing with
+        # the drain can't leave the flag set with nothing left to read
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except socket.error:
+            pass
+        self._notified = False
+
+    def add_timer(self, timer):
+        self._timers.add_timer(timer)
+        # only wake the loop when it would otherwise sleep past this timer
+        if not self.in_loop_thread() and (self._next_timeout is None or timer.end < self._next_timeout):
+            self.notify()
+
+    def call_soon(self, fn, *args):
+        """
+        Runs ``fn(*args)`` on the loop thread, inline if already on it.
+        """
+        if self.in_loop_thread():
+            fn(*args)
+            return
+        with self._changes_lock:
+            self._changes.append(partial(fn, *args))
+        self.notify()
+
+    def register(self, conn):
+        self._selector.register(conn._socket, _READ, conn)
+        conn._socket_registered = True
+
+    def arm_write(self, conn):
+        if conn._socket_registered and not conn.is_closed:
+            self._selector.modify(conn._socket, _READ_WRITE, conn)
+
+    def disarm_write(self, conn):
+        if conn._socket_registered and not conn.is_closed:
+            self._selector.modify(conn._socket, _READ, conn)
+
+    def unregister(self, conn):
+        # unregister before closing, so that the file descriptor can't be
+        # reused by another connection while still registered
+        if conn._socket_registered:
+            conn._socket_registered = False
+            try:
+                self._selector.unregister(conn._socket)
+            except (KeyError, ValueError):
+                pass
+        conn._socket.close()
+
+    def _run_loop(self):
+        self._thread_ident = current_thread().ident
+        select = self._selector.select
+        wake_r = self._wake_r
+        while not self._shutdown:
+            try:
+                if self._changes:
+                    with self._changes_lock:
+                        changes, self._changes = self._changes, []
+                    for change in changes:
+                        change()
+
+                self._next_timeout = next_end = self._timers.service_timeouts()
+                timeout = max(next_end - time.time(), 0) if next_end else None
+
+                self._select_started = started = time.time()
+                ready = select(timeout)
+                self._select_started = None
+                self._idle_time += time.time() - started
+
+                for key, events in ready:
+                    conn = key.data
+                    if conn is None:
+                        if key.fileobj is wake_r:
+                            self._clear_notification()
+                        continue
+                    if conn.is_closed:
+                        # closed by an earlier callback in this batch
+                        continue
+                    if events & selectors.EVENT_READ:
+                        conn.handle_read()
+                    if events & selectors.EVENT_WRITE and not conn.is_closed:
+                        conn.handle_write()
+            except Exception:
+                log.exception("Unexpected error in selector event loop:")
+
+        with self._lock:
+            self._started = False
+        log.debug("Selector event loop ended")
+
+    def utilization(self):
+        """
+        Returns the fraction of time the loop spent busy, rather than waiting
+        for events, since the previous call.
+        """
+        now = time.time()
+        idle = self._idle_time
+        select_started = self._select_started
+        if select_started is not None:
+            idle += now - select_started
+        elapsed = now - self._sampled_at
+        busy = elapsed - (idle - self._sampled_idle)
+        self._sampled_at, self._sampled_idle = now, idle
+        if elapsed <= 0 or not self._started:
+            return 0.0
+        return min(max(busy / elapsed, 0.0), 1.0)
+
+    def _cleanup(self):
+        self._shutdown = True
+        if not self._thread:
+            return
+
+        self.notify()
+        log.debug("Waiting for event loop thread to join...")
+        self._thread.join(timeout=1.0)
+        if self._thread.is_alive():
+            log.warning(
+                "Event loop thread could not be joined, so shutdown may not be clean. "
+                "Please call Cluster.shutdown() to avoid this.")
+        else:
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+        log.debug("Event loop thread was joined")
+
+
+class SelectorConnection(Connection):
+    """
+    An implementation of :class:`.Connection` that uses the ``selectors``
+    module from the Python standard library, which picks ``epoll`` on Linux.
+
+    This scales to many more connections than :class:`.AsyncoreConnection`,
+    without needing the libev C extension.
+
+    By default, all connections share a single event loop thread, which also
+    decodes responses and runs callbacks. :meth:`.set_loop_count` spreads
+    connections over several loops instead.
+    """
+
+    _loop = None
+    _loops = ()
+    _loop_count = 1
+    _loops_by_host = False
+    _next_loop = None
+    _loop_lock = Lock()
+
+    _socket = None
+    _socket_registered = False
+    _write_armed = False
+
+    @classmethod
+    def set_loop_count(cls, loop_count, by_host=False):
+        """
+        Runs connections on ``loop_count`` event loops, each in its own
+        thread and with its own timers. Connections are assigned to loops
+        round-robin or, if ``by_host`` is :const:`True`, by host address, so
+        that all connections to a host share a loop.
+
+        Frame decoding and response callbacks run on the loop that received
+        the response, so this helps spread that work over several cores when
+        it releases the GIL (for example, the Cython NumPy row parser). It
+        must be called before any :class:`.Cluster` using this connection
+        class connects.
+        """
+        if loop_count < 1:
+            raise ValueError("loop_count must be at least 1")
+        with cls._loop_lock:
+            if cls._loop:
+                raise ValueError("The event loops have already been started")
+            cls._loop_count = loop_count
+            cls._loops_by_host = by_host
+
+    @classmethod
+    def initialize_reactor(cls):
+        with cls._loop_lock:
+            if cls._loop and cls._loop._pid != os.getpid():
+                log.debug("Detected fork, clearing and reinitializing reactor state")
+                cls._handle_fork()
+            if not cls._loop:
+                cls._loops = tuple(SelectorLoop() for _ in range(cls._loop_count))
+                cls._loop = cls._loops[0]
+                cls._next_loop = count()
+
+    @classmethod
+    def handle_fork(cls):
+        with cls._loop_lock:
+            cls._handle_fork()
+
+    @classmethod
+    def _handle_fork(cls):
+        for loop in cls._loops:
+            loop._cleanup()
+        cls._loops = ()
+        cls._loop = None
+
+    @classmethod
+    def _pick_loop(cls, host=None):
+        loops = cls._loops
+        if len(loops) == 1:
+            return loops[0]
+        if host is not None:
+            return loops[hash(host) % len(loops)]
+        return loops[next(cls._next_loop) % len(loops)]
+
+    @classmethod
+    def create_timer(cls, timeout, callback):
+        timer = Timer(timeout, callback)
+        # keep timers set from a loop's callbacks on that loop
+        for loop in cls._loops:
+            if loop.in_loop_thread():
+                break
+        else:
+            loop = cls._pick_loop()
+        loop.add_timer(timer)
+        return timer
+
+    @classmethod
+    def get_loop_utilization(cls):
+        """
+        Returns, for each event loop, the fraction of time it spent busy
+        rather than waiting for events since the previous call.
+        """
+        return [loop.utilization() for loop in cls._loops]
+
+    def __init__(self, *args, **kwargs):
+        Connection.__init__(self, *args, **kwargs)
+
+        self._loop = self._pick_loop(self.host if self._loops_by_host else None)
+        self._write_queue = _WriteQueue(self.out_buffer_size)
+        self._connect_socket()
+        self._socket.setblocking(0)
+
+        self._loop.call_soon(self._register)
+
+        self._send_options_message()
+
+        # start the event loop if needed
+        self._loop.maybe_start()
+
+    def _register(self):
+        if self.is_closed:
+            return
+        self._loop.register(self)
+        if self._write_queue:
+            self._write_armed = True
+            self._loop.arm_write(self)
+
+    def close(self):
+        with self.lock:
+            if self.is_closed:
+                return
+            self.is_closed = True
+
+        log.debug("Closing connection (%s) to %s", id(self), self.host)
+        if self._loop._shutdown:
+            self._socket.close()
+        else:
+            self._loop.call_soon(self._loop.unregister, self)
+        log.debug("Closed socket to %s", self.host)
+
+        # don't leave in-progress operations hanging
+        if not self.is_defunct:
+            self.error_all_requests(
+                ConnectionShutdown("Connection to %s was closed" % self.host))
+
+            # this happens when the connection is shutdown while waiting for the ReadyMessage
+            if not self.connected_event.is_set():
+                self.last_error = ConnectionShutdown("Connection to %s was closed" % self.host)
+
+            self.connected_event.set()
+
+    def handle_write(self):
+        while self._write_queue:
+            try:
+                sent = self._write_queue.send(self._socket)
+            except socket.error as err:
+                if err.args[0] not in NONBLOCKING:
+                    self.defunct(err)
+                return
+            else:
+                if sent == 0:
+                    return
+
+        # drop write interest once drained; a push racing with this either
+        # sees the flag cleared and re-arms, or is seen by the check below
+        self._write_armed = False
+        if self._write_queue:
+            self._write_armed = True
+        else:
+            self._loop.disarm_write(self)
+
+    def handle_read(self):
+        try:
+            while True:
+                size = self._next_read_size()
+                received = self._recv_into_buffer(self._socket, size)
+                if not received:
+                    break
+                if received < size and not (ssl and isinstance(self._socket, ssl.SSLSocket) and self._socket.pending()):
+                    break
+        except socket.error as err:
+            if ssl and isinstance(err, ssl.SSLError):
+                if err.args[0] not in (ssl.SSL_ERROR_WANT_READ, ssl.SSL_ERROR_WANT_WRITE):
+                    self.defunct(err)
+                    return
+            elif err.args[0] not in NONBLOCKING:
+                self.defunct(err)
+                return
+            received = None
+
+        if len(self._iobuf):
+            self.process_io_buffer()
+
+        if received == 0:
+            log.debug("Connection %s closed by server", self)
+            self.close()
+
+    def push(self, data):
+        self._write_queue.append(data)
+        if not self._write_armed:
+            self._write_armed = True
+            self._loop.call_soon(self._arm_write)
+
+    def _arm_write(self):
+        if self._write_queue:
+            self._loop.arm_write(self)
+        else:
+            self._write_armed = False
@@ -20,6 +20,11 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+def _loop_utilization(connection_class):
+    get_loop_utilization = getattr(connection_class, 'get_loop_utilization', None)
+    return get_loop_utilization() if get_loop_utilization else None
+
+
 class Metrics(object):
     """
     A collection of timers and counters for various performance metrics.
@@ -106,6 +111,49 @@ class Metrics(object):
     the driver currently has open.
     """
 
+    pending_requests = None
+    """
+    A :class:`greplin.scales.IntStat` count of the number of requests
+    currently queued waiting for a connection to free up a request ID.
+    See :attr:`.Cluster.max_pending_requests_per_host`.
+    """
+
+    queued_requests = None
+    """
+    A :class:`greplin.scales.IntStat` count of the number of requests that
+    had to wait in a host's request queue.
+    """
+
+    queue_full_errors = None
+    """
+    A :class:`greplin.scales.IntStat` count of the number of times a
+    host's request queue was full, and the next host was tried instead.
+    """
+
+    queue_timeouts = None
+    """
+    A :class:`greplin.scales.IntStat` count of the number of queued
+    requests that timed out before a connection could take them.
+    """
+
+    reprepare_timer = None
+    """
+    A :class:`greplin.scales.PmfStat` timer for repreparing all known
+    statements on a node that comes up. See
+    :attr:`.Cluster.reprepare_on_up`.
+    """
+
+    event_loop_utilization = None
+    """
+    A :class:`greplin.scales.Stat` list with, for each event loop of the
+    :attr:`.Cluster.connection_class`, the fraction of time it spent busy
+    since the stat was last read. This is only reported by connection
+    classes that track it, such as
+    :class:`~.io.selectorreactor.SelectorConnection` (see
+    :meth:`~.io.selectorreactor.SelectorConnection.set_loop_count`), and is
+    :const:`None` otherwise.
+    """
+
     _stats_counter = 0
 
     def __init__(self, cluster_proxy):
@@ -122,6 +170,10 @@ class Metrics(object):
             scales.IntStat('other_errors'),
             scales.IntStat('retries'),
             scales.IntStat('ignores'),
+            scales.IntStat('queued_requests'),
+            scales.IntStat('queue_full_errors'),
+            scales.IntStat('queue_timeouts'),
+            scales.PmfStat('reprepare_timer'),
 
             # gauges
             scales.Stat('known_hosts',
@@ -129,7 +181,11 @@ class Metrics(object):
             scales.Stat('connected_to',
                 lambda: len(set(chain.from_iterable(s._pools.keys() for s in cluster_proxy.sessions)))),
             scales.Stat('open_connections',
-                lambda: sum(sum(p.open_count for p in s._pools.values()) for s in cluster_proxy.sessions)))
+                lambda: sum(sum(p.open_count for p in s._pools.values()) for s in cluster_proxy.sessions)),
+            scales.Stat('pending_requests',
+                lambda: sum(sum(p.pending_count for p in s._pools.values()) for s in cluster_proxy.sessions)),
+            scales.Stat('event_loop_utilization',
+                lambda: _loop_utilization(cluster_proxy.connection_class)))
 
         # TODO, to be removed in 4.0
         # /dse contains the metrics of the first cluster registered
@@ -147,6 +203,12 @@ class Metrics(object):
         self.known_hosts = self.stats.known_hosts
         self.connected_to = self.stats.connected_to
         self.open_connections = self.stats.open_connections
+        self.pending_requests = self.stats.pending_requests
+        self.event_loop_utilization = self.stats.event_loop_utilization
+        self.queued_requests = self.stats.queued_requests
+        self.queue_full_errors = self.stats.queue_full_errors
+        self.queue_timeouts = self.stats.queue_timeouts
+        self.reprepare_timer = self.stats.reprepare_timer
 
     def on_connection_error(self):
         self.stats.connection_errors += 1
@@ -169,6 +231,15 @@ class Metrics(object):
     def on_retry(self):
         self.stats.retries += 1
 
+    def on_request_queued(self):
+        self.stats.queued_requests += 1
+
+    def on_queue_full(self):
+        self.stats.queue_full_errors += 1
+
+    def on_queue_timeout(self):
+        self.stats.queue_timeouts += 1
+
     def get_stats(self):
         """
         Returns the metrics for the registered cluster instance.
@@ -11,6 +11,25 @@
 This module provides an optional protocol parser that returns
 NumPy arrays.
 
+By default, fixed-size numeric columns are decoded into masked arrays, and
+all other columns into arrays of Python objects. With ``native_types``,
+timestamps, dates, UUIDs, text, booleans and tinyints are decoded into
+masked arrays of native NumPy types too, so that no Python object is created
+per value:
+
+    - timestamp: ``datetime64[ms]``
+    - date: ``datetime64[D]``
+    - uuid, timeuuid: ``S16``, the 16 bytes of the UUID
+    - text, varchar, ascii: ``S<n>``, UTF-8 encoded and as wide as the
+      longest value of the page
+    - boolean: ``bool``
+    - tinyint: ``int8``
+
+Collections, tuples and UDTs are still decoded into arrays of Python
+objects. A native layout for them needs an offsets array alongside the
+values, which would no longer fit the single array per column that results
+and their pages are built from.
+
 =============================================================================
 This module should not be imported by any of the main python-driver modules,
 as numpy is an optional dependency.
@@ -20,7 +39,7 @@ as numpy is an optional dependency.
 include "ioutils.pyx"
 
 cimport cython
-from libc.stdint cimport uint64_t, uint8_t
+from libc.stdint cimport uint64_t, uint32_t, uint8_t, int64_t
 from cpython.ref cimport Py_INCREF, PyObject
 
 from dse.bytesio cimport BytesIOReader
@@ -41,18 +60,29 @@ cdef extern from "Python.h":
     ctypedef uint64_t Py_uintptr_t
 
 
+# How values are stored into non-object arrays
+cdef enum:
+    # fixed-size values, copied as they are (big-endian)
+    CONV_COPY = 0
+    # variable-size values (text), padded with zeros up to the stride
+    CONV_PAD = 1
+    # dates, from unsigned days with the epoch at 2**31 to native datetime64[D]
+    CONV_DATE = 2
+
 # Simple array descriptor, useful to parse rows into a NumPy array
 ctypedef struct ArrDesc:
     Py_uintptr_t buf_ptr
     int stride # should be large enough as we allocate contiguous arrays
     int is_object
     Py_uintptr_t mask_ptr
+    int conv
 
 arrDescDtype = np.dtype(
     [ ('buf_ptr', np.uintp)
     , ('stride', np.dtype('i'))
     , ('is_object', np.dtype('i'))
     , ('mask_ptr', np.uintp)
+    , ('conv', np.dtype('i'))
     ], align=True)
 
 _cqltype_to_numpy = {
@@ -64,12 +94,35 @@ _cqltype_to_numpy = {
     cqltypes.DoubleType:        np.dtype('>f8'),
 }
 
+_cqltype_to_numpy_native = dict(_cqltype_to_numpy)
+_cqltype_to_numpy_native.update({
+    cqltypes.DateType:          np.dtype('>M8[ms]'),
+    cqltypes.TimestampType:     np.dtype('>M8[ms]'),
+    cqltypes.SimpleDateType:    np.dtype('M8[D]'),
+    cqltypes.UUIDType:          np.dtype('S16'),
+    cqltypes.TimeUUIDType:      np.dtype('S16'),
+    cqltypes.BooleanType:       np.dtype('?'),
+    cqltypes.ByteType:          np.dtype('i1'),
+})
+
+_text_types = (cqltypes.UTF8Type, cqltypes.VarcharType, cqltypes.AsciiType)
+
 obj_dtype = np.dtype('O')
 
 cdef uint8_t mask_true = 0x01
 
 cdef class NumpyParser(ColumnParser):
-    """Decode a ResultMessage into a bunch of NumPy arrays"""
+    """
+    Decode a ResultMessage into a bunch of NumPy arrays
+
+    With ``native_types``, more column types are decoded into native
+    NumPy arrays rather than arrays of objects (see the module docstring).
+    """
+
+    cdef bint native_types
+
+    def __init__(self, native_types=False):
+        self.native_types = native_types
 
     cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
         cdef Py_ssize_t rowcount
@@ -77,7 +130,13 @@ cdef class NumpyParser(ColumnParser):
         cdef ArrDesc *arrs
 
         rowcount = read_int(reader)
-        array_descs, arrays = make_arrays(desc, rowcount)
+        widths = None
+        if self.native_types:
+            for coltype in desc.coltypes:
+                if coltype in _text_types:
+                    widths = value_widths(reader, desc, rowcount)
+                    break
+        array_descs, arrays = make_arrays(desc, rowcount, self.native_types, widths)
         arrs = &array_descs[0]
 
         _parse_rows(reader, desc, arrs, rowcount)
@@ -89,7 +148,26 @@ cdef class NumpyParser(ColumnParser):
 
 cdef _parse_rows(BytesIOReader reader, ParseDesc desc,
                  ArrDesc *arrs, Py_ssize_t rowcount):
-    cdef Py_ssize_t i
+    cdef Py_ssize_t i, pos
+    cdef bint native = True
+
+    for i in range(desc.rowsize):
+        if arrs[i].is_object:
+            native = False
+            break
+
+    if native:
+        # fixed-size columns only: no Python objects are created, so the
+        # rows are copied without holding the GIL
+        with nogil:
+            pos = unpack_native_rows(reader.buf_ptr, reader.pos, reader.size,
+                                     arrs, desc.rowsize, rowcount)
+        if pos == -1:
+            raise EOFError("Cannot read past the end of the file")
+        elif pos < 0:
+            raise ValueError("Value too large for its column type")
+        reader.pos = pos
+        return
 
     for i in range(rowcount):
         unpack_row(reader, desc, arrs)
@@ -97,7 +175,7 @@ cdef _parse_rows(BytesIOReader reader, ParseDesc desc,
 
 ### Helper functions to create NumPy arrays and array descriptors
 
-def make_arrays(ParseDesc desc, array_size):
+def make_arrays(ParseDesc desc, array_size, native_types=False, widths=None):
     """
     Allocate arrays for each result column.
 
@@ -105,12 +183,15 @@ def make_arrays(ParseDesc desc, array_size):
         'array_descs' describe the arrays for NativeRowParser and
         'arrays' is a dict mapping column names to arrays
             (e.g. this can be fed into pandas.DataFrame)
+
+    'widths' gives the size of the largest value of each column, which
+    sizes the text columns when decoding native types.
     """
     array_descs = np.empty((desc.rowsize,), arrDescDtype)
     arrays = []
 
     for i, coltype in enumerate(desc.coltypes):
-        arr = make_array(coltype, array_size)
+        arr = make_array(coltype, array_size, native_types, widths[i] if widths is not None else 0)
         array_descs[i]['buf_ptr'] = arr.ctypes.data
         array_descs[i]['stride'] = arr.strides[0]
         array_descs[i]['is_object'] = arr.dtype is obj_dtype
@@ -118,23 +199,62 @@ def make_arrays(ParseDesc desc, array_size):
             array_descs[i]['mask_ptr'] = arr.mask.ctypes.data
         except AttributeError:
             array_descs[i]['mask_ptr'] = 0
+        array_descs[i]['conv'] = array_conv(coltype, native_types)
         arrays.append(arr)
 
     return array_descs, arrays
 
 
-def make_array(coltype, array_size):
+def make_array(coltype, array_size, native_types=False, width=0):
     """
     Allocate a new NumPy array of the given column type and size.
     """
-    try:
-        a = np.ma.empty((array_size,), dtype=_cqltype_to_numpy[coltype])
-        a.mask = np.zeros((array_size,), dtype=np.bool)
-    except KeyError:
-        a = np.empty((array_size,), dtype=obj_dtype)
+    if native_types:
+        if coltype in _text_types:
+            dtype = np.dtype('S%d' % max(width, 1))
+        else:
+            dtype = _cqltype_to_numpy_native.get(coltype)
+    else:
+        dtype = _cqltype_to_numpy.get(coltype)
+
+    if dtype is None:
+        return np.empty((array_size,), dtype=obj_dtype)
+
+    if dtype.kind == 'S':
+        # values shorter than the column are padded with zeros
+        a = np.ma.zeros((array_size,), dtype=dtype)
+    else:
+        a = np.ma.empty((array_size,), dtype=dtype)
+    a.mask = np.zeros((array_size,), dtype=np.bool_)
     return a
 
 
+def array_conv(coltype, native_types):
+    if native_types:
+        if coltype in _text_types:
+            return CONV_PAD
+        elif coltype is cqltypes.SimpleDateType:
+            return CONV_DATE
+    return CONV_COPY
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def value_widths(BytesIOReader reader, ParseDesc desc, Py_ssize_t rowcount):
+    """
+    Returns the size of the largest value of each column, without moving
+    the reader.
+    """
+    cdef int32_t[::1] widths = np.zeros((max(desc.rowsize, 1),), dtype=np.int32)
+    cdef Py_ssize_t pos
+    with nogil:
+        pos = scan_value_widths(reader.buf_ptr, reader.pos, reader.size,
+                                &widths[0], desc.rowsize, rowcount)
+    if pos < 0:
+        raise EOFError("Cannot read past the end of the file")
+    return list(widths[:desc.rowsize])
+
+
 #### Parse rows into NumPy arrays
 
 @cython.boundscheck(False)
@@ -155,7 +275,8 @@ cdef inline int unpack_row(
             Py_INCREF(val)
             (<PyObject **> arr.buf_ptr)[0] = <PyObject *> val
         elif buf.size >= 0:
-            memcpy(<char *> arr.buf_ptr, buf.ptr, buf.size)
+            if store_value(&arr, buf.ptr, buf.size) < 0:
+                raise ValueError("Value too large for column %s" % (desc.colnames[i],))
         else:
             memcpy(<char *>arr.mask_ptr, &mask_true, 1)
 
@@ -166,15 +287,109 @@ cdef inline int unpack_row(
     return 0
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t unpack_native_rows(
+        char *buf, Py_ssize_t pos, Py_ssize_t size, ArrDesc *arrays,
+        Py_ssize_t rowsize, Py_ssize_t rowcount) nogil:
+    """
+    Same as unpack_row for each row, for non-object columns only. Returns the
+    new position in buf, -1 if the rows run past its end, or -2 if a value
+    doesn't fit its column.
+    """
+    cdef Py_ssize_t row, i
+    cdef int32_t val_size
+    cdef uint8_t *p
+    for row in range(rowcount):
+        for i in range(rowsize):
+            if pos + 4 > size:
+                return -1
+            p = <uint8_t *> (buf + pos)
+            val_size = <int32_t> ((<uint32_t> p[0] << 24) | (<uint32_t> p[1] << 16) |
+                                  (<uint32_t> p[2] << 8) | <uint32_t> p[3])
+            pos += 4
+
+            if val_size >= 0:
+                if pos + val_size > size:
+                    return -1
+                if store_value(&arrays[i], buf + pos, val_size) < 0:
+                    return -2
+                pos += val_size
+            else:
+                memcpy(<char *> arrays[i].mask_ptr, &mask_true, 1)
+
+            arrays[i].buf_ptr += arrays[i].stride
+            arrays[i].mask_ptr += 1
+    return pos
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int store_value(ArrDesc *arr, char *ptr, int32_t size) nogil:
+    """
+    Store a non-null value into a non-object array. Returns -1 if it doesn't
+    fit.
+    """
+    cdef uint8_t *p
+    cdef int64_t days
+    if size == 0 and arr.conv != CONV_PAD:
+        # empty values of types other than text decode to None
+        memcpy(<char *> arr.mask_ptr, &mask_true, 1)
+        return 0
+
+    if arr.conv == CONV_DATE:
+        if size != 4:
+            return -1
+        p = <uint8_t *> ptr
+        days = <int64_t> ((<uint32_t> p[0] << 24) | (<uint32_t> p[1] << 16) |
+                          (<uint32_t> p[2] << 8) | <uint32_t> p[3]) - (<int64_t> 1 << 31)
+        memcpy(<char *> arr.buf_ptr, &days, 8)
+        return 0
+
+    if size > arr.stride:
+        return -1
+    memcpy(<char *> arr.buf_ptr, ptr, size)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t scan_value_widths(
+        char *buf, Py_ssize_t pos, Py_ssize_t size, int32_t *widths,
+        Py_ssize_t rowsize, Py_ssize_t rowcount) nogil:
+    """
+    Record the size of the largest value of each column in widths. Returns
+    the position after the rows, or -1 if they run past the end of buf.
+    """
+    cdef Py_ssize_t row, i
+    cdef int32_t val_size
+    cdef uint8_t *p
+    for row in range(rowcount):
+        for i in range(rowsize):
+            if pos + 4 > size:
+                return -1
+            p = <uint8_t *> (buf + pos)
+            val_size = <int32_t> ((<uint32_t> p[0] << 24) | (<uint32_t> p[1] << 16) |
+                                  (<uint32_t> p[2] << 8) | <uint32_t> p[3])
+            pos += 4
+            if val_size > 0:
+                if pos + val_size > size:
+                    return -1
+                if val_size > widths[i]:
+                    widths[i] = val_size
+                pos += val_size
+    return pos
+
+
 def make_native_byteorder(arr):
     """
     Make sure all values have a native endian in the NumPy arrays.
     """
-    if is_little_endian and not arr.dtype.kind == 'O':
+    if is_little_endian and arr.dtype.byteorder == '>':
         # We have arrays in big-endian order. First swap the bytes
         # into little endian order, and then update the numpy dtype
         # accordingly (e.g. from '>i8' to '<i8')
         #
-        # Ignore any object arrays of dtype('O')
+        # Object, byte string and native arrays are left as they are
         return arr.byteswap().newbyteorder()
     return arr
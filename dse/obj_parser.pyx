@@ -9,6 +9,8 @@
 
 include "ioutils.pyx"
 
+from libc.stdlib cimport malloc, free
+
 from dse import DriverException
 from dse.bytesio cimport BytesIOReader
 from dse.deserializers cimport Deserializer, from_binary
@@ -42,6 +44,135 @@ def parse_rows_lazy(BytesIOReader reader, ParseDesc desc):
     return (rowparser.unpack_row(reader, desc) for i in range(rowcount))
 
 
+cdef class LazyRowParser(ColumnParser):
+    """
+    Decode a ResultMessage into a list of LazyRow objects, which decode
+    their columns on first access
+    """
+
+    cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
+        cdef Py_ssize_t i, rowcount
+        rowcount = read_int(reader)
+        return [make_lazy_row(reader, desc) for i in range(rowcount)]
+
+
+cdef object _NOT_DECODED = object()
+
+
+cdef LazyRow make_lazy_row(BytesIOReader reader, ParseDesc desc):
+    cdef LazyRow row = LazyRow.__new__(LazyRow)
+    cdef Py_ssize_t i, size
+    row.reader = reader
+    row.desc = desc
+    row.rowsize = desc.rowsize
+    row.offsets = <Py_ssize_t *> malloc(max(row.rowsize, 1) * sizeof(Py_ssize_t))
+    if row.offsets == NULL:
+        raise MemoryError()
+    for i in range(row.rowsize):
+        # remember where each value starts, and skip over it
+        row.offsets[i] = reader.pos
+        size = read_int(reader)
+        if size > 0:
+            reader.read(size)
+    row.values = [_NOT_DECODED] * row.rowsize
+    return row
+
+
+cdef class LazyRow:
+    """
+    A row that keeps a reference to the raw result page, and only decodes
+    a column when it is first accessed. Decoded values are kept.
+
+    It behaves like the tuple :class:`.ListParser` would return, so it
+    works with the row factories. :func:`~.tuple_factory` keeps it lazy,
+    and the other factories decode every column. Columns can also be
+    looked up by name, as in ``row['name']``.
+    """
+
+    cdef BytesIOReader reader
+    cdef ParseDesc desc
+    cdef Py_ssize_t rowsize
+    cdef Py_ssize_t *offsets
+    cdef list values
+
+    def __dealloc__(self):
+        free(self.offsets)
+
+    cdef object decode(self, Py_ssize_t i):
+        cdef Buffer buf
+        cdef int32_t size
+        cdef Deserializer deserializer
+        val = self.values[i]
+        if val is not _NOT_DECODED:
+            return val
+
+        # as get_buf does, without moving the reader
+        buf.ptr = self.reader.buf_ptr + self.offsets[i]
+        buf.size = 4
+        size = unpack_num[int32_t](&buf)
+        from_ptr_and_size(buf.ptr + 4 if size > 0 else NULL, size, &buf)
+        deserializer = self.desc.deserializers[i]
+        try:
+            val = from_binary(deserializer, &buf, self.desc.protocol_version)
+        except Exception as e:
+            raise DriverException('Failed decoding result column "%s" of type %s: %s' % (self.desc.colnames[i],
+                                                                                         self.desc.coltypes[i].cql_parameterized_type(),
+                                                                                         str(e)))
+        self.values[i] = val
+        return val
+
+    def __len__(self):
+        return self.rowsize
+
+    def __getitem__(self, key):
+        cdef Py_ssize_t i
+        if isinstance(key, slice):
+            return tuple([self.decode(i) for i in range(*key.indices(self.rowsize))])
+        if isinstance(key, six.string_types):
+            try:
+                i = self.desc.colnames.index(key)
+            except ValueError:
+                raise KeyError(key)
+            return self.decode(i)
+        i = key
+        if i < 0:
+            i += self.rowsize
+        if not 0 <= i < self.rowsize:
+            raise IndexError("row index out of range")
+        return self.decode(i)
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        for i in range(self.rowsize):
+            yield self.decode(i)
+
+    def __richcmp__(self, other, int op):
+        # compare as tuples
+        x = tuple(self) if isinstance(self, LazyRow) else self
+        y = tuple(other) if isinstance(other, LazyRow) else other
+        if op == 0:
+            return x < y
+        elif op == 1:
+            return x <= y
+        elif op == 2:
+            return x == y
+        elif op == 3:
+            return x != y
+        elif op == 4:
+            return x > y
+        else:
+            return x >= y
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+
 cdef class TupleRowParser(RowParser):
     """
     Parse a single returned row into a tuple of objects:
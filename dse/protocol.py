@@ -64,6 +64,9 @@ _message_types_by_opcode = {}
 
 _UNSET_VALUE = object()
 
+_HEADER_LENGTH = 9
+_EMPTY_HEADER = b'\x00' * _HEADER_LENGTH
+
 
 def register_class(cls):
     _message_types_by_opcode[cls.opcode] = cls
@@ -635,6 +638,9 @@ class ResultMessage(_MessageType):
     pk_indexes = None
     schema_change_event = None
 
+    # names of the columns to decode in rows, see Statement.column_projection
+    column_projection = None
+
     def __init__(self, kind):
         self.kind = kind
 
@@ -653,9 +659,10 @@ class ResultMessage(_MessageType):
             raise DriverException("Unknown RESULT kind: %d" % self.kind)
 
     @classmethod
-    def recv_body(cls, f, protocol_version, user_type_map, result_metadata):
+    def recv_body(cls, f, protocol_version, user_type_map, result_metadata, column_projection=None):
         kind = read_int(f)
         msg = cls(kind)
+        msg.column_projection = column_projection
         msg.recv(f, protocol_version, user_type_map, result_metadata)
         return msg
 
@@ -666,16 +673,20 @@ class ResultMessage(_MessageType):
         rows = [self.recv_row(f, len(column_metadata)) for _ in range(rowcount)]
         self.column_names = [c[2] for c in column_metadata]
         self.column_types = [c[3] for c in column_metadata]
+        decoders = [ctype.from_binary for ctype in self.column_types]
+        if self.column_projection:
+            decoders = [decode if name in self.column_projection else _skip_value
+                        for name, decode in zip(self.column_names, decoders)]
         try:
             self.parsed_rows = [
-                tuple(ctype.from_binary(val, protocol_version)
-                      for ctype, val in zip(self.column_types, row))
+                tuple(decode(val, protocol_version)
+                      for decode, val in zip(decoders, row))
                 for row in rows]
         except Exception:
             for row in rows:
                 for i in range(len(row)):
                     try:
-                        self.column_types[i].from_binary(row[i], protocol_version)
+                        decoders[i](row[i], protocol_version)
                     except Exception as e:
                         raise DriverException('Failed decoding result column "%s" of type %s: %s' % (self.column_names[i],
                                                                                                      self.column_types[i].cql_parameterized_type(),
@@ -962,18 +973,16 @@ class _ProtocolHandler(object):
         :param compressor: optional compression function to be used on the body
         """
         flags = 0
-        body = io.BytesIO()
+        buff = io.BytesIO()
+        # leave room for the header, which is written once the body length is known
+        buff.write(_EMPTY_HEADER)
         if msg.custom_payload:
             if protocol_version < 4:
                 raise UnsupportedOperation("Custom key/value payloads can only be used with protocol version 4 or higher")
             flags |= CUSTOM_PAYLOAD_FLAG
-            write_bytesmap(body, msg.custom_payload)
-        msg.send_body(body, protocol_version)
-        body = body.getvalue()
-
-        if compressor and len(body) > 0:
-            body = compressor(body)
-            flags |= COMPRESSED_FLAG
+            write_bytesmap(buff, msg.custom_payload)
+        msg.send_body(buff, protocol_version)
+        body_length = buff.tell() - _HEADER_LENGTH
 
         if msg.tracing:
             flags |= TRACING_FLAG
@@ -981,10 +990,13 @@ class _ProtocolHandler(object):
         if allow_beta_protocol_version:
             flags |= USE_BETA_FLAG
 
-        buff = io.BytesIO()
-        cls._write_header(buff, protocol_version, flags, stream_id, msg.opcode, len(body))
-        buff.write(body)
+        if compressor and body_length > 0:
+            body = compressor(buff.getvalue()[_HEADER_LENGTH:])
+            flags |= COMPRESSED_FLAG
+            return header_pack(protocol_version, flags, stream_id, msg.opcode) + int32_pack(len(body)) + body
 
+        buff.seek(0)
+        cls._write_header(buff, protocol_version, flags, stream_id, msg.opcode, body_length)
         return buff.getvalue()
 
     @staticmethod
@@ -997,7 +1009,7 @@ class _ProtocolHandler(object):
 
     @classmethod
     def decode_message(cls, protocol_version, user_type_map, stream_id, flags, opcode, body,
-                       decompressor, result_metadata):
+                       decompressor, result_metadata, column_projection=None):
         """
         Decodes a native protocol message body
 
@@ -1008,6 +1020,9 @@ class _ProtocolHandler(object):
         :param opcode: native protocol opcode from the header
         :param body: frame body
         :param decompressor: optional decompression function to inflate the body
+        :param result_metadata: column metadata of result rows sent without it
+        :param column_projection: optional set of the names of the columns to decode in result rows; the values
+            of other columns are skipped and decoded as None
         :return: a message decoded from the body and frame attributes
         """
         if flags & COMPRESSED_FLAG:
@@ -1041,7 +1056,7 @@ class _ProtocolHandler(object):
             log.warning("Unknown protocol flags set: %02x. May cause problems.", flags)
 
         msg_class = cls.message_types_by_opcode[opcode]
-        msg = msg_class.recv_body(body, protocol_version, user_type_map, result_metadata)
+        msg = msg_class.recv_body(body, protocol_version, user_type_map, result_metadata, column_projection)
         msg.stream_id = stream_id
         msg.trace_id = trace_id
         msg.custom_payload = custom_payload
@@ -1053,12 +1068,18 @@ class _ProtocolHandler(object):
 
         return msg
 
-def cython_protocol_handler(colparser):
+def cython_protocol_handler(colparser, deserializer_overrides=None):
     """
     Given a column parser to deserialize ResultMessages, return a suitable
     Cython-based protocol handler.
 
-    There are three Cython-based protocol handlers:
+    deserializer_overrides optionally maps cqltype names to the
+    deserializers.Deserializer classes to decode their values with, instead
+    of the default ones. deserializers.RAW_DESERIALIZERS decodes timestamps,
+    UUIDs, decimals and inet addresses into primitive values (see
+    RawProtocolHandler).
+
+    There are four Cython-based protocol handlers:
 
         - obj_parser.ListParser
             decodes result messages into a list of tuples
@@ -1066,12 +1087,21 @@ def cython_protocol_handler(colparser):
         - obj_parser.LazyParser
             decodes result messages lazily by returning an iterator
 
+        - obj_parser.LazyRowParser
+            decodes result messages into a list of rows whose columns are
+            decoded on first access
+
         - numpy_parser.NumPyParser
-            decodes result messages into NumPy arrays
+            decodes result messages into NumPy arrays, optionally of native
+            types for timestamps, dates, UUIDs and text too
 
     The default is to use obj_parser.ListParser
+
+    All of them encode QUERY, EXECUTE and BATCH messages with
+    protocol_encoder.encode_message.
     """
     from dse.row_parser import make_recv_results_rows
+    from dse.protocol_encoder import encode_message as fast_encode_message
 
     class FastResultMessage(ResultMessage):
         """
@@ -1080,7 +1110,7 @@ def cython_protocol_handler(colparser):
         """
         # type_codes = ResultMessage.type_codes.copy()
         code_to_type = dict((v, k) for k, v in ResultMessage.type_codes.items())
-        recv_results_rows = make_recv_results_rows(colparser)
+        recv_results_rows = make_recv_results_rows(colparser, deserializer_overrides)
 
     class CythonProtocolHandler(_ProtocolHandler):
         """
@@ -1093,24 +1123,39 @@ def cython_protocol_handler(colparser):
 
         col_parser = colparser
 
+        @classmethod
+        def encode_message(cls, msg, stream_id, protocol_version, compressor, allow_beta_protocol_version):
+            frame = fast_encode_message(msg, stream_id, protocol_version, compressor, allow_beta_protocol_version)
+            if frame is None:
+                frame = super(CythonProtocolHandler, cls).encode_message(msg, stream_id, protocol_version,
+                                                                         compressor, allow_beta_protocol_version)
+            return frame
+
     return CythonProtocolHandler
 
 
 if HAVE_CYTHON:
-    from dse.obj_parser import ListParser, LazyParser
+    from dse.obj_parser import ListParser, LazyParser, LazyRowParser
+    from dse.deserializers import RAW_DESERIALIZERS
     ProtocolHandler = cython_protocol_handler(ListParser())
     LazyProtocolHandler = cython_protocol_handler(LazyParser())
+    LazyRowProtocolHandler = cython_protocol_handler(LazyRowParser())
+    RawProtocolHandler = cython_protocol_handler(ListParser(), RAW_DESERIALIZERS)
 else:
     # Use Python-based ProtocolHandler
     ProtocolHandler = _ProtocolHandler
     LazyProtocolHandler = None
+    LazyRowProtocolHandler = None
+    RawProtocolHandler = None
 
 
 if HAVE_CYTHON and HAVE_NUMPY:
     from dse.numpy_parser import NumpyParser
     NumpyProtocolHandler = cython_protocol_handler(NumpyParser())
+    NumpyNativeProtocolHandler = cython_protocol_handler(NumpyParser(native_types=True))
 else:
     NumpyProtocolHandler = None
+    NumpyNativeProtocolHandler = None
 
 
 def read_byte(f):
@@ -1264,6 +1309,11 @@ def read_value(f):
     return f.read(size)
 
 
+def _skip_value(byts, protocol_version):
+    # decoder of the columns left out of a column projection
+    return None
+
+
 def write_value(f, v):
     if v is None:
         write_int(f, -1)
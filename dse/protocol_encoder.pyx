@@ -0,0 +1,298 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+"""
+Encodes QUERY, EXECUTE and BATCH messages, header included, into a single
+buffer, without going through a BytesIO and the per-field write_* functions
+of dse.protocol.
+
+This is used by the Cython protocol handlers (see
+dse.protocol.cython_protocol_handler). Other messages are left to the
+Python implementation.
+"""
+
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t
+from libc.stdlib cimport malloc, realloc, free
+from libc.string cimport memcpy
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_GET_SIZE, PyBytes_FromStringAndSize
+
+import six
+
+from dse import ProtocolVersion
+from dse.protocol import (QueryMessage, ExecuteMessage, BatchMessage, UnsupportedOperation,
+                          _UNSET_VALUE, _VALUES_FLAG, _WITH_SERIAL_CONSISTENCY_FLAG, _PAGE_SIZE_FLAG,
+                          _PAGE_SIZE_BYTES_FLAG, _WITH_PAGING_STATE_FLAG, _PROTOCOL_TIMESTAMP_FLAG,
+                          _PAGING_OPTIONS_FLAG, CUSTOM_PAYLOAD_FLAG, COMPRESSED_FLAG, TRACING_FLAG,
+                          USE_BETA_FLAG)
+
+cdef enum:
+    HEADER_SIZE = 9
+
+
+cdef class FrameWriter:
+    """
+    A growable buffer that frames are written into, big-endian, starting
+    after room for the frame header.
+    """
+
+    cdef char *buf
+    cdef Py_ssize_t pos
+    cdef Py_ssize_t capacity
+
+    def __cinit__(self, Py_ssize_t capacity=256):
+        if capacity < HEADER_SIZE:
+            capacity = HEADER_SIZE
+        self.buf = <char *> malloc(capacity)
+        if self.buf == NULL:
+            raise MemoryError()
+        self.capacity = capacity
+        self.pos = HEADER_SIZE
+
+    def __dealloc__(self):
+        free(self.buf)
+
+    cdef inline int reserve(self, Py_ssize_t n) except -1:
+        cdef Py_ssize_t capacity
+        cdef char *buf
+        if self.pos + n <= self.capacity:
+            return 0
+        capacity = self.capacity * 2
+        while capacity < self.pos + n:
+            capacity *= 2
+        buf = <char *> realloc(self.buf, capacity)
+        if buf == NULL:
+            raise MemoryError()
+        self.buf = buf
+        self.capacity = capacity
+        return 0
+
+    cdef inline int write(self, const char *data, Py_ssize_t n) except -1:
+        self.reserve(n)
+        memcpy(self.buf + self.pos, data, n)
+        self.pos += n
+        return 0
+
+    cdef inline int write_byte(self, uint8_t v) except -1:
+        self.reserve(1)
+        self.buf[self.pos] = <char> v
+        self.pos += 1
+        return 0
+
+    cdef inline int write_short(self, uint16_t v) except -1:
+        self.reserve(2)
+        self.buf[self.pos] = <char> (v >> 8)
+        self.buf[self.pos + 1] = <char> v
+        self.pos += 2
+        return 0
+
+    cdef inline int write_int(self, uint32_t v) except -1:
+        self.reserve(4)
+        _pack_int(self.buf + self.pos, v)
+        self.pos += 4
+        return 0
+
+    cdef inline int write_long(self, uint64_t v) except -1:
+        self.reserve(8)
+        _pack_int(self.buf + self.pos, <uint32_t> (v >> 32))
+        _pack_int(self.buf + self.pos + 4, <uint32_t> v)
+        self.pos += 8
+        return 0
+
+    cdef inline int write_bytes(self, bytes b) except -1:
+        self.write(PyBytes_AS_STRING(b), PyBytes_GET_SIZE(b))
+        return 0
+
+    cdef inline int write_string(self, s) except -1:
+        if isinstance(s, six.text_type):
+            s = s.encode('utf8')
+        self.write_short(len(s))
+        self.write_bytes(s)
+        return 0
+
+    cdef inline int write_longstring(self, s) except -1:
+        if isinstance(s, six.text_type):
+            s = s.encode('utf8')
+        self.write_int(len(s))
+        self.write_bytes(s)
+        return 0
+
+    cdef inline int write_value(self, v) except -1:
+        if v is None:
+            self.write_int(<uint32_t> -1)
+        elif v is _UNSET_VALUE:
+            self.write_int(<uint32_t> -2)
+        elif type(v) is bytes:
+            self.write_int(PyBytes_GET_SIZE(v))
+            self.write_bytes(v)
+        else:
+            # bytearray, memoryview, etc.
+            v = bytes(v)
+            self.write_int(PyBytes_GET_SIZE(v))
+            self.write_bytes(v)
+        return 0
+
+    cdef bytes frame(self, int version, int flags, int stream_id, int opcode):
+        """
+        Fills in the header, and returns the frame.
+        """
+        cdef char *header = self.buf
+        header[0] = <char> version
+        header[1] = <char> flags
+        header[2] = <char> (<uint16_t> stream_id >> 8)
+        header[3] = <char> stream_id
+        header[4] = <char> opcode
+        _pack_int(header + 5, <uint32_t> (self.pos - HEADER_SIZE))
+        return PyBytes_FromStringAndSize(self.buf, self.pos)
+
+    cdef bytes body(self):
+        return PyBytes_FromStringAndSize(self.buf + HEADER_SIZE, self.pos - HEADER_SIZE)
+
+
+cdef inline void _pack_int(char *out, uint32_t v):
+    out[0] = <char> (v >> 24)
+    out[1] = <char> (v >> 16)
+    out[2] = <char> (v >> 8)
+    out[3] = <char> v
+
+
+cdef int _write_query_params(FrameWriter w, msg, int protocol_version) except -1:
+    cdef uint32_t flags = 0
+    query_params = msg.query_params
+    serial_consistency_level = msg.serial_consistency_level
+    fetch_size = msg.fetch_size
+    paging_state = msg.paging_state
+    timestamp = msg.timestamp
+    paging_options = msg.continuous_paging_options
+
+    w.write_short(msg.consistency_level)
+    if query_params is not None:
+        flags |= _VALUES_FLAG
+    if serial_consistency_level:
+        flags |= _WITH_SERIAL_CONSISTENCY_FLAG
+    if fetch_size:
+        flags |= _PAGE_SIZE_FLAG
+        if paging_options and paging_options.page_unit_bytes():
+            flags |= _PAGE_SIZE_BYTES_FLAG
+    if paging_state:
+        flags |= _WITH_PAGING_STATE_FLAG
+    if timestamp is not None:
+        flags |= _PROTOCOL_TIMESTAMP_FLAG
+    if paging_options:
+        if ProtocolVersion.has_continuous_paging_support(protocol_version):
+            flags |= _PAGING_OPTIONS_FLAG
+        else:
+            raise UnsupportedOperation(
+                "Continuous paging may only be used with protocol version "
+                "ProtocolVersion.DSE_V1 or higher. Consider setting Cluster.protocol_version to ProtocolVersion.DSE_V1.")
+
+    if ProtocolVersion.uses_int_query_flags(protocol_version):
+        w.write_int(flags)
+    else:
+        w.write_byte(flags)
+
+    if query_params is not None:
+        w.write_short(len(query_params))
+        for param in query_params:
+            w.write_value(param)
+    if fetch_size:
+        w.write_int(fetch_size)
+    if paging_state:
+        w.write_longstring(paging_state)
+    if serial_consistency_level:
+        w.write_short(serial_consistency_level)
+    if timestamp is not None:
+        w.write_long(timestamp)
+    if paging_options:
+        w.write_int(paging_options.max_pages)
+        w.write_int(paging_options.max_pages_per_second)
+    return 0
+
+
+cdef int _write_batch(FrameWriter w, msg, int protocol_version) except -1:
+    cdef uint32_t flags = 0
+    serial_consistency_level = msg.serial_consistency_level
+    timestamp = msg.timestamp
+
+    w.write_byte(msg.batch_type.value)
+    w.write_short(len(msg.queries))
+    for prepared, string_or_query_id, params in msg.queries:
+        if not prepared:
+            w.write_byte(0)
+            w.write_longstring(string_or_query_id)
+        else:
+            w.write_byte(1)
+            w.write_short(len(string_or_query_id))
+            w.write_bytes(string_or_query_id)
+        w.write_short(len(params))
+        for param in params:
+            w.write_value(param)
+
+    w.write_short(msg.consistency_level)
+    if serial_consistency_level:
+        flags |= _WITH_SERIAL_CONSISTENCY_FLAG
+    if timestamp is not None:
+        flags |= _PROTOCOL_TIMESTAMP_FLAG
+
+    if ProtocolVersion.uses_int_query_flags(protocol_version):
+        w.write_int(flags)
+    else:
+        w.write_byte(flags)
+
+    if serial_consistency_level:
+        w.write_short(serial_consistency_level)
+    if timestamp is not None:
+        w.write_long(timestamp)
+    return 0
+
+
+def encode_message(msg, int stream_id, int protocol_version, compressor, allow_beta_protocol_version):
+    """
+    Encodes ``msg`` like :meth:`dse.protocol._ProtocolHandler.encode_message`,
+    or returns :const:`None` if it is not a QUERY, EXECUTE or BATCH message.
+    """
+    cdef FrameWriter w
+    cdef int flags = 0
+    msg_type = type(msg)
+    if msg_type is not ExecuteMessage and msg_type is not QueryMessage and msg_type is not BatchMessage:
+        return None
+
+    w = FrameWriter(1024 if msg_type is BatchMessage else 256)
+    custom_payload = msg.custom_payload
+    if custom_payload:
+        if protocol_version < 4:
+            raise UnsupportedOperation("Custom key/value payloads can only be used with protocol version 4 or higher")
+        flags |= CUSTOM_PAYLOAD_FLAG
+        w.write_short(len(custom_payload))
+        for k, v in custom_payload.items():
+            w.write_string(k)
+            w.write_value(v)
+
+    if msg_type is ExecuteMessage:
+        w.write_string(msg.query_id)
+        _write_query_params(w, msg, protocol_version)
+    elif msg_type is QueryMessage:
+        w.write_longstring(msg.query)
+        _write_query_params(w, msg, protocol_version)
+    else:
+        _write_batch(w, msg, protocol_version)
+
+    if msg.tracing:
+        flags |= TRACING_FLAG
+    if allow_beta_protocol_version:
+        flags |= USE_BETA_FLAG
+
+    if compressor and w.pos > HEADER_SIZE:
+        body = compressor(w.body())
+        if type(body) is not bytes:
+            body = bytes(body)
+        w.pos = HEADER_SIZE
+        w.write_bytes(body)
+        flags |= COMPRESSED_FLAG
+
+    return w.frame(protocol_version, flags, stream_id, msg.opcode)
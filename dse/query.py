@@ -28,6 +28,23 @@ import dse.encoder
 from dse.protocol import _UNSET_VALUE
 from dse.util import OrderedDict, _sanitize_identifiers
 
+try:
+    from dse.serializers import make_serializers, serialize_values
+except ImportError:
+    make_serializers = serialize_values = None
+
+try:
+    from dse.row_factories import make_named_tuples, make_dicts, make_ordered_dicts
+except ImportError:
+    def make_named_tuples(Row, rows):
+        return [Row(*row) for row in rows]
+
+    def make_dicts(colnames, rows):
+        return [dict(zip(colnames, row)) for row in rows]
+
+    def make_ordered_dicts(colnames, rows):
+        return [OrderedDict(zip(colnames, row)) for row in rows]
+
 import logging
 log = logging.getLogger(__name__)
 
@@ -50,6 +67,10 @@ END_BADCHAR_REGEX = re.compile('[^a-zA-Z0-9_]*$')
 
 _clean_name_cache = {}
 
+# Row classes of named_tuple_factory, by column names, least recently used first
+_row_class_cache = OrderedDict()
+_row_class_cache_size = 256
+
 
 def _clean_column_name(name):
     try:
@@ -104,9 +125,29 @@ def named_tuple_factory(colnames, rows):
         name: Bob, age: 42
 
     """
+    return make_named_tuples(_get_row_class(colnames), rows)
+
+
+def _get_row_class(colnames):
+    key = tuple(colnames)
+    try:
+        # move it to the most recently used end
+        Row = _row_class_cache.pop(key)
+    except KeyError:
+        Row = _make_row_class(colnames)
+        if len(_row_class_cache) >= _row_class_cache_size:
+            try:
+                _row_class_cache.popitem(last=False)
+            except KeyError:
+                pass
+    _row_class_cache[key] = Row
+    return Row
+
+
+def _make_row_class(colnames):
     clean_column_names = map(_clean_column_name, colnames)
     try:
-        Row = namedtuple('Row', clean_column_names)
+        return namedtuple('Row', clean_column_names)
     except Exception:
         clean_column_names = list(map(_clean_column_name, colnames))  # create list because py3 map object will be consumed by first attempt
         log.warning("Failed creating named tuple for results with column names %s (cleaned: %s) "
@@ -115,9 +156,7 @@ def named_tuple_factory(colnames, rows):
                     "Avoid this by choosing different names, using SELECT \"<col name>\" AS aliases, "
                     "or specifying a different row_factory on your Session" %
                     (colnames, clean_column_names))
-        Row = namedtuple('Row', _sanitize_identifiers(clean_column_names))
-
-    return [Row(*row) for row in rows]
+        return namedtuple('Row', _sanitize_identifiers(clean_column_names))
 
 
 def dict_factory(colnames, rows):
@@ -133,7 +172,7 @@ def dict_factory(colnames, rows):
         >>> print rows[0]
         {u'age': 42, u'name': u'Bob'}
     """
-    return [dict(zip(colnames, row)) for row in rows]
+    return make_dicts(colnames, rows)
 
 
 def ordered_dict_factory(colnames, rows):
@@ -144,7 +183,7 @@ def ordered_dict_factory(colnames, rows):
     .. versionchanged:: 2.0.0
         moved from ``dse.decoder`` to ``dse.query``
     """
-    return [OrderedDict(zip(colnames, row)) for row in rows]
+    return make_ordered_dicts(colnames, rows)
 
 
 FETCH_SIZE_UNSET = object()
@@ -204,12 +243,20 @@ class Statement(object):
     Flag indicating whether this statement is safe to run multiple times in speculative execution.
     """
 
+    column_projection = None
+    """
+    An optional collection of the names of the result columns to decode, for
+    instance the columns actually used out of a ``SELECT *``. The values of the
+    other columns are skipped rather than deserialized, and are :const:`None`
+    in the rows. Names of columns that are not in the result are ignored.
+    """
+
     _serial_consistency_level = None
     _routing_key = None
 
     def __init__(self, retry_policy=None, consistency_level=None, routing_key=None,
                  serial_consistency_level=None, fetch_size=FETCH_SIZE_UNSET, keyspace=None, custom_payload=None,
-                 is_idempotent=False):
+                 is_idempotent=False, column_projection=None):
         if retry_policy and not hasattr(retry_policy, 'on_read_timeout'):  # just checking one method to detect positional parameter errors
             raise ValueError('retry_policy should implement dse.policies.RetryPolicy')
         self.retry_policy = retry_policy
@@ -225,6 +272,8 @@ class Statement(object):
         if custom_payload is not None:
             self.custom_payload = custom_payload
         self.is_idempotent = is_idempotent
+        if column_projection is not None:
+            self.column_projection = column_projection
 
     def _key_parts_packed(self, parts):
         for p in parts:
@@ -316,7 +365,7 @@ class SimpleStatement(Statement):
 
     def __init__(self, query_string, retry_policy=None, consistency_level=None, routing_key=None,
                  serial_consistency_level=None, fetch_size=FETCH_SIZE_UNSET, keyspace=None,
-                 custom_payload=None, is_idempotent=False):
+                 custom_payload=None, is_idempotent=False, column_projection=None):
         """
         `query_string` should be a literal CQL statement with the exception
         of parameter placeholders that will be filled through the
@@ -325,7 +374,8 @@ class SimpleStatement(Statement):
         See :class:`Statement` attributes for a description of the other parameters.
         """
         Statement.__init__(self, retry_policy, consistency_level, routing_key,
-                           serial_consistency_level, fetch_size, keyspace, custom_payload, is_idempotent)
+                           serial_consistency_level, fetch_size, keyspace, custom_payload, is_idempotent,
+                           column_projection)
         self._query_string = query_string
 
     @property
@@ -350,6 +400,7 @@ class PreparedStatement(object):
     """
 
     column_metadata = None  #TODO: make this bind_metadata in next major
+    column_projection = None
     consistency_level = None
     custom_payload = None
     fetch_size = FETCH_SIZE_UNSET
@@ -360,6 +411,7 @@ class PreparedStatement(object):
     result_metadata = None
     routing_key_indexes = None
     _routing_key_index_set = None
+    _serializers = None
     serial_consistency_level = None
 
     def __init__(self, column_metadata, query_id, routing_key_indexes, query,
@@ -412,6 +464,11 @@ class PreparedStatement(object):
         """
         return BoundStatement(self).bind(values)
 
+    def _get_serializers(self):
+        if self._serializers is None:
+            self._serializers = make_serializers([col.type for col in self.column_metadata])
+        return self._serializers
+
     def is_routing_key_index(self, i):
         if self._routing_key_index_set is None:
             self._routing_key_index_set = set(self.routing_key_indexes) if self.routing_key_indexes else set()
@@ -442,7 +499,7 @@ class BoundStatement(Statement):
 
     def __init__(self, prepared_statement, retry_policy=None, consistency_level=None, routing_key=None,
                  serial_consistency_level=None, fetch_size=FETCH_SIZE_UNSET, keyspace=None,
-                 custom_payload=None):
+                 custom_payload=None, column_projection=None):
         """
         `prepared_statement` should be an instance of :class:`PreparedStatement`.
 
@@ -455,6 +512,7 @@ class BoundStatement(Statement):
         self.fetch_size = prepared_statement.fetch_size
         self.custom_payload = prepared_statement.custom_payload
         self.is_idempotent = prepared_statement.is_idempotent
+        self.column_projection = prepared_statement.column_projection
         self.values = []
 
         meta = prepared_statement.column_metadata
@@ -462,7 +520,8 @@ class BoundStatement(Statement):
             self.keyspace = meta[0].keyspace_name
 
         Statement.__init__(self, retry_policy, consistency_level, routing_key,
-                           serial_consistency_level, fetch_size, keyspace, custom_payload)
+                           serial_consistency_level, fetch_size, keyspace, custom_payload,
+                           column_projection=column_projection)
 
     def bind(self, values):
         """
@@ -523,6 +582,11 @@ class BoundStatement(Statement):
                 (value_len, len(self.prepared_statement.routing_key_indexes)))
 
         self.raw_values = values
+        if serialize_values is not None:
+            self.values = serialize_values(self.prepared_statement._get_serializers(), values, col_meta,
+                                           proto_version, self.prepared_statement)
+            return self
+
         self.values = []
         for value, col_spec in zip(values, col_meta):
             if value is None:
@@ -0,0 +1,67 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+"""
+Compiled loops for the row factories of dse.query, which build the rows of a
+page without a Python-level call per row.
+"""
+
+from cpython.tuple cimport PyTuple_GET_SIZE, PyTuple_GET_ITEM
+from cpython.dict cimport PyDict_SetItem
+
+from dse.util import OrderedDict
+
+
+def make_named_tuples(Row, rows):
+    """
+    Returns ``[Row(*row) for row in rows]`` for a namedtuple class ``Row``,
+    creating the instances directly rather than through ``Row.__new__``.
+    """
+    cdef list result = []
+    cdef Py_ssize_t rowsize = len(Row._fields)
+    for row in rows:
+        if type(row) is not tuple:
+            row = tuple(row)
+        if PyTuple_GET_SIZE(row) != rowsize:
+            # let the namedtuple raise its usual error
+            result.append(Row(*row))
+        else:
+            result.append(tuple.__new__(Row, row))
+    return result
+
+
+cdef inline dict _make_dict(tuple keys, Py_ssize_t n, row):
+    cdef dict d = {}
+    cdef Py_ssize_t i
+    if type(row) is tuple:
+        if PyTuple_GET_SIZE(row) < n:
+            n = PyTuple_GET_SIZE(row)
+        for i in range(n):
+            PyDict_SetItem(d, <object> PyTuple_GET_ITEM(keys, i), <object> PyTuple_GET_ITEM(row, i))
+    else:
+        for key, value in zip(keys, row):
+            d[key] = value
+    return d
+
+
+def make_dicts(colnames, rows):
+    """
+    Returns ``[dict(zip(colnames, row)) for row in rows]``.
+    """
+    cdef tuple keys = tuple(colnames)
+    cdef Py_ssize_t n = len(keys)
+    return [_make_dict(keys, n, row) for row in rows]
+
+
+def make_ordered_dicts(colnames, rows):
+    """
+    Returns ``[OrderedDict(zip(colnames, row)) for row in rows]``.
+    """
+    cdef tuple keys = tuple(colnames)
+    return [OrderedDict(zip(keys, row)) for row in rows]
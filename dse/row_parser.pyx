@@ -13,7 +13,47 @@ from dse.deserializers import make_deserializers
 
 include "ioutils.pyx"
 
-def make_recv_results_rows(ColumnParser colparser):
+# Responses to EXECUTE requests that skip metadata all decode with the
+# result metadata of their prepared statement, so the ParseDesc is built
+# once per prepared statement (and column projection) rather than once per page:
+# {(id(result_metadata), protocol_version, column_projection, id(overrides)):
+#  (result_metadata, desc)}
+cdef dict _desc_cache = {}
+cdef Py_ssize_t _DESC_CACHE_SIZE = 1024
+
+
+cdef ParseDesc make_parse_desc(column_metadata, int protocol_version, column_projection, overrides):
+    colnames = [c[2] for c in column_metadata]
+    coltypes = [c[3] for c in column_metadata]
+    if column_projection:
+        skipped = [name not in column_projection for name in colnames]
+    else:
+        skipped = None
+    return ParseDesc(colnames, coltypes, make_deserializers(coltypes, skipped, overrides), protocol_version)
+
+
+cdef ParseDesc get_cached_parse_desc(result_metadata, int protocol_version, column_projection, overrides):
+    if column_projection:
+        column_projection = frozenset(column_projection)
+    # overrides are kept alive by the recv_results_rows using them
+    key = (id(result_metadata), protocol_version, column_projection or None, id(overrides))
+    entry = _desc_cache.get(key)
+    # holding on to the metadata keeps its id from being reused
+    if entry is not None and entry[0] is result_metadata:
+        return entry[1]
+
+    desc = make_parse_desc(result_metadata, protocol_version, column_projection, overrides)
+    if len(_desc_cache) >= _DESC_CACHE_SIZE:
+        del _desc_cache[next(iter(_desc_cache))]
+    _desc_cache[key] = (result_metadata, desc)
+    return desc
+
+
+def make_recv_results_rows(ColumnParser colparser, dict deserializer_overrides=None):
+    """
+    Returns the recv_results_rows method of (Fast)ResultMessage, parsing rows
+    with colparser. deserializer_overrides is passed to find_deserializer.
+    """
     def recv_results_rows(self, f, int protocol_version, user_type_map, result_metadata):
         """
         Parse protocol data given as a BytesIO f into a set of columns (e.g. list of tuples)
@@ -21,20 +61,27 @@ def make_recv_results_rows(ColumnParser colparser):
         """
         self.recv_results_metadata(f, user_type_map)
 
-        column_metadata = self.column_metadata or result_metadata
+        cdef ParseDesc desc
+        if self.column_metadata or not result_metadata:
+            desc = make_parse_desc(self.column_metadata or result_metadata, protocol_version,
+                                   self.column_projection, deserializer_overrides)
+        else:
+            desc = get_cached_parse_desc(result_metadata, protocol_version,
+                                         self.column_projection, deserializer_overrides)
 
-        self.column_names = [c[2] for c in column_metadata]
-        self.column_types = [c[3] for c in column_metadata]
-
-        desc = ParseDesc(self.column_names, self.column_types, make_deserializers(self.column_types),
-                         protocol_version)
-        reader = BytesIOReader(f.read())
+        self.column_names = desc.colnames
+        self.column_types = desc.coltypes
+        try:
+            # read the rows straight out of the message body, without copying
+            rows = f.getbuffer()[f.tell():]
+        except AttributeError:
+            rows = f.read()
+        reader = BytesIOReader(rows)
         try:
             self.parsed_rows = colparser.parse_rows(reader, desc)
         except Exception as e:
             # Use explicitly the TupleRowParser to display better error messages for column decoding failures
             rowparser = TupleRowParser()
-            reader.buf_ptr = reader.buf
             reader.pos = 0
             rowcount = read_int(reader)
             for i in range(rowcount):
@@ -0,0 +1,218 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+"""
+Cython-based serializers for the values bound to prepared statements, the
+counterpart of dse.deserializers.
+
+Common types with values of their usual Python type are packed directly.
+Anything else is handed to the serialize method of the cqltype, so that the
+results and errors are the same as without these serializers.
+"""
+
+from libc.stdint cimport int32_t, int64_t, uint32_t, uint64_t
+from libc.math cimport isinf
+from libc.string cimport memcpy
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+import struct
+
+from dse.protocol import _UNSET_VALUE
+
+
+cdef inline bytes _pack_uint32(uint32_t v):
+    cdef char out[4]
+    out[0] = <char> (v >> 24)
+    out[1] = <char> (v >> 16)
+    out[2] = <char> (v >> 8)
+    out[3] = <char> v
+    return PyBytes_FromStringAndSize(out, 4)
+
+
+cdef inline bytes _pack_uint64(uint64_t v):
+    cdef char out[8]
+    cdef int i
+    for i in range(8):
+        out[i] = <char> (v >> (56 - 8 * i))
+    return PyBytes_FromStringAndSize(out, 8)
+
+
+cdef inline bint _is_int(value):
+    # bools and int subclasses are left to the cqltype
+    return type(value) is int or type(value) is long
+
+
+cdef class Serializer:
+    """Cython-based serializer class for a cqltype"""
+
+    def __init__(self, cqltype):
+        self.cqltype = cqltype
+
+    cpdef serialize(self, object value, int protocol_version):
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerInt32Type(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef int32_t v
+        if _is_int(value):
+            try:
+                v = value
+            except OverflowError:
+                pass
+            else:
+                return _pack_uint32(<uint32_t> v)
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerLongType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef int64_t v
+        if _is_int(value):
+            try:
+                v = value
+            except OverflowError:
+                pass
+            else:
+                return _pack_uint64(<uint64_t> v)
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerCounterColumnType(SerLongType):
+    pass
+
+
+cdef class SerDoubleType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef double v
+        cdef uint64_t bits
+        if type(value) is float:
+            v = value
+            # copy the bits rather than casting the pointer, which breaks strict aliasing
+            memcpy(&bits, &v, sizeof(double))
+            return _pack_uint64(bits)
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerFloatType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        cdef double d
+        cdef float v
+        cdef uint32_t bits
+        if type(value) is float:
+            d = value
+            v = <float> d
+            # out of range for a float: let struct raise
+            if not (isinf(v) and not isinf(d)):
+                memcpy(&bits, &v, sizeof(float))
+                return _pack_uint32(bits)
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerBooleanType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        if value is True:
+            return b'\x01'
+        if value is False:
+            return b'\x00'
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerBytesType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        if type(value) is bytes:
+            return value
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerUTF8Type(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        if type(value) is unicode:
+            return (<unicode> value).encode('utf-8')
+        return self.cqltype.serialize(value, protocol_version)
+
+
+cdef class SerVarcharType(SerUTF8Type):
+    pass
+
+
+cdef class SerUUIDType(Serializer):
+    cpdef serialize(self, object value, int protocol_version):
+        try:
+            return value.bytes
+        except AttributeError:
+            raise TypeError("Got a non-UUID object for a UUID value")
+
+
+cdef class SerTimeUUIDType(SerUUIDType):
+    pass
+
+
+cdef dict classes = globals()
+
+
+def make_serializers(cqltypes):
+    """Create a list of Serializer objects for each given cqltype"""
+    return [find_serializer(ct) for ct in cqltypes]
+
+
+cpdef Serializer find_serializer(cqltype):
+    """Find a serializer for a cqltype"""
+    name = 'Ser' + cqltype.__name__
+    cls = classes.get(name)
+    if cls is None or not issubclass(cls, Serializer):
+        cls = Serializer
+    return cls(cqltype)
+
+
+def serialize_values(list serializers, values, col_meta, int protocol_version, prepared_statement):
+    """
+    Serializes bound ``values`` for :meth:`.BoundStatement.bind`, and returns
+    the list of serialized values.
+
+    ``values`` may not be longer than ``col_meta``. With protocol v4 or
+    higher, missing trailing values are filled with UNSET_VALUE.
+    """
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t col_meta_len = len(col_meta)
+    cdef Serializer serializer
+    cdef list result = []
+
+    for value in values:
+        if value is None:
+            result.append(None)
+        elif value is _UNSET_VALUE:
+            if protocol_version < 4:
+                raise ValueError("Attempt to bind UNSET_VALUE while using unsuitable protocol version (%d < 4)" % protocol_version)
+            _check_unset(prepared_statement, i)
+            result.append(_UNSET_VALUE)
+        else:
+            serializer = serializers[i]
+            try:
+                result.append(serializer.serialize(value, protocol_version))
+            except (TypeError, struct.error) as exc:
+                col_spec = col_meta[i]
+                message = ('Received an argument of invalid type for column "%s". '
+                           'Expected: %s, Got: %s; (%s)' % (col_spec.name, col_spec.type, type(value), exc))
+                raise TypeError(message)
+        i += 1
+
+    if protocol_version >= 4:
+        while i < col_meta_len:
+            _check_unset(prepared_statement, i)
+            result.append(_UNSET_VALUE)
+            i += 1
+
+    return result
+
+
+cdef inline _check_unset(prepared_statement, Py_ssize_t i):
+    if prepared_statement.is_routing_key_index(i):
+        col_meta = prepared_statement.column_metadata[i]
+        raise ValueError("Cannot bind UNSET_VALUE as a part of the routing key '%s'" % col_meta.name)
@@ -8,6 +8,7 @@
 # http://www.datastax.com/terms/datastax-dse-driver-license-terms
 
 from __future__ import with_statement
+from array import array
 import calendar
 import datetime
 from functools import total_ordering
@@ -16,6 +17,7 @@ from itertools import chain
 import random
 import re
 import six
+import struct
 import uuid
 import sys
 
@@ -1283,26 +1285,124 @@ class Point(object):
         return Point(x=x, y=y)
 
 
-class LineString(object):
-    """
-    Represents a linestring geometry for DSE
-    """
+if six.PY3:
+    _array_bytes = array.tobytes
+    _array_frombytes = array.frombytes
+else:
+    _array_bytes = array.tostring
+    _array_frombytes = array.fromstring
+
+_negative_zero_bytes = _array_bytes(array('d', [-0.0]))
+
+
+class _CoordinateSequence(object):
+    # Base of the geometries made of a sequence of (x, y) coordinates. Those
+    # read from WKB are kept flat in an array('d'), so that they are decoded
+    # and encoded without a Python object per coordinate; the coords tuple is
+    # only built when accessed. Coordinates given by the user are kept as
+    # given (e.g. ints stay ints in str() and repr()), and converted to an
+    # array the first time one is needed. Coordinates that are not all
+    # numeric pairs (e.g. from truncated WKT) have no array. The array is
+    # never modified once set (coord_array is read-only, and arrays given
+    # to from_coord_array are copied), so it always matches the coords.
+
+    _coord_array = None  # False once the coords are known not to convert
+    _coords = None
 
-    coords = None
-    """
-    Tuple of (x, y) coordinates in the linestring
-    """
     def __init__(self, coords=tuple()):
+        self.coords = coords
+
+    @classmethod
+    def from_coord_array(cls, coord_array):
+        """
+        Creates a new geometry from a flat sequence of x, y values, which
+        is copied.
+        """
+        return cls._from_coord_array(array('d', coord_array))
+
+    @classmethod
+    def _from_coord_array(cls, coord_array):
+        # takes over an array('d') that no one else holds, without a copy
+        if len(coord_array) % 2:
+            raise ValueError("Expected an even number of coordinate values, got %d" % len(coord_array))
+        geom = cls.__new__(cls)
+        geom._coord_array = coord_array
+        return geom
+
+    @property
+    def coords(self):
+        """
+        Tuple of (x, y) coordinates
+        """
+        coords = self._coords
+        if coords is None:
+            values = self._coord_array
+            coords = self._coords = tuple(zip(values[::2], values[1::2]))
+        return coords
+
+    @coords.setter
+    def coords(self, coords):
+        self._coords = list_contents_to_tuple(list(coords))
+        self._coord_array = None
+
+    @property
+    def coord_array(self):
         """
-        'coords`: a sequence of (x, y) coordinates of points in the linestring
+        The coordinates as a flat ``array('d')`` of x, y values, or None if
+        they are not all numeric (x, y) pairs. This is the geometry's own
+        storage, so it is read-only: it must not be modified, nor written
+        through a view of it. For example,
+        ``numpy.frombuffer(geom.coord_array).reshape(-1, 2)`` views the
+        coordinates as an (n, 2) NumPy array without copying them. Assign
+        :attr:`coords`, or create a new geometry, to change them.
         """
-        self.coords = tuple(coords)
+        values = self._coord_array
+        if values is None:
+            coords = self._coords
+            values = False
+            try:
+                # coordinates of the same length, twice as many values as coordinates: all pairs
+                if len(set(map(len, coords))) <= 1:
+                    packed = struct.pack('%dd' % (2 * len(coords)), *chain.from_iterable(coords))
+                    values = array('d')
+                    _array_frombytes(values, packed)
+            except (TypeError, struct.error):
+                pass
+            self._coord_array = values
+        return values if values is not False else None
+
+    def _coords_eq(self, other):
+        values, other_values = self._coord_array, other._coord_array
+        if values and other_values:
+            return _array_bytes(values) == _array_bytes(other_values) or values == other_values
+        return self.coords == other.coords
+
+    def __hash__(self):
+        values = self.coord_array
+        if values is None:
+            return hash(self._coords)
+        data = _array_bytes(values)
+        if _negative_zero_bytes in data:
+            # -0.0 == 0.0, so both must hash the same
+            data = _array_bytes(array('d', (v + 0.0 for v in values)))
+        return hash(data)
+
+    def _wkt_coords(self):
+        return ', '.join("%r %r" % (x, y) for x, y in self.coords)
+
+
+class LineString(_CoordinateSequence):
+    """
+    Represents a linestring geometry for DSE
+
+    `coords`: a sequence of (x, y) coordinates of points in the linestring
+    """
 
     def __eq__(self, other):
-        return isinstance(other, LineString) and self.coords == other.coords
+        return isinstance(other, LineString) and self._coords_eq(other)
 
     def __hash__(self):
-        return hash(self.coords)
+        return _CoordinateSequence.__hash__(self)
 
     def __str__(self):
         """
@@ -1310,7 +1410,7 @@ class LineString(object):
         """
         if not self.coords:
             return "LINESTRING EMPTY"
-        return "LINESTRING (%s)" % ', '.join("%r %r" % (x, y) for x, y in self.coords)
+        return "LINESTRING (%s)" % self._wkt_coords()
 
     def __repr__(self):
         return "%s(%r)" % (self.__class__.__name__, self.coords)
@@ -1328,27 +1428,23 @@ class LineString(object):
         if geom['type'] != 'LineString':
             raise ValueError("Invalid WKT geometry type. Expected 'LineString', got '{0}': '{1}'".format(geom['type'], s))
 
-        geom['coordinates'] = list_contents_to_tuple(geom['coordinates'])
-
         return LineString(coords=geom['coordinates'])
 
 
-class _LinearRing(object):
+class _LinearRing(_CoordinateSequence):
     # no validation, no implicit closing; just used for poly composition, to
     # mimic that of shapely.geometry.Polygon
-    def __init__(self, coords=tuple()):
-        self.coords = list_contents_to_tuple(coords)
 
     def __eq__(self, other):
-        return isinstance(other, _LinearRing) and self.coords == other.coords
+        return isinstance(other, _LinearRing) and self._coords_eq(other)
 
     def __hash__(self):
-        return hash(self.coords)
+        return _CoordinateSequence.__hash__(self)
 
     def __str__(self):
         if not self.coords:
             return "LINEARRING EMPTY"
-        return "LINEARRING (%s)" % ', '.join("%r %r" % (x, y) for x, y in self.coords)
+        return "LINEARRING (%s)" % self._wkt_coords()
 
     def __repr__(self):
         return "%s(%r)" % (self.__class__.__name__, self.coords)
@@ -1377,6 +1473,23 @@ class Polygon(object):
         self.exterior = _LinearRing(exterior)
         self.interiors = tuple(_LinearRing(e) for e in interiors) if interiors else tuple()
 
+    @classmethod
+    def from_coord_arrays(cls, exterior, interiors=None):
+        """
+        Creates a new Polygon from flat sequences of x, y values for the
+        exterior and, optionally, interior rings. See
+        :meth:`LineString.from_coord_array`.
+        """
+        return cls._from_coord_arrays(array('d', exterior), [array('d', e) for e in interiors] if interiors else None)
+
+    @classmethod
+    def _from_coord_arrays(cls, exterior, interiors=None):
+        # takes over arrays('d') that no one else holds, without a copy
+        polygon = cls.__new__(cls)
+        polygon.exterior = _LinearRing._from_coord_array(exterior)
+        polygon.interiors = tuple(_LinearRing._from_coord_array(e) for e in interiors) if interiors else tuple()
+        return polygon
+
     def __eq__(self, other):
         return isinstance(other, Polygon) and self.exterior == other.exterior and self.interiors == other.interiors
 
@@ -1389,8 +1502,7 @@ class Polygon(object):
         """
         if not self.exterior.coords:
             return "POLYGON EMPTY"
-        rings = [ring.coords for ring in chain((self.exterior,), self.interiors)]
-        rings = ["(%s)" % ', '.join("%r %r" % (x, y) for x, y in ring) for ring in rings]
+        rings = ["(%s)" % ring._wkt_coords() for ring in chain((self.exterior,), self.interiors)]
         return "POLYGON (%s)" % ', '.join(rings)
 
     def __repr__(self):
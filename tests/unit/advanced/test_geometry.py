@@ -12,18 +12,19 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from array import array
 import struct
 import itertools
 import math
+from dse import ProtocolVersion
 from dse.cqltypes import lookup_casstype
-from dse.protocol import MAX_SUPPORTED_VERSION
 from dse.cqltypes import PointType, LineStringType, PolygonType, WKBGeometryType
 from dse.util import Point, LineString, Polygon, _LinearRing, Distance
 
 wkb_be = 0
 wkb_le = 1
 
-protocol_versions = range(1, MAX_SUPPORTED_VERSION + 1)
+protocol_versions = range(1, ProtocolVersion.MAX_SUPPORTED + 1)
 
 
 class GeoTypes(unittest.TestCase):
@@ -100,6 +101,80 @@ class GeoTypes(unittest.TestCase):
             # specifically use assertFalse(eq) to make sure we're using the geo __eq__ operator
             self.assertFalse(geo == object())
 
+    def test_coord_array(self):
+        ls = LineString(((1, 2), (3.5, 4)))
+        self.assertEqual(array('d', [1, 2, 3.5, 4]), ls.coord_array)
+        self.assertEqual(((1.0, 2.0), (3.5, 4.0)), ls.coords)
+
+        coords = array('d', [1, 2, 3.5, 4])
+        from_array = LineString.from_coord_array(coords)
+        self.assertEqual(ls, from_array)
+        self.assertEqual(hash(ls), hash(from_array))
+
+        # the caller's array is copied, so changing it does not change the geometry
+        coords[0] = 9
+        self.assertEqual(((1.0, 2.0), (3.5, 4.0)), from_array.coords)
+        self.assertEqual("LINESTRING (1.0 2.0, 3.5 4.0)", str(from_array))
+        self.assertEqual(ls, from_array)
+        self.assertNotEqual(LineString.from_coord_array(coords), from_array)
+
+        poly_exterior = array('d', [0, 0, 1, 0, 0, 0])
+        poly = Polygon.from_coord_arrays(poly_exterior)
+        poly_exterior[0] = 9
+        self.assertEqual(Polygon([(0, 0), (1, 0), (0, 0)]), poly)
+        self.assertEqual(LineString(((1, 2),)), LineString.from_coord_array([1, 2]))
+        self.assertRaises(ValueError, LineString.from_coord_array, [1, 2, 3])
+
+        poly = Polygon.from_coord_arrays([0, 0, 1, 0, 0, 0], [[0.1, 0.1, 0.2, 0.1, 0.1, 0.1]])
+        self.assertEqual(Polygon([(0, 0), (1, 0), (0, 0)], [[(0.1, 0.1), (0.2, 0.1), (0.1, 0.1)]]), poly)
+
+        negative_zero = LineString(((-0.0, 1), (2, 3)))
+        self.assertEqual(LineString(((0.0, 1), (2, 3))), negative_zero)
+        self.assertEqual(hash(LineString(((0.0, 1), (2, 3)))), hash(negative_zero))
+        self.assertNotEqual(LineString(((0.0, 1), (2, 3))), LineString(((0.0, 1), (2, 4))))
+
+        ls.coords = [[5, 6]]
+        self.assertEqual(array('d', [5, 6]), ls.coord_array)
+
+        # coordinates that are not numeric pairs are kept as given
+        ring = _LinearRing(((30.0, 10.0), (20.0,)))
+        self.assertIsNone(ring.coord_array)
+        self.assertEqual(((30.0, 10.0), (20.0,)), ring.coords)
+        self.assertEqual(ring, _LinearRing([[30.0, 10.0], [20.0]]))
+
+    def test_int_coords_as_given(self):
+        ls = LineString([(1, 2), (3, 4)])
+        self.assertEqual("LINESTRING (1 2, 3 4)", str(ls))
+        self.assertEqual("LineString(((1, 2), (3, 4)))", repr(ls))
+        self.assertEqual(array('d', [1, 2, 3, 4]), ls.coord_array)
+        self.assertEqual("LINESTRING (1 2, 3 4)", str(ls))
+
+        poly = Polygon([(0, 0), (10, 0), (10, 10), (0, 0)], [[(1, 1), (2, 1), (2, 2), (1, 1)]])
+        self.assertEqual("POLYGON ((0 0, 10 0, 10 10, 0 0), (1 1, 2 1, 2 2, 1 1))", str(poly))
+        self.assertEqual("_LinearRing(((0, 0), (10, 0), (10, 10), (0, 0)))", repr(poly.exterior))
+
+        # decoded geometries have float coordinates, and their tuple is built once
+        decoded = LineStringType.from_binary(LineStringType.to_binary(ls, 4), 4)
+        self.assertEqual("LINESTRING (1.0 2.0, 3.0 4.0)", str(decoded))
+        self.assertIs(decoded.coords, decoded.coords)
+        self.assertEqual(ls, decoded)
+        self.assertEqual(hash(ls), hash(decoded))
+
+    def test_duck_typed_serialize(self):
+        class Geometry(object):
+            def __init__(self, coords):
+                self.coords = coords
+
+        class PolygonGeometry(object):
+            def __init__(self, exterior, interiors):
+                self.exterior = Geometry(exterior)
+                self.interiors = [Geometry(i) for i in interiors]
+
+        coords = ((1, 2), (3, 4), (5, 6))
+        self.assertEqual(LineStringType.serialize(LineString(coords), 4), LineStringType.serialize(Geometry(coords), 4))
+        self.assertEqual(PolygonType.serialize(Polygon(coords, [coords]), 4),
+                         PolygonType.serialize(PolygonGeometry(coords, [coords]), 4))
+
 
 class WKTTest(unittest.TestCase):
 
@@ -37,3 +37,15 @@ def test_read_eof(assert_equal, assert_raises):
     else:
         raise Exception("Expected an EOFError")
     reader.read(1) # see that we can still read this
+
+def test_read_view(assert_equal, assert_raises):
+    buf = bytearray(b'--abcdef--')
+    cdef BytesIOReader reader = BytesIOReader(memoryview(buf)[2:8])
+    assert_equal(reader.read(2)[:2], b'ab')
+    assert_equal(reader.read(4)[:4], b'cdef')
+    try:
+        reader.read(1)
+    except EOFError:
+        pass
+    else:
+        raise Exception("Expected an EOFError")
@@ -25,6 +25,10 @@ class BytesIOTest(unittest.TestCase):
         bytesio_testhelper.test_read2(self.assertEqual, self.assertRaises)
         bytesio_testhelper.test_read3(self.assertEqual, self.assertRaises)
 
+    @cythontest
+    def test_reading_view(self):
+        bytesio_testhelper.test_read_view(self.assertEqual, self.assertRaises)
+
     @cythontest
     def test_reading_error(self):
         bytesio_testhelper.test_read_eof(self.assertEqual, self.assertRaises)
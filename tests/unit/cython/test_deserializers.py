@@ -0,0 +1,166 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from array import array
+from datetime import datetime
+from decimal import Decimal
+import struct
+from uuid import uuid1, uuid4
+
+from dse import DriverException, cqltypes
+from dse.protocol import (ColumnMetadata, ProtocolHandler, RawProtocolHandler, ResultMessage, RESULT_KIND_ROWS,
+                          cython_protocol_handler)
+from dse.util import Point, LineString, Polygon, Duration, DateRange, DateRangeBound, OPEN_BOUND
+
+try:
+    from dse import deserializers
+    from dse.obj_parser import ListParser
+except ImportError:
+    pass
+
+
+def decode_column(cqltype, values, handler=ProtocolHandler):
+    body = struct.pack('>iii', RESULT_KIND_ROWS, ResultMessage._NO_METADATA_FLAG, 1)
+    body += struct.pack('>i', len(values))
+    for v in values:
+        body += struct.pack('>i', -1) if v is None else struct.pack('>i', len(v)) + v
+    result_metadata = [ColumnMetadata('ks', 'cf', 'v', cqltype)]
+    result = handler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata)
+    return [row[0] for row in result.parsed_rows]
+
+
+def big_endian_linestring(coords):
+    return struct.pack('>BII' + 'dd' * len(coords), 0, 2, len(coords), *(d for c in coords for d in c))
+
+
+class DeserializersTest(unittest.TestCase):
+
+    values = [
+        (cqltypes.PointType, [Point(1.5, -2.25), Point(0, 1e300)]),
+        (cqltypes.LineStringType, [LineString(), LineString(((1, 2), (3.5, 4), (-5, 6)))]),
+        (cqltypes.PolygonType, [Polygon(),
+                                Polygon([(0, 0), (10, 0), (10, 10), (0, 0)]),
+                                Polygon([(0, 0), (10, 0), (10, 10), (0, 0)],
+                                        [[(1, 1), (2, 1), (2, 2), (1, 1)], [(5, 5), (6, 5), (6, 6), (5, 5)]])]),
+        (cqltypes.DurationType, [Duration(0, 0, 0), Duration(1, -2, 3),
+                                 Duration(2 ** 31 - 1, -2 ** 31, 2 ** 50), Duration(-1, 0, -2 ** 50)]),
+        (cqltypes.DateRangeType, [DateRange(value=DateRangeBound(1500000000000, 'MILLISECOND')),
+                                  DateRange(lower_bound=DateRangeBound(-1500000000000, 'DAY'),
+                                            upper_bound=DateRangeBound(1500000000000, 'YEAR')),
+                                  DateRange(lower_bound=DateRangeBound(0, 'MONTH'), upper_bound=OPEN_BOUND),
+                                  DateRange(lower_bound=OPEN_BOUND, upper_bound=DateRangeBound(0, 'HOUR')),
+                                  DateRange(lower_bound=OPEN_BOUND, upper_bound=OPEN_BOUND),
+                                  DateRange(value=OPEN_BOUND)]),
+    ]
+
+    @cythontest
+    def test_same_as_cqltypes(self):
+        for cqltype, values in self.values:
+            serialized = [cqltype.serialize(v, 4) for v in values]
+            expected = [cqltype.deserialize(s, 4) for s in serialized]
+            self.assertEqual(expected, decode_column(cqltype, serialized), cqltype.__name__)
+            self.assertEqual(values, expected, cqltype.__name__)
+
+    @cythontest
+    def test_nine_byte_vints(self):
+        # nanoseconds of 2 ** 63 - 1 and -2 ** 63, zig-zag encoded with a leading 0xff
+        largest = b'\x00\x00\xff' + b'\xff' * 7 + b'\xfe'
+        smallest = b'\x00\x00\xff' + b'\xff' * 8
+        self.assertEqual([Duration(0, 0, 2 ** 63 - 1), Duration(0, 0, -2 ** 63)],
+                         decode_column(cqltypes.DurationType, [largest, smallest]))
+
+    @cythontest
+    def test_big_endian_geometry(self):
+        coords = ((1.0, 2.0), (-3.5, 4.25))
+        serialized = [big_endian_linestring(coords)]
+        self.assertEqual([LineString(coords)], decode_column(cqltypes.LineStringType, serialized))
+
+        point = struct.pack('>BIdd', 0, 1, 1.0, 2.0)
+        self.assertEqual([Point(1.0, 2.0)], decode_column(cqltypes.PointType, [point]))
+
+        polygon = struct.pack('>BIII' + 'dd' * 3, 0, 3, 1, 3, 0, 0, 1, 0, 0, 0)
+        self.assertEqual([Polygon([(0, 0), (1, 0), (0, 0)])], decode_column(cqltypes.PolygonType, [polygon]))
+
+    @cythontest
+    def test_truncated_values(self):
+        truncated = [
+            (cqltypes.LineStringType, cqltypes.LineStringType.serialize(LineString(((1, 2), (3, 4))), 4)[:-1]),
+            (cqltypes.PolygonType, cqltypes.PolygonType.serialize(Polygon([(0, 0), (1, 0), (0, 0)]), 4)[:-8]),
+            (cqltypes.PointType, cqltypes.PointType.serialize(Point(1, 2), 4)[:-1]),
+            (cqltypes.DurationType, cqltypes.DurationType.serialize(Duration(1, 2, 2 ** 40), 4)[:-1]),
+            (cqltypes.DateRangeType, cqltypes.DateRangeType.serialize(
+                DateRange(value=DateRangeBound(0, 'DAY')), 4)[:-2]),
+        ]
+        for cqltype, serialized in truncated:
+            self.assertRaises(DriverException, decode_column, cqltype, [serialized])
+
+    @cythontest
+    def test_coordinate_arrays(self):
+        linestring = LineString(((1, 2), (3.5, 4)))
+        polygon = Polygon([(0, 0), (1, 0), (0, 0)], [[(0.1, 0.1), (0.2, 0.1), (0.1, 0.1)]])
+
+        handler = cython_protocol_handler(ListParser(), deserializers.COORD_ARRAY_DESERIALIZERS)
+        serialized_linestrings = [cqltypes.LineStringType.serialize(linestring, 4),
+                                  cqltypes.LineStringType.serialize(LineString(), 4)]
+        serialized_polygons = [cqltypes.PolygonType.serialize(polygon, 4),
+                               cqltypes.PolygonType.serialize(Polygon(), 4)]
+        self.assertEqual([array('d', [1, 2, 3.5, 4]), array('d')],
+                         decode_column(cqltypes.LineStringType, serialized_linestrings, handler))
+        self.assertEqual([[array('d', [0, 0, 1, 0, 0, 0]), array('d', [0.1, 0.1, 0.2, 0.1, 0.1, 0.1])], []],
+                         decode_column(cqltypes.PolygonType, serialized_polygons, handler))
+        self.assertEqual([[array('d', [1, 2, 3.5, 4])]],
+                         decode_column(cqltypes.lookup_casstype('ListType(LineStringType)'),
+                                       [cqltypes.lookup_casstype('ListType(LineStringType)').serialize([linestring], 4)],
+                                       handler))
+
+        # other handlers still return geometries
+        self.assertEqual([linestring, LineString()], decode_column(cqltypes.LineStringType, serialized_linestrings))
+        self.assertEqual([polygon, Polygon()], decode_column(cqltypes.PolygonType, serialized_polygons))
+
+
+class RawDeserializersTest(unittest.TestCase):
+
+    @cythontest
+    def test_raw_values(self):
+        timestamp = datetime(2017, 1, 2, 3, 4, 5, 678000)
+        millis = 1483326245678
+        uuid, timeuuid = uuid4(), uuid1()
+        values = [
+            (cqltypes.DateType, timestamp, millis),
+            (cqltypes.TimestampType, timestamp, millis),
+            (cqltypes.DateType, datetime(1900, 1, 1), -2208988800000),
+            (cqltypes.UUIDType, uuid, uuid.bytes),
+            (cqltypes.TimeUUIDType, timeuuid, timeuuid.bytes),
+            (cqltypes.DecimalType, Decimal('-123.4500'), (-1234500, 4)),
+            (cqltypes.DecimalType, Decimal('1E+3'), (1, -3)),
+            (cqltypes.InetAddressType, '127.0.0.1', b'\x7f\x00\x00\x01'),
+            (cqltypes.InetAddressType, '::1', b'\x00' * 15 + b'\x01'),
+            (cqltypes.lookup_casstype('ListType(DateType)'), [timestamp], [millis]),
+            (cqltypes.lookup_casstype('MapType(UUIDType, DecimalType)'), {uuid: Decimal('0.1')}, {uuid.bytes: (1, 1)}),
+            (cqltypes.lookup_casstype('TupleType(Int32Type, TimeUUIDType)'), (1, timeuuid), (1, timeuuid.bytes)),
+            (cqltypes.Int32Type, 7, 7),
+        ]
+        for cqltype, value, raw in values:
+            serialized = cqltype.serialize(value, 4)
+            self.assertEqual([raw, None], decode_column(cqltype, [serialized, None], RawProtocolHandler))
+            self.assertEqual([value, None], decode_column(cqltype, [serialized, None]))
+
+    @cythontest
+    def test_overrides(self):
+        overrides = {'DateType': deserializers.DesRawDateType}
+        self.assertIs(type(deserializers.find_deserializer(cqltypes.DateType, overrides)), deserializers.DesRawDateType)
+        self.assertIs(type(deserializers.find_deserializer(cqltypes.DateType)), deserializers.DesDateType)
+        self.assertIs(type(deserializers.find_deserializer(cqltypes.UUIDType, overrides)), deserializers.DesUUIDType)
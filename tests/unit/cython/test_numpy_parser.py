@@ -0,0 +1,83 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+from tests.unit.cython.utils import numpytest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from datetime import datetime, date
+import struct
+from uuid import uuid4
+
+from dse import cqltypes
+from dse.protocol import (ColumnMetadata, NumpyProtocolHandler, NumpyNativeProtocolHandler, ResultMessage,
+                          RESULT_KIND_ROWS)
+
+
+class NumpyNativeTypesTest(unittest.TestCase):
+
+    columns = [('ts', cqltypes.TimestampType), ('d', cqltypes.SimpleDateType), ('u', cqltypes.UUIDType),
+               ('t', cqltypes.UTF8Type), ('b', cqltypes.BooleanType), ('i', cqltypes.Int32Type)]
+
+    uuid = uuid4()
+    rows = [
+        (datetime(2017, 1, 2, 3, 4, 5, 6000), date(2017, 1, 2), uuid, u'caf\xe9', True, 1),
+        (None, None, None, None, None, None),
+        (datetime(1960, 1, 1), date(1960, 1, 1), uuid, u'', False, 3),
+    ]
+
+    def decode(self, handler):
+        body = struct.pack('>iii', RESULT_KIND_ROWS, ResultMessage._NO_METADATA_FLAG, len(self.columns))
+        body += struct.pack('>i', len(self.rows))
+        for row in self.rows:
+            for (_, coltype), value in zip(self.columns, row):
+                if value is None:
+                    body += struct.pack('>i', -1)
+                else:
+                    value = coltype.serialize(value, 4)
+                    body += struct.pack('>i', len(value)) + value
+        result_metadata = [ColumnMetadata('ks', 'cf', name, coltype) for name, coltype in self.columns]
+        return handler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata).parsed_rows
+
+    @numpytest
+    def test_native_types(self):
+        import numpy as np
+
+        arrays = self.decode(NumpyNativeProtocolHandler)
+        self.assertEqual(np.dtype('M8[ms]'), arrays['ts'].dtype)
+        self.assertEqual(np.datetime64('2017-01-02T03:04:05.006'), arrays['ts'][0])
+        self.assertEqual(np.datetime64('1960-01-01T00:00:00.000'), arrays['ts'][2])
+
+        self.assertEqual(np.dtype('M8[D]'), arrays['d'].dtype)
+        self.assertEqual(np.datetime64('2017-01-02'), arrays['d'][0])
+        self.assertEqual(np.datetime64('1960-01-01'), arrays['d'][2])
+
+        self.assertEqual(np.dtype('S16'), arrays['u'].dtype)
+        self.assertEqual(self.uuid.bytes, arrays['u'][0])
+
+        self.assertEqual(np.dtype('S5'), arrays['t'].dtype)
+        self.assertEqual(u'caf\xe9'.encode('utf8'), arrays['t'][0])
+        self.assertEqual(b'', arrays['t'][2])
+
+        self.assertEqual([True, False], [arrays['b'][0], arrays['b'][2]])
+
+        for name, _ in self.columns:
+            self.assertIsInstance(arrays[name], np.ma.MaskedArray)
+            self.assertEqual([False, True, False], list(arrays[name].mask))
+
+    @numpytest
+    def test_default_types(self):
+        arrays = self.decode(NumpyProtocolHandler)
+        for name in ('ts', 'd', 'u', 't', 'b'):
+            self.assertEqual('O', arrays[name].dtype.kind)
+        self.assertEqual(self.rows[0][0], arrays['ts'][0])
+        self.assertIsNone(arrays['t'][1])
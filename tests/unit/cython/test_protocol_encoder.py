@@ -0,0 +1,71 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+import zlib
+
+from dse import ConsistencyLevel, ProtocolVersion
+from dse.cluster import ContinuousPagingOptions
+from dse.protocol import (QueryMessage, ExecuteMessage, BatchMessage, PrepareMessage, OptionsMessage,
+                          ProtocolHandler, _ProtocolHandler, _UNSET_VALUE, UnsupportedOperation)
+from dse.query import BatchType
+
+
+class ProtocolEncoderTest(unittest.TestCase):
+
+    def assert_same_frame(self, msg, protocol_version=4, compressor=None, stream_id=3, beta=False):
+        expected = _ProtocolHandler.encode_message(msg, stream_id, protocol_version, compressor, beta)
+        frame = ProtocolHandler.encode_message(msg, stream_id, protocol_version, compressor, beta)
+        self.assertEqual(expected, frame)
+
+    @cythontest
+    def test_query_message(self):
+        for version in ProtocolVersion.SUPPORTED_VERSIONS:
+            self.assert_same_frame(QueryMessage(u"SELECT * FROM t WHERE k = 'é'", ConsistencyLevel.ONE),
+                                   version)
+        msg = QueryMessage("SELECT * FROM t", ConsistencyLevel.QUORUM, ConsistencyLevel.LOCAL_SERIAL,
+                           fetch_size=5000, paging_state=b'\x00\x01state', timestamp=1234567890123456)
+        msg.tracing = True
+        msg.custom_payload = {'k': b'v'}
+        self.assert_same_frame(msg)
+        self.assert_same_frame(msg, stream_id=32767, beta=True)
+
+    @cythontest
+    def test_execute_message(self):
+        params = [b'\x00\x00\x00\x01', None, _UNSET_VALUE, b'', bytearray(b'abc'), b'x' * 5000]
+        for version in ProtocolVersion.SUPPORTED_VERSIONS:
+            self.assert_same_frame(ExecuteMessage(b'\xde\xad\xbe\xef', params, ConsistencyLevel.ONE), version)
+        self.assert_same_frame(ExecuteMessage(b'\xde\xad\xbe\xef', params, ConsistencyLevel.ONE), compressor=zlib.compress)
+
+    @cythontest
+    def test_continuous_paging(self):
+        options = ContinuousPagingOptions(max_pages=4, max_pages_per_second=3)
+        msg = ExecuteMessage(b'id', [b'1'], ConsistencyLevel.ONE, fetch_size=100, continuous_paging_options=options)
+        self.assert_same_frame(msg, ProtocolVersion.DSE_V1)
+        self.assertRaises(UnsupportedOperation, ProtocolHandler.encode_message, msg, 0, 4, None, False)
+
+    @cythontest
+    def test_batch_message(self):
+        queries = [(False, u"INSERT INTO t (k) VALUES (?)", [b'\x00\x00\x00\x01']),
+                   (True, b'\x01\x02', [None, b'abc'])] * 50
+        for version in ProtocolVersion.SUPPORTED_VERSIONS:
+            self.assert_same_frame(BatchMessage(BatchType.LOGGED, queries, ConsistencyLevel.ONE), version)
+        self.assert_same_frame(BatchMessage(BatchType.UNLOGGED, queries, ConsistencyLevel.ONE,
+                                            ConsistencyLevel.SERIAL, 1234))
+
+    @cythontest
+    def test_other_messages(self):
+        self.assert_same_frame(PrepareMessage("SELECT * FROM t"))
+        self.assert_same_frame(OptionsMessage())
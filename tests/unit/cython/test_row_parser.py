@@ -0,0 +1,116 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+import pickle
+import struct
+
+from dse import DriverException
+from dse.cqltypes import Int32Type, UTF8Type
+from dse.protocol import (ColumnMetadata, ProtocolHandler, LazyRowProtocolHandler, ResultMessage,
+                          RESULT_KIND_ROWS)
+from dse.query import dict_factory, named_tuple_factory
+
+
+def rows_body(rows, no_metadata=True):
+    body = struct.pack('>iii', RESULT_KIND_ROWS, ResultMessage._NO_METADATA_FLAG if no_metadata else 0, 2)
+    body += struct.pack('>i', len(rows))
+    for k, v in rows:
+        body += struct.pack('>ii', 4, k) + struct.pack('>i', len(v)) + v
+    return body
+
+
+class ParseDescCacheTest(unittest.TestCase):
+
+    def decode(self, body, result_metadata):
+        return ProtocolHandler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata)
+
+    @cythontest
+    def test_shared_for_result_metadata(self):
+        result_metadata = [ColumnMetadata('ks', 'cf', 'k', Int32Type),
+                           ColumnMetadata('ks', 'cf', 'v', UTF8Type)]
+        first = self.decode(rows_body([(1, b'a')]), result_metadata)
+        second = self.decode(rows_body([(2, b'b'), (3, b'c')]), result_metadata)
+
+        self.assertEqual([(1, u'a')], list(first.parsed_rows))
+        self.assertEqual([(2, u'b'), (3, u'c')], list(second.parsed_rows))
+        self.assertIs(first.column_names, second.column_names)
+        self.assertIs(first.column_types, second.column_types)
+
+        # new metadata, e.g. after the statement was prepared again
+        changed = [ColumnMetadata('ks', 'cf', 'k', Int32Type),
+                   ColumnMetadata('ks', 'cf', 'w', UTF8Type)]
+        third = self.decode(rows_body([(4, b'd')]), changed)
+        self.assertEqual(['k', 'w'], third.column_names)
+        self.assertEqual([(4, u'd')], list(third.parsed_rows))
+
+    @cythontest
+    def test_column_projection(self):
+        result_metadata = [ColumnMetadata('ks', 'cf', 'k', Int32Type),
+                           ColumnMetadata('ks', 'cf', 'v', UTF8Type)]
+        # not valid utf-8
+        body = rows_body([(1, b'\xff'), (2, b'')])
+        for handler in (ProtocolHandler, LazyRowProtocolHandler):
+            msg = handler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata,
+                                         column_projection=frozenset(['k']))
+            self.assertEqual(['k', 'v'], msg.column_names)
+            self.assertEqual([(1, None), (2, None)], list(msg.parsed_rows))
+
+        # projections have their own cached ParseDesc
+        self.assertEqual([(5, u'e')], list(self.decode(rows_body([(5, b'e')]), result_metadata).parsed_rows))
+        self.assertRaises(DriverException, self.decode, body, result_metadata)
+
+
+class LazyRowTest(unittest.TestCase):
+
+    result_metadata = [ColumnMetadata('ks', 'cf', 'k', Int32Type),
+                       ColumnMetadata('ks', 'cf', 'v', UTF8Type)]
+
+    def decode(self, body):
+        return LazyRowProtocolHandler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None,
+                                                     self.result_metadata)
+
+    @cythontest
+    def test_lazy_rows(self):
+        rows = self.decode(rows_body([(1, b'a'), (2, b''), (3, b'ccc')])).parsed_rows
+        self.assertEqual(3, len(rows))
+
+        row = rows[2]
+        self.assertEqual(2, len(row))
+        self.assertEqual(u'ccc', row[1])
+        self.assertIs(row[1], row['v'])
+        self.assertEqual(3, row[-2])
+        self.assertEqual((3, u'ccc'), row[:])
+        self.assertRaises(IndexError, row.__getitem__, 2)
+        self.assertRaises(KeyError, row.__getitem__, 'w')
+
+        self.assertEqual([(1, u'a'), (2, u''), (3, u'ccc')], rows)
+        self.assertEqual(hash((2, u'')), hash(rows[1]))
+        self.assertEqual([1, u'a'], list(rows[0]))
+        self.assertEqual("(1, 'a')", repr(rows[0]))
+
+    @cythontest
+    def test_row_factories(self):
+        rows = self.decode(rows_body([(1, b'a')])).parsed_rows
+        self.assertEqual([{'k': 1, 'v': u'a'}], dict_factory(['k', 'v'], rows))
+        self.assertEqual(u'a', named_tuple_factory(['k', 'v'], rows)[0].v)
+        self.assertEqual([(1, u'a')], pickle.loads(pickle.dumps(rows)))
+
+    @cythontest
+    def test_decoding_error(self):
+        body = rows_body([(1, b'\xff')])
+        row = self.decode(body).parsed_rows[0]
+        self.assertEqual(1, row[0])
+        self.assertRaises(DriverException, row.__getitem__, 1)
@@ -0,0 +1,99 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from datetime import datetime
+import struct
+from uuid import uuid1, uuid4
+
+from dse import cqltypes
+from dse.protocol import ColumnMetadata
+from dse.query import PreparedStatement, UNSET_VALUE
+
+try:
+    from dse.serializers import make_serializers, find_serializer, Serializer
+except ImportError:
+    pass
+
+
+class SerializersTest(unittest.TestCase):
+
+    values = [
+        (cqltypes.Int32Type, [0, 1, -1, 2 ** 31 - 1, -2 ** 31, True]),
+        (cqltypes.LongType, [0, 12345678901234, -2 ** 63, 2 ** 63 - 1]),
+        (cqltypes.CounterColumnType, [3]),
+        (cqltypes.DoubleType, [0.0, -1.5, 1e300, float('inf'), 3]),
+        (cqltypes.FloatType, [0.0, 1.25, -3.4028234663852886e+38, float('-inf'), 7]),
+        (cqltypes.BooleanType, [True, False, 1, 0]),
+        (cqltypes.BytesType, [b'', b'\x00\xff', bytearray(b'abc')]),
+        (cqltypes.UTF8Type, [u'', u'caf\xe9']),
+        (cqltypes.VarcharType, [u'text']),
+        (cqltypes.AsciiType, [u'ascii']),
+        (cqltypes.UUIDType, [uuid4()]),
+        (cqltypes.TimeUUIDType, [uuid1()]),
+        (cqltypes.DateType, [datetime(2017, 1, 2, 3, 4, 5), 1500000000000]),
+        (cqltypes.lookup_casstype('ListType(Int32Type)'), [[1, 2, 3]]),
+    ]
+
+    @cythontest
+    def test_same_as_cqltypes(self):
+        for cqltype, values in self.values:
+            serializer = find_serializer(cqltype)
+            for value in values:
+                self.assertEqual(cqltype.serialize(value, 4), serializer.serialize(value, 4),
+                                 "%s %r" % (cqltype.__name__, value))
+
+    @cythontest
+    def test_same_errors_as_cqltypes(self):
+        invalid = [
+            (cqltypes.Int32Type, 2 ** 31),
+            (cqltypes.Int32Type, 'a'),
+            (cqltypes.LongType, 2 ** 64),
+            (cqltypes.FloatType, 1e300),
+            (cqltypes.UUIDType, 'a'),
+        ]
+        for cqltype, value in invalid:
+            serializer = find_serializer(cqltype)
+            try:
+                cqltype.serialize(value, 4)
+            except Exception as exc:
+                self.assertRaises(type(exc), serializer.serialize, value, 4)
+            else:
+                self.fail("%s accepted %r" % (cqltype.__name__, value))
+
+    @cythontest
+    def test_generic_serializer(self):
+        serializer, = make_serializers([cqltypes.DecimalType])
+        self.assertIs(type(serializer), Serializer)
+
+    @cythontest
+    def test_cached_on_prepared_statement(self):
+        column_metadata = [ColumnMetadata('ks', 'cf', 'k', cqltypes.Int32Type),
+                           ColumnMetadata('ks', 'cf', 'v', cqltypes.UTF8Type)]
+        prepared = PreparedStatement(column_metadata=column_metadata, query_id=None, routing_key_indexes=[0],
+                                     query=None, keyspace='ks', protocol_version=4, result_metadata=None)
+
+        bound = prepared.bind((1, u'a'))
+        self.assertEqual([struct.pack('>i', 1), b'a'], bound.values)
+        serializers = prepared._serializers
+        self.assertEqual(2, len(serializers))
+
+        bound = prepared.bind({'k': 2})
+        self.assertEqual([struct.pack('>i', 2), UNSET_VALUE], bound.values)
+        self.assertIs(serializers, prepared._serializers)
+
+        self.assertRaises(TypeError, prepared.bind, ('a', u'a'))
+        self.assertRaises(ValueError, prepared.bind, (UNSET_VALUE, u'a'))
+        self.assertRaises(ValueError, prepared.bind, ())
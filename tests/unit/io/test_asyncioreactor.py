@@ -0,0 +1,179 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+import struct
+import time
+
+from six import BytesIO
+
+from mock import patch
+import ssl
+import weakref
+
+try:
+    import asyncio
+    from dse.io.asyncioreactor import AsyncioConnection, _cleanup, _ssl_context
+except (ImportError, SyntaxError):
+    AsyncioConnection = None  # NOQA
+
+from dse.connection import HEADER_DIRECTION_TO_CLIENT
+from dse.protocol import write_stringmultimap, SupportedMessage, ReadyMessage, OptionsMessage, StartupMessage
+from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback
+
+
+def _response(request_header, message_class, body=b''):
+    version, flags, stream = struct.unpack('>BBh', request_header[:4])
+    return struct.pack('>BBhBi', HEADER_DIRECTION_TO_CLIENT | version, 0, stream,
+                       message_class.opcode, len(body)) + body
+
+
+class _FakeServer(asyncio.Protocol if AsyncioConnection else object):
+    """
+    Answers the connection handshake, and records the opcodes of the other
+    requests it receives.
+    """
+
+    def __init__(self, received):
+        self.received = received
+        self.buf = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buf += data
+        while len(self.buf) >= 9:
+            length = struct.unpack('>i', self.buf[5:9])[0]
+            if len(self.buf) < 9 + length:
+                return
+            header, self.buf = self.buf[:9], self.buf[9 + length:]
+            opcode = struct.unpack('>B', header[4:5])[0]
+            self.received.append(opcode)
+            if opcode == OptionsMessage.opcode:
+                options = BytesIO()
+                write_stringmultimap(options, {'CQL_VERSION': ['3.4.4'], 'COMPRESSION': []})
+                self.transport.write(_response(header, SupportedMessage, options.getvalue()))
+            elif opcode == StartupMessage.opcode:
+                self.transport.write(_response(header, ReadyMessage))
+
+
+class AsyncioTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if AsyncioConnection is None:
+            raise unittest.SkipTest("asyncio is not available")
+        AsyncioConnection.initialize_reactor()
+        AsyncioConnection._loop.maybe_start()
+
+
+class AsyncioTimerTest(AsyncioTestCase):
+
+    def test_multi_timer_validation(self):
+        """
+        Verify that the timers are called in the correct order
+        """
+        # Tests timers submitted in order at various timeouts
+        submit_and_wait_for_completion(self, AsyncioConnection, 0, 100, 1, 100)
+        # Tests timers submitted in reverse order at various timeouts
+        submit_and_wait_for_completion(self, AsyncioConnection, 100, 0, -1, 100)
+        # Tests timers submitted in varying order at various timeouts
+        submit_and_wait_for_completion(self, AsyncioConnection, 0, 100, 1, 100, True)
+
+    def test_timer_cancellation(self):
+        """
+        Verify that timer cancellation is honored
+        """
+        timeout = .1
+        callback = TimerCallback(timeout)
+        timer = AsyncioConnection.create_timer(timeout, callback.invoke)
+        timer.cancel()
+        # Release context allow for timer thread to run.
+        time.sleep(.2)
+        timer_manager = AsyncioConnection._loop._timers
+        # Assert that the cancellation was honored
+        self.assertFalse(timer_manager._queue)
+        self.assertFalse(timer_manager._new_timers)
+        self.assertFalse(callback.was_invoked())
+
+
+class AsyncioSetupTest(AsyncioTestCase):
+
+    def test_cleanup_collected_loop(self):
+        class Loop(object):
+            pass
+
+        loop_weakref = weakref.ref(Loop())
+        self.assertIsNone(loop_weakref())
+        _cleanup(loop_weakref)
+
+    def test_ssl_context_check_hostname(self):
+        context = _ssl_context({'ssl_version': ssl.PROTOCOL_TLS_CLIENT, 'cert_reqs': ssl.CERT_NONE}, True)
+        self.assertTrue(context.check_hostname)
+        self.assertEqual(ssl.CERT_REQUIRED, context.verify_mode)
+
+        context = _ssl_context({'ssl_version': ssl.PROTOCOL_TLS_CLIENT, 'cert_reqs': ssl.CERT_NONE})
+        self.assertFalse(context.check_hostname)
+        self.assertEqual(ssl.CERT_NONE, context.verify_mode)
+
+    def test_check_hostname_without_match_hostname(self):
+        # ssl.match_hostname was removed in Python 3.12
+        with patch('dse.connection.ssl', spec=['PROTOCOL_TLS']):
+            with patch.object(AsyncioConnection, '_add_connection'):
+                c = AsyncioConnection('127.0.0.1', ssl_options={'check_hostname': True})
+        self.assertTrue(c._check_hostname)
+
+
+class AsyncioConnectionTest(AsyncioTestCase):
+
+    def setUp(self):
+        super(AsyncioConnectionTest, self).setUp()
+        self.received = []
+        loop = AsyncioConnection._loop.loop
+        future = asyncio.run_coroutine_threadsafe(
+            loop.create_server(lambda: _FakeServer(self.received), '127.0.0.1', 0), loop)
+        self.server = future.result(5)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def tearDown(self):
+        loop = AsyncioConnection._loop.loop
+        loop.call_soon_threadsafe(self.server.close)
+
+    def test_connect_and_close(self):
+        c = AsyncioConnection.factory('127.0.0.1', 5, port=self.port)
+        self.assertFalse(c.is_defunct)
+        self.assertEqual(StartupMessage.opcode, self.received[-1])
+
+        c.close()
+        self.assertTrue(c.is_closed)
+        self.assertFalse(c.is_defunct)
+
+    def test_connect_refused(self):
+        self.server.close()
+        time.sleep(.1)
+        self.assertRaises(Exception, AsyncioConnection.factory, '127.0.0.1', 5, port=self.port)
+
+    def test_no_connect_from_loop_thread(self):
+        loop = AsyncioConnection._loop.loop
+        result = []
+
+        def connect():
+            try:
+                AsyncioConnection.factory('127.0.0.1', 5, port=self.port)
+            except Exception as exc:
+                result.append(exc)
+
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(5)
+        loop.call_soon_threadsafe(connect)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(5)
+        self.assertEqual(1, len(result))
+        self.assertIn("event loop thread", str(result[0]))
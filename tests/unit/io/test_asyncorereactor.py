@@ -18,7 +18,6 @@ import errno
 import math
 import time
 from mock import patch, Mock
-import os
 from six import BytesIO
 import socket
 from socket import error as socket_error
@@ -30,7 +29,7 @@ from dse.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ReadyMessage, ServerError)
 from dse.marshal import uint8_pack, uint32_pack, int32_pack, uint16_pack
 from tests import is_monkey_patched
-from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback
+from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback, recv_into_from_recv
 
 
 class AsyncoreConnectionTest(unittest.TestCase):
@@ -62,6 +61,7 @@ class AsyncoreConnectionTest(unittest.TestCase):
         c = AsyncoreConnection('1.2.3.4', cql_version='3.0.1')
         c.socket = Mock()
         c.socket.send.side_effect = lambda x: len(x)
+        recv_into_from_recv(c.socket)
         return c
 
     def make_header_prefix(self, message_class, version=3, stream_id=0):
@@ -121,7 +121,6 @@ class AsyncoreConnectionTest(unittest.TestCase):
         responses = [
             header + (six.b('a') * (4096 - len(header))),
             six.b('a') * 4096,
-            socket_error(errno.EAGAIN),
             six.b('a') * 100,
             socket_error(errno.EAGAIN)]
 
@@ -135,15 +134,14 @@ class AsyncoreConnectionTest(unittest.TestCase):
         c.socket.recv.side_effect = side_effect
         c.handle_read()
         self.assertEqual(c._current_frame.end_pos, 20000 + len(header))
-        # the EAGAIN prevents it from reading the last 100 bytes
-        c._iobuf.seek(0, os.SEEK_END)
-        pos = c._iobuf.tell()
+        # the second read is sized to the rest of the frame, so coming up
+        # short means the socket is drained
+        pos = len(c._iobuf)
         self.assertEqual(pos, 4096 + 4096)
 
         # now tell it to read the last 100 bytes
         c.handle_read()
-        c._iobuf.seek(0, os.SEEK_END)
-        pos = c._iobuf.tell()
+        pos = len(c._iobuf)
         self.assertEqual(pos, 4096 + 4096 + 100)
 
     def test_protocol_error(self, *args):
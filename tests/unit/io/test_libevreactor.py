@@ -14,7 +14,6 @@ except ImportError:
 import errno
 import math
 from mock import patch, Mock
-import os
 import six
 from six import BytesIO
 from socket import error as socket_error
@@ -27,7 +26,7 @@ from dse.connection import (HEADER_DIRECTION_TO_CLIENT,
 from dse.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ReadyMessage, ServerError)
 from dse.marshal import uint8_pack, uint32_pack, int32_pack, uint16_pack
-from tests.unit.io.utils import TimerCallback
+from tests.unit.io.utils import TimerCallback, recv_into_from_recv
 from tests.unit.io.utils import submit_and_wait_for_completion
 from tests import is_monkey_patched
 
@@ -56,6 +55,7 @@ class LibevConnectionTest(unittest.TestCase):
         c = LibevConnection('1.2.3.4', cql_version='3.0.1')
         c._socket = Mock()
         c._socket.send.side_effect = lambda x: len(x)
+        recv_into_from_recv(c._socket)
         return c
 
     def make_header_prefix(self, message_class, version=3, stream_id=0):
@@ -115,7 +115,6 @@ class LibevConnectionTest(unittest.TestCase):
         responses = [
             header + (six.b('a') * (4096 - len(header))),
             six.b('a') * 4096,
-            socket_error(errno.EAGAIN),
             six.b('a') * 100,
             socket_error(errno.EAGAIN)]
 
@@ -129,15 +128,14 @@ class LibevConnectionTest(unittest.TestCase):
         c._socket.recv.side_effect = side_effect
         c.handle_read(None, 0)
         self.assertEqual(c._current_frame.end_pos, 20000 + len(header))
-        # the EAGAIN prevents it from reading the last 100 bytes
-        c._iobuf.seek(0, os.SEEK_END)
-        pos = c._iobuf.tell()
+        # the second read is sized to the rest of the frame, so coming up
+        # short means the socket is drained
+        pos = len(c._iobuf)
         self.assertEqual(pos, 4096 + 4096)
 
         # now tell it to read the last 100 bytes
         c.handle_read(None, 0)
-        c._iobuf.seek(0, os.SEEK_END)
-        pos = c._iobuf.tell()
+        pos = len(c._iobuf)
         self.assertEqual(pos, 4096 + 4096 + 100)
 
     def test_protocol_error(self, *args):
@@ -0,0 +1,263 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+import socket
+import struct
+from threading import Event, Thread
+import time
+
+from six import BytesIO
+
+try:
+    from dse.io.selectorreactor import SelectorConnection, SelectorLoop
+except ImportError:
+    SelectorConnection = SelectorLoop = None  # NOQA
+
+from dse.connection import HEADER_DIRECTION_TO_CLIENT
+from dse.protocol import write_stringmultimap, SupportedMessage, ReadyMessage, OptionsMessage, StartupMessage
+from tests import is_monkey_patched
+from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback
+
+
+def _response(request_header, message_class, body=b''):
+    version, flags, stream = struct.unpack('>BBh', request_header[:4])
+    return struct.pack('>BBhBi', HEADER_DIRECTION_TO_CLIENT | version, 0, stream,
+                       message_class.opcode, len(body)) + body
+
+
+class _FakeServer(object):
+    """
+    Answers the connection handshake of a single client, and records the
+    opcodes of the requests it receives.
+    """
+
+    def __init__(self):
+        self.received = []
+        self.listener = socket.socket()
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.client = None
+        self.closed = Event()
+        self._thread = Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _serve(self):
+        try:
+            self.client, _ = self.listener.accept()
+        except socket.error:
+            # closed without a connection
+            return
+        buf = b''
+        while True:
+            try:
+                data = self.client.recv(65536)
+            except socket.error:
+                break
+            if not data:
+                break
+            buf += data
+            while len(buf) >= 9:
+                length = struct.unpack('>i', buf[5:9])[0]
+                if len(buf) < 9 + length:
+                    break
+                header, buf = buf[:9], buf[9 + length:]
+                opcode = struct.unpack('>B', header[4:5])[0]
+                self.received.append(opcode)
+                if opcode == OptionsMessage.opcode:
+                    options = BytesIO()
+                    write_stringmultimap(options, {'CQL_VERSION': ['3.4.4'], 'COMPRESSION': []})
+                    self.client.sendall(_response(header, SupportedMessage, options.getvalue()))
+                elif opcode == StartupMessage.opcode:
+                    self.client.sendall(_response(header, ReadyMessage))
+        self.closed.set()
+
+    def close(self):
+        if self.client:
+            self.client.close()
+        try:
+            # wakes up a pending accept
+            self.listener.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.listener.close()
+
+
+class SelectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if is_monkey_patched():
+            raise unittest.SkipTest("Can't test selectors with monkey patching")
+        if SelectorConnection is None:
+            raise unittest.SkipTest("selectors is not available")
+        SelectorConnection.initialize_reactor()
+        SelectorConnection._loop.maybe_start()
+
+
+class SelectorTimerTest(SelectorTestCase):
+
+    def test_multi_timer_validation(self):
+        """
+        Verify that the timers are called in the correct order
+        """
+        # Tests timers submitted in order at various timeouts
+        submit_and_wait_for_completion(self, SelectorConnection, 0, 100, 1, 100)
+        # Tests timers submitted in reverse order at various timeouts
+        submit_and_wait_for_completion(self, SelectorConnection, 100, 0, -1, 100)
+        # Tests timers submitted in varying order at various timeouts
+        submit_and_wait_for_completion(self, SelectorConnection, 0, 100, 1, 100, True)
+
+    def test_timer_cancellation(self):
+        """
+        Verify that timer cancellation is honored
+        """
+        timeout = .1
+        callback = TimerCallback(timeout)
+        timer = SelectorConnection.create_timer(timeout, callback.invoke)
+        timer.cancel()
+        # Release context allow for timer thread to run.
+        time.sleep(.2)
+        timer_manager = SelectorConnection._loop._timers
+        # Assert that the cancellation was honored
+        self.assertFalse(timer_manager._queue)
+        self.assertFalse(timer_manager._new_timers)
+        self.assertFalse(callback.was_invoked())
+
+
+class SelectorNotifyTest(SelectorTestCase):
+
+    def test_notify_during_drain(self):
+        """
+        Verify that a notify() racing with the loop draining the wake socket is not lost
+        """
+        loop = SelectorLoop()
+        wake_r = loop._wake_r
+
+        class RacingSocket(object):
+            # another thread notifies while the loop is draining
+            raced = False
+
+            def recv(self, size):
+                data = wake_r.recv(size)
+                if not self.raced:
+                    self.raced = True
+                    loop.notify()
+                return data
+
+        try:
+            loop.notify()
+            loop._wake_r = RacingSocket()
+            loop._clear_notification()
+            loop._wake_r = wake_r
+
+            # the next notify() must wake the loop again
+            loop.notify()
+            self.assertTrue(loop._notified)
+            self.assertEqual(b'x', wake_r.recv(4096))
+        finally:
+            loop._selector.close()
+            wake_r.close()
+            loop._wake_w.close()
+
+
+class SelectorConnectionTest(SelectorTestCase):
+
+    def setUp(self):
+        super(SelectorConnectionTest, self).setUp()
+        self.server = _FakeServer()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_connect_and_close(self):
+        c = SelectorConnection.factory('127.0.0.1', 5, port=self.server.port)
+        self.assertFalse(c.is_defunct)
+        self.assertEqual(StartupMessage.opcode, self.server.received[-1])
+        # write interest is dropped once the handshake is written
+        self.assertFalse(c._write_armed)
+
+        c.close()
+        self.assertTrue(c.is_closed)
+        self.assertFalse(c.is_defunct)
+        self.assertTrue(self.server.closed.wait(5))
+        self.assertFalse(c._socket_registered)
+
+    def test_closed_by_server(self):
+        c = SelectorConnection.factory('127.0.0.1', 5, port=self.server.port)
+        self.server.client.shutdown(socket.SHUT_RDWR)
+        for _ in range(50):
+            if c.is_closed:
+                break
+            time.sleep(.1)
+        self.assertTrue(c.is_closed)
+
+    def test_connect_refused(self):
+        self.server.close()
+        self.assertRaises(Exception, SelectorConnection.factory, '127.0.0.1', 5, port=self.server.port)
+
+
+class SelectorLoopsTest(SelectorTestCase):
+
+    def setUp(self):
+        super(SelectorLoopsTest, self).setUp()
+
+        class ShardedConnection(SelectorConnection):
+            _loop = None
+            _loops = ()
+
+        self.connection_class = ShardedConnection
+        self.servers = [_FakeServer() for _ in range(2)]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+        self.connection_class.handle_fork()
+
+    def test_round_robin(self):
+        cls = self.connection_class
+        cls.set_loop_count(2)
+        cls.initialize_reactor()
+        self.assertEqual(2, len(cls._loops))
+        self.assertRaises(ValueError, cls.set_loop_count, 3)
+
+        conns = [cls.factory('127.0.0.1', 5, port=server.port) for server in self.servers]
+        self.assertEqual(set(cls._loops), set(c._loop for c in conns))
+
+        utilization = cls.get_loop_utilization()
+        self.assertEqual(2, len(utilization))
+        for u in utilization:
+            self.assertTrue(0.0 <= u <= 1.0)
+
+        # timers are spread over the loops too
+        callbacks = [TimerCallback(.01) for _ in range(4)]
+        for callback in callbacks:
+            cls.create_timer(.01, callback.invoke)
+        time.sleep(.1)
+        self.assertTrue(all(c.was_invoked() for c in callbacks))
+
+        for c in conns:
+            c.close()
+
+    def test_by_host(self):
+        cls = self.connection_class
+        cls.set_loop_count(4, by_host=True)
+        cls.initialize_reactor()
+
+        conns = [cls.factory('127.0.0.1', 5, port=server.port) for server in self.servers]
+        self.assertIs(conns[0]._loop, conns[1]._loop)
+        for c in conns:
+            c.close()
+
+    def test_invalid_count(self):
+        self.assertRaises(ValueError, self.connection_class.set_loop_count, 0)
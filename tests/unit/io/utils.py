@@ -39,6 +39,18 @@ class TimerCallback(object):
         return False
 
 
+def recv_into_from_recv(sock):
+    """
+    Makes ``recv_into`` on a mock socket read whatever its mocked ``recv``
+    returns, so tests can set ``sock.recv.return_value`` or ``side_effect``.
+    """
+    def recv_into(buf, nbytes=0):
+        data = sock.recv(nbytes or len(buf))
+        buf[:len(data)] = data
+        return len(data)
+    sock.recv_into.side_effect = recv_into
+
+
 def get_timeout(gross_time, start, end, precision, split_range):
     """
     A way to generate varying timeouts based on ranges
@@ -11,7 +11,7 @@ try:
 except ImportError:
     import unittest  # noqa
 
-from mock import patch
+from mock import Mock, patch
 
 from dse import ConsistencyLevel, DriverException, Timeout, Unavailable, RequestExecutionException, ReadTimeout, WriteTimeout, CoordinationFailure, ReadFailure, WriteFailure, FunctionFailure, AlreadyExists,\
     InvalidRequest, Unauthorized, AuthenticationFailed, OperationTimedOut, UnsupportedOperation, RequestValidationException, ConfigurationException, ProtocolVersion
@@ -91,6 +91,36 @@ class ClusterTest(unittest.TestCase):
             Cluster(contact_points="not a sequence", protocol_version=4, connect_timeout=1)
 
 
+    def test_prepare_all_queries(self):
+        class Statement(object):
+            def __init__(self, keyspace, query_string):
+                self.keyspace = keyspace
+                self.query_string = query_string
+
+        statements = [Statement(ks, str(i)) for i, ks in enumerate([None, 'b', 'a', None, 'b'])]
+        cluster = Cluster(protocol_version=4, reprepare_concurrency=7, reprepare_timeout=2)
+        for i, statement in enumerate(statements):
+            cluster.add_prepared(i, statement)
+
+        connection = Mock()
+        keyspaces = []
+        prepared = []
+        connection.set_keyspace_blocking.side_effect = keyspaces.append
+
+        def wait_for_responses(*messages, **kwargs):
+            self.assertEqual({'timeout': 2, 'fail_on_error': False, 'max_in_flight': 7}, kwargs)
+            prepared.append((keyspaces[-1] if keyspaces else None, [m.query for m in messages]))
+            return [(True, None)] * len(messages)
+
+        connection.wait_for_responses.side_effect = wait_for_responses
+        cluster.connection_factory = Mock(return_value=connection)
+        cluster._prepare_all_queries(Host('127.0.0.1', SimpleConvictionPolicy))
+
+        self.assertEqual(['a', 'b'], keyspaces)
+        self.assertEqual([(None, ['0', '3']), ('a', ['2']), ('b', ['1', '4'])], prepared)
+        connection.close.assert_called_once_with()
+
+
 class SchedulerTest(unittest.TestCase):
     # TODO: this suite could be expanded; for now just adding a test covering a ticket
 
@@ -21,10 +21,13 @@ from six.moves.queue import PriorityQueue
 import sys
 import platform
 
-from dse.cluster import Cluster, Session
-from dse.concurrent import execute_concurrent, execute_concurrent_with_args
+from dse import OperationTimedOut, WriteTimeout, InvalidRequest, ConsistencyLevel
+from dse.cluster import Cluster, Session, NoHostAvailable, ResponseFuture
+from dse.concurrent import execute_concurrent, execute_concurrent_with_args, AdaptiveConcurrency
+from dse.protocol import OverloadedErrorMessage, QueryMessage, ResultMessage, RESULT_KIND_VOID
 from dse.hosts import Host
 from dse.policies import SimpleConvictionPolicy
+from dse.query import SimpleStatement
 from tests.unit.utils import mock_session_pools
 
 
@@ -43,6 +46,8 @@ class MockResponseResponseFuture():
 
     def __init__(self, reverse):
 
+        self._errors = {}
+
         # if this is true invoke callback in the reverse order then what they were insert
         self.reverse = reverse
         # hardcoded to avoid paging logic
@@ -172,7 +177,7 @@ class ConcurrencyTest((unittest.TestCase)):
         """
         self.insert_and_validate_list_generator(True, True)
 
-    def insert_and_validate_list_results(self, reverse, slowdown):
+    def insert_and_validate_list_results(self, reverse, slowdown, concurrency=100):
         """
         This utility method will execute submit various statements for execution using the ConcurrentExecutorListResults,
         then invoke a separate thread to execute the callback associated with the futures registered
@@ -189,14 +194,14 @@ class ConcurrencyTest((unittest.TestCase)):
 
         t = TimedCallableInvoker(our_handler, slowdown=slowdown)
         t.start()
-        results = execute_concurrent(mock_session, statements_and_params)
+        results = execute_concurrent(mock_session, statements_and_params, concurrency=concurrency)
 
         while(not our_handler.pending_callbacks.empty()):
             time.sleep(.01)
         t.stop()
         self.validate_result_ordering(results)
 
-    def insert_and_validate_list_generator(self, reverse, slowdown):
+    def insert_and_validate_list_generator(self, reverse, slowdown, concurrency=100):
         """
         This utility method will execute submit various statements for execution using the ConcurrentExecutorGenResults,
         then invoke a separate thread to execute the callback associated with the futures registered
@@ -214,11 +219,40 @@ class ConcurrencyTest((unittest.TestCase)):
         t = TimedCallableInvoker(our_handler, slowdown=slowdown)
         t.start()
         try:
-            results = execute_concurrent(mock_session, statements_and_params, results_generator=True)
+            results = execute_concurrent(mock_session, statements_and_params, concurrency=concurrency, results_generator=True)
             self.validate_result_ordering(results)
         finally:
             t.stop()
 
+    def test_results_ordering_adaptive(self):
+        concurrency = AdaptiveConcurrency(initial_limit=5, window=10)
+        self.insert_and_validate_list_results(False, False, concurrency)
+        self.insert_and_validate_list_generator(False, False, concurrency)
+        self.assertGreater(concurrency.limit, 5)
+        self.assertIsNotNone(concurrency.p99)
+
+    def test_adaptive_limit_below_one(self):
+        # statements keep executing one at a time if the limit drops below one
+        for results_generator in (False, True):
+            concurrency = AdaptiveConcurrency(initial_limit=2)
+            concurrency.limit = 0.5
+            our_handler = MockResponseResponseFuture(reverse=False)
+            mock_session = Mock()
+            mock_session.execute_async.return_value = our_handler
+
+            t = TimedCallableInvoker(our_handler, slowdown=False)
+            t.start()
+            try:
+                results = execute_concurrent_with_args(mock_session, "INSERT INTO test3rf.test (k, v) VALUES (%s, 0)",
+                                                       [(i, ) for i in range(10)], concurrency=concurrency,
+                                                       results_generator=results_generator)
+                results = list(results)
+            finally:
+                t.stop()
+            self.assertEqual(10, len(results))
+            self.assertEqual(10, mock_session.execute_async.call_count)
+            self.validate_result_ordering(results)
+
     def validate_result_ordering(self, results):
         """
         This method will validate that the timestamps returned from the result are in order. This indicates that the
@@ -253,3 +287,101 @@ class ConcurrencyTest((unittest.TestCase)):
         for r in results:
             self.assertFalse(r[0])
             self.assertIsInstance(r[1], TypeError)
+
+
+class AdaptiveConcurrencyTest(unittest.TestCase):
+
+    def test_validation(self):
+        self.assertRaises(ValueError, AdaptiveConcurrency, initial_limit=0)
+        self.assertRaises(ValueError, AdaptiveConcurrency, initial_limit=0.5, min_limit=0.5)
+        self.assertRaises(ValueError, AdaptiveConcurrency, initial_limit=5, min_limit=10)
+        self.assertRaises(ValueError, AdaptiveConcurrency, initial_limit=50, max_limit=10)
+        self.assertRaises(ValueError, AdaptiveConcurrency, backoff_ratio=1)
+
+    def test_additive_increase(self):
+        concurrency = AdaptiveConcurrency(initial_limit=10, max_limit=12)
+        for _ in range(10):
+            concurrency.on_success(0.01, in_flight=10)
+        self.assertAlmostEqual(11, concurrency.limit, delta=0.1)
+
+        # the limit is not raised while it is not being used
+        limit = concurrency.limit
+        concurrency.on_success(0.01, in_flight=1)
+        self.assertEqual(limit, concurrency.limit)
+
+        for _ in range(100):
+            concurrency.on_success(0.01, in_flight=12)
+        self.assertEqual(12, concurrency.limit)
+        self.assertAlmostEqual(0.01, concurrency.latency)
+
+    def test_backoff_on_errors(self):
+        concurrency = AdaptiveConcurrency(initial_limit=100, min_limit=80, backoff_ratio=0.5)
+        concurrency.on_error(InvalidRequest())
+        self.assertEqual(100, concurrency.limit)
+
+        # a round of errors only backs off once
+        for _ in range(10):
+            concurrency.on_error(WriteTimeout("timeout", consistency=ConsistencyLevel.ONE,
+                                              required_responses=1, received_responses=0, write_type=0))
+        self.assertEqual(80, concurrency.limit)
+
+        for _ in range(80):
+            concurrency.on_error(OperationTimedOut())
+        self.assertEqual(80, concurrency.limit)
+
+        concurrency = AdaptiveConcurrency(initial_limit=10)
+        concurrency.on_error(NoHostAvailable("overloaded", {'127.0.0.1': OverloadedErrorMessage(0x1001, 'overloaded', None)}))
+        self.assertEqual(9, concurrency.limit)
+        concurrency = AdaptiveConcurrency(initial_limit=10)
+        concurrency.on_error(NoHostAvailable("invalid", {'127.0.0.1': InvalidRequest()}))
+        self.assertEqual(10, concurrency.limit)
+
+    def test_backoff_on_rising_p99(self):
+        concurrency = AdaptiveConcurrency(initial_limit=10, window=10, tolerance=2.0, backoff_ratio=0.5)
+        for latency in [0.01] * 9 + [0.02]:
+            concurrency.on_success(latency, in_flight=0)
+        self.assertEqual(0.02, concurrency.p99)
+        self.assertEqual(0.02, concurrency.baseline_p99)
+        self.assertEqual(10, concurrency.limit)
+
+        for latency in [0.01] * 9 + [0.03]:
+            concurrency.on_success(latency, in_flight=0)
+        self.assertEqual(10, concurrency.limit)
+        self.assertAlmostEqual(0.021, concurrency.baseline_p99)
+
+        for latency in [0.01] * 9 + [0.1]:
+            concurrency.on_success(latency, in_flight=0)
+        self.assertEqual(5, concurrency.limit)
+        self.assertGreater(concurrency.baseline_p99, 0.021)
+
+    def test_backoff_on_retried_overload(self):
+        session = Mock(spec=Session)
+        session.cluster.max_pending_requests_per_host = 0
+        session.cluster.pending_request_timeout = 2.0
+        session.cluster._default_load_balancing_policy.make_query_plan.return_value = ['ip1', 'ip2']
+        session._pools.get.return_value.is_shutdown = False
+        session._pools.get.return_value.borrow_connection.return_value = (Mock(), 1)
+
+        def overloaded_then(response):
+            query = SimpleStatement("INSERT INTO foo (k, v) VALUES (1, 1)")
+            rf = ResponseFuture(session, QueryMessage(query=query, consistency_level=ConsistencyLevel.ONE), query, 1)
+            rf.send_request()
+            rf._set_result('ip1', None, None, OverloadedErrorMessage(0x1001, 'overloaded', None))
+            # retried against the next host
+            session.submit.call_args[0][0](*session.submit.call_args[0][1:])
+            rf._set_result('ip2', None, None, response)
+            return rf
+
+        concurrency = AdaptiveConcurrency(initial_limit=10)
+        session.execute_async.return_value = overloaded_then(Mock(spec=ResultMessage, kind=RESULT_KIND_VOID))
+        results = execute_concurrent_with_args(session, "INSERT INTO foo (k, v) VALUES (1, 1)", [()],
+                                               concurrency=concurrency)
+        self.assertTrue(results[0].success)
+        self.assertEqual(9, concurrency.limit)
+
+        concurrency = AdaptiveConcurrency(initial_limit=10)
+        session.execute_async.return_value = overloaded_then(InvalidRequest())
+        results = execute_concurrent_with_args(session, "INSERT INTO foo (k, v) VALUES (1, 1)", [()],
+                                               concurrency=concurrency, raise_on_first_error=False)
+        self.assertFalse(results[0].success)
+        self.assertEqual(9, concurrency.limit)
@@ -14,17 +14,19 @@ except ImportError:
 from mock import Mock, ANY, call, patch
 import six
 from six import BytesIO
+from six.moves import queue as Queue
 import time
-from threading import Lock
+from threading import Lock, Thread
+import socket
 
 from dse import OperationTimedOut
 from dse.cluster import Cluster
 from dse.connection import (Connection, HEADER_DIRECTION_TO_CLIENT, ProtocolError,
-                                  locally_supported_compressions, ConnectionHeartbeat, _Frame, Timer, TimerManager,
+                                  locally_supported_compressions, ConnectionHeartbeat, _Frame, _ReadBuffer, _WriteQueue, Timer, TimerManager, HashedWheelTimer,
                                   ConnectionException)
 from dse.marshal import uint8_pack, uint32_pack, int32_pack
 from dse.protocol import (write_stringmultimap, write_int, write_string,
-                                SupportedMessage, ProtocolHandler)
+                                SupportedMessage, OptionsMessage, PrepareMessage, ProtocolHandler)
 
 
 class ConnectionTest(unittest.TestCase):
@@ -71,7 +73,6 @@ class ConnectionTest(unittest.TestCase):
         header = self.make_header_prefix(SupportedMessage, version=0x7f)
         options = self.make_options_body()
         message = self.make_msg(header, options)
-        c._iobuf = BytesIO()
         c._iobuf.write(message)
         c.process_io_buffer()
 
@@ -88,7 +89,6 @@ class ConnectionTest(unittest.TestCase):
         # read in a SupportedMessage response
         header = self.make_header_prefix(SupportedMessage)
         message = header + int32_pack(-13)
-        c._iobuf = BytesIO()
         c._iobuf.write(message)
         c.process_io_buffer()
 
@@ -250,6 +250,239 @@ class ConnectionTest(unittest.TestCase):
         cluster = Cluster(connection_class='test')
         self.assertEqual('test', cluster.connection_class)
 
+    def test_multiple_frames_one_read(self):
+        c = self.make_connection()
+        bodies = []
+        c.process_msg = Mock(side_effect=lambda frame, body: bodies.append(bytes(body)))
+
+        header = self.make_header_prefix(SupportedMessage)
+        messages = [self.make_msg(header, six.b('x') * n) for n in (3, 0, 17)]
+        c._iobuf.write(six.binary_type().join(messages) + messages[0][:5])
+        c.process_io_buffer()
+
+        self.assertEqual([six.b('x') * 3, six.binary_type(), six.b('x') * 17], bodies)
+        self.assertEqual(messages[0][:5], c._iobuf.getvalue())
+        self.assertIsNone(c._current_frame)
+
+        # the rest of the partial frame arrives
+        c._iobuf.write(messages[0][5:])
+        c.process_io_buffer()
+        self.assertEqual(six.b('x') * 3, bodies[-1])
+        self.assertEqual(0, len(c._iobuf))
+
+    def test_request_ids(self):
+        c = self.make_connection()
+        c.max_request_id = 301
+        self.assertEqual(0, c.in_flight)
+
+        request_ids = [c.get_request_id() for _ in range(302)]
+        self.assertEqual(list(range(302)), request_ids)
+        self.assertEqual(302, c.in_flight)
+        self.assertIsNone(c.get_request_id())
+
+        c.request_ids.append(5)
+        self.assertEqual(301, c.in_flight)
+        self.assertEqual(5, c.get_request_id())
+
+    def test_request_id_freed_before_callback(self):
+        c = self.make_connection()
+        c.push = Mock()
+        in_flights = []
+        request_id = c.get_request_id()
+        c.send_msg(OptionsMessage(), request_id, lambda response: in_flights.append(c.in_flight))
+        self.assertEqual(1, c.in_flight)
+
+        options = self.make_options_body()
+        c._iobuf.write(self.make_msg(self.make_header_prefix(SupportedMessage, stream_id=request_id), options))
+        c.process_io_buffer()
+        self.assertEqual([0], in_flights)
+        self.assertEqual(0, c.in_flight)
+
+    def test_request_id_freed_on_encode_error(self):
+        c = self.make_connection()
+        request_id = c.get_request_id()
+        encoder = Mock(side_effect=ValueError())
+        self.assertRaises(ValueError, c.send_msg, OptionsMessage(), request_id, Mock(), encoder=encoder)
+        self.assertEqual(0, c.in_flight)
+        self.assertFalse(c._requests)
+
+    def test_wait_for_responses_max_in_flight(self):
+        c = self.make_connection()
+        sent = Queue.Queue()
+        in_flights = []
+
+        def send_msg(msg, request_id, cb):
+            in_flights.append(c.in_flight)
+            sent.put((msg, request_id, cb))
+
+        def respond():
+            for _ in range(10):
+                msg, request_id, cb = sent.get()
+                time.sleep(0.001)
+                c.release_request_id(request_id)
+                cb(msg.query)
+
+        c.send_msg = send_msg
+        responder = Thread(target=respond)
+        responder.start()
+        messages = [PrepareMessage(query=str(i)) for i in range(10)]
+        responses = c.wait_for_responses(*messages, timeout=5, fail_on_error=False, max_in_flight=3)
+        responder.join()
+
+        self.assertEqual([(True, str(i)) for i in range(10)], responses)
+        self.assertEqual(3, max(in_flights))
+
+    def test_wait_for_responses_max_in_flight_timeout(self):
+        c = self.make_connection()
+        c.send_msg = Mock()
+        messages = [PrepareMessage(query=str(i)) for i in range(3)]
+        self.assertRaises(OperationTimedOut, c.wait_for_responses, *messages, timeout=0.01, max_in_flight=2)
+        self.assertEqual(2, c.send_msg.call_count)
+
+    def test_read_sized_to_frame(self):
+        c = self.make_connection()
+        c.in_buffer_size = 16
+        self.assertEqual(16, c._next_read_size())
+
+        header = self.make_header_prefix(SupportedMessage)
+        message = self.make_msg(header, six.b('a') * 100)
+        c._iobuf.write(message[:20])
+        self.assertEqual(len(message) - 20, c._next_read_size())
+
+        sock = Mock()
+        sock.recv_into = lambda view, size: size
+        self.assertEqual(89, c._recv_into_buffer(sock, c._next_read_size()))
+        self.assertEqual(len(message), len(c._iobuf))
+        self.assertEqual(1, c.recv_count)
+        self.assertEqual(89.0, c.bytes_per_recv)
+
+    def test_retained_body_view(self):
+        c = self.make_connection()
+        views = []
+        c.process_msg = Mock(side_effect=lambda frame, body: views.append(body))
+
+        header = self.make_header_prefix(SupportedMessage)
+        first = self.make_msg(header, six.b('a') * 10)
+        second = self.make_msg(header, six.b('b') * 10)
+        c._iobuf.write(first + second[:4])
+        c.process_io_buffer()
+        self.assertIsInstance(views[0], memoryview)
+
+        # the buffer moves to new storage instead of invalidating the view
+        c._iobuf.write(second[4:])
+        c.process_io_buffer()
+        self.assertEqual(six.b('a') * 10, views[0].tobytes())
+        self.assertEqual(six.b('b') * 10, views[1].tobytes())
+        self.assertEqual(0, len(c._iobuf))
+
+
+class ReadBufferTest(unittest.TestCase):
+
+    def test_compaction(self):
+        buf = _ReadBuffer()
+        buf.compact_threshold = 8
+        buf.write(six.b('0123456789abcdef'))
+        buf.consume(4)
+        self.assertEqual(six.b('456789abcdef'), buf.getvalue())
+        self.assertEqual(4, buf._pos)
+
+        buf.consume(6)
+        self.assertEqual(six.b('abcdef'), buf.getvalue())
+        self.assertEqual(0, buf._pos)
+        self.assertEqual(six.b('cd'), buf.view(2, 4).tobytes())
+        self.assertEqual(ord('f'), buf.byte_at(5))
+
+        buf.consume(6)
+        self.assertEqual(0, len(buf))
+        self.assertEqual(six.binary_type(), buf.getvalue())
+
+    def test_recv_into_reuses_storage(self):
+        buf = _ReadBuffer()
+        sock = Mock()
+        sock.recv_into = lambda view, size: size
+
+        self.assertEqual(100, buf.recv_into(sock, 100))
+        self.assertEqual(100, buf.capacity)
+        storage = buf._buf
+        buf.consume(100)
+        self.assertEqual(50, buf.recv_into(sock, 50))
+        self.assertIs(storage, buf._buf)
+
+        # a retained view moves the buffer to new storage when drained
+        view = buf.view(0, 10)
+        buf.consume(50)
+        self.assertIsNot(storage, buf._buf)
+        self.assertEqual(100, buf.capacity)
+        del view
+
+    def test_partial_frame_compacted_in_place(self):
+        buf = _ReadBuffer()
+        sock = Mock()
+        sock.recv_into = lambda view, size: size
+
+        buf.recv_into(sock, 1000)
+        storage = buf._buf
+        for _ in range(100):
+            # a partial frame is left at the end of each read
+            buf.consume(len(buf) - 100)
+            self.assertEqual(900, buf.recv_into(sock, 900))
+            self.assertTrue(storage is buf._buf)
+            self.assertEqual(0, buf._pos)
+
+        buf.consume(len(buf))
+        buf.write(six.b('x') * 996 + six.b('abcd'))
+        buf.consume(996)
+        buf.recv_into(sock, 10)
+        self.assertEqual(six.b('abcd'), buf.getvalue()[:4])
+        self.assertTrue(storage is buf._buf)
+
+        # storage referenced by a body view is never written to
+        view = buf.view(0, 4)
+        buf.consume(len(buf) - 1)
+        buf.recv_into(sock, 1000)
+        self.assertFalse(storage is buf._buf)
+        self.assertEqual(six.b('abcd'), view.tobytes())
+
+
+class WriteQueueTest(unittest.TestCase):
+
+    def test_partial_sends(self):
+        queue = _WriteQueue(6)
+        queue.append(six.b('abcd'))
+        queue.append(six.b('efgh'))
+        queue.append(six.b('ij'))
+        self.assertEqual(10, len(queue))
+
+        sock = Mock()
+        sock.send.side_effect = [3, 6, 1]
+        self.assertEqual(3, queue.send(sock))
+        self.assertEqual(six.b('abcdef'), sock.send.call_args[0][0])
+        self.assertEqual(7, len(queue))
+
+        # resumes from the middle of the first frame
+        self.assertEqual(6, queue.send(sock))
+        self.assertEqual(six.b('defghi'), sock.send.call_args[0][0])
+        self.assertEqual(1, queue.send(sock))
+        self.assertEqual(six.b('j'), bytes(sock.send.call_args[0][0]))
+        self.assertEqual(0, len(queue))
+        self.assertEqual(0, queue.send(sock))
+
+    @unittest.skipUnless(hasattr(socket, 'socketpair') and hasattr(socket.socket, 'sendmsg'),
+                         "vectored I/O is not available")
+    def test_sendmsg(self):
+        queue = _WriteQueue(65536)
+        for i in range(10):
+            queue.append(six.b('frame %d;' % i))
+
+        left, right = socket.socketpair()
+        try:
+            self.assertEqual(80, queue.send(left))
+            self.assertEqual(0, len(queue))
+            self.assertEqual(six.b('').join(six.b('frame %d;' % i) for i in range(10)), right.recv(100))
+        finally:
+            left.close()
+            right.close()
+
 
 @patch('dse.connection.ConnectionHeartbeat._raise_if_stopped')
 class ConnectionHeartbeatTest(unittest.TestCase):
@@ -334,6 +567,7 @@ class ConnectionHeartbeatTest(unittest.TestCase):
         max_connection = Mock(spec=Connection, host='localhost',
                               lock=Lock(),
                               max_request_id=in_flight - 1, in_flight=in_flight,
+                              get_request_id=Mock(return_value=None),
                               is_idle=True, is_defunct=False, is_closed=False)
         holder = get_holders.return_value[0]
         holder.get_connections.return_value.append(max_connection)
@@ -360,14 +594,14 @@ class ConnectionHeartbeatTest(unittest.TestCase):
                           lock=Lock(),
                           in_flight=0, is_idle=True,
                           is_defunct=False, is_closed=False,
-                          get_request_id=lambda: request_id,
+                          get_request_id=Mock(return_value=request_id),
                           send_msg=Mock(side_effect=send_msg))
         holder = get_holders.return_value[0]
         holder.get_connections.return_value.append(connection)
 
         self.run_heartbeat(get_holders)
 
-        self.assertEqual(connection.in_flight, get_holders.call_count)
+        self.assertEqual(connection.get_request_id.call_count, get_holders.call_count)
         connection.send_msg.assert_has_calls([call(ANY, request_id, ANY)] * get_holders.call_count)
         connection.defunct.assert_has_calls([call(ANY)] * get_holders.call_count)
         exc = connection.defunct.call_args_list[0][0][0]
@@ -388,14 +622,14 @@ class ConnectionHeartbeatTest(unittest.TestCase):
                           lock=Lock(),
                           in_flight=0, is_idle=True,
                           is_defunct=False, is_closed=False,
-                          get_request_id=lambda: request_id,
+                          get_request_id=Mock(return_value=request_id),
                           send_msg=Mock(side_effect=send_msg))
         holder = get_holders.return_value[0]
         holder.get_connections.return_value.append(connection)
 
         self.run_heartbeat(get_holders)
 
-        self.assertEqual(connection.in_flight, get_holders.call_count)
+        self.assertEqual(connection.get_request_id.call_count, get_holders.call_count)
         connection.send_msg.assert_has_calls([call(ANY, request_id, ANY)] * get_holders.call_count)
         connection.defunct.assert_has_calls([call(ANY)] * get_holders.call_count)
         exc = connection.defunct.call_args_list[0][0][0]
@@ -419,3 +653,69 @@ class TimerTest(unittest.TestCase):
         tm.add_timer(t2)
         # Prior to #466: "TypeError: unorderable types: Timer() < Timer()"
         tm.service_timeouts()
+
+
+class HashedWheelTimerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch('dse.connection.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.drivers = []
+        self.wheel = HashedWheelTimer(self.create_driver, tick_duration=0.1, ticks_per_wheel=8)
+
+    def create_driver(self, delay, callback):
+        self.drivers.append((delay, callback))
+        return Mock()
+
+    def advance(self, seconds):
+        self.now += seconds
+        _, on_tick = self.drivers[-1]
+        on_tick()
+
+    def test_expiry(self):
+        fired = []
+        self.wheel.create_timer(0.25, lambda: fired.append(1))
+        self.wheel.create_timer(0.05, lambda: fired.append(2))
+        # a single driver timer, for the next tick
+        self.assertEqual(1, len(self.drivers))
+        self.assertAlmostEqual(0.1, self.drivers[0][0])
+
+        self.advance(0.1)
+        self.assertEqual([2], fired)
+        self.advance(0.2)
+        self.assertEqual([2, 1], fired)
+        self.assertEqual(0, len(self.wheel))
+
+        # nothing pending, so the driver is not rescheduled
+        self.assertEqual(2, len(self.drivers))
+
+    def test_cancel(self):
+        fired = []
+        timer = self.wheel.create_timer(0.05, lambda: fired.append(1))
+        self.assertEqual(1, len(self.wheel))
+        timer.cancel()
+        self.assertEqual(0, len(self.wheel))
+        self.advance(0.1)
+        self.assertFalse(fired)
+
+    def test_multiple_rounds(self):
+        fired = []
+        # longer than a turn of the wheel (0.8s), hashes into the same bucket as 0.15s
+        self.wheel.create_timer(0.95, lambda: fired.append(1))
+        self.wheel.create_timer(0.15, lambda: fired.append(2))
+        self.advance(0.2)
+        self.assertEqual([2], fired)
+        self.advance(0.5)
+        self.assertEqual([2], fired)
+        self.advance(0.3)
+        self.assertEqual([2, 1], fired)
+
+    def test_late_tick(self):
+        fired = []
+        for timeout in (0.1, 0.5, 1.5):
+            self.wheel.create_timer(timeout, lambda t=timeout: fired.append(t))
+        # the driver ran more than a turn late
+        self.advance(2.0)
+        self.assertEqual([0.1, 0.5, 1.5], sorted(fired))
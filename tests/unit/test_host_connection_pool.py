@@ -0,0 +1,330 @@
+# Copyright 2016 DataStax, Inc.
+#
+# Licensed under the DataStax DSE Driver License;
+# you may not use this file except in compliance with the License.
+#
+# You may obtain a copy of the License at
+#
+# http://www.datastax.com/terms/datastax-dse-driver-license-terms
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest # noqa
+
+from mock import Mock, NonCallableMagicMock, patch
+from threading import RLock
+
+from dse.cluster import Cluster, Session
+from dse.connection import Connection, ConnectionException
+from dse.hosts import Host, HostConnection, NoConnectionsAvailable
+from dse.policies import HostDistance, SimpleConvictionPolicy
+
+
+class HostConnectionPoolTests(unittest.TestCase):
+
+    def make_session(self, core=1, max_conns=8, min_reqs=64, max_reqs=1024):
+        session = NonCallableMagicMock(spec=Session, keyspace='foobarkeyspace')
+        session.cluster.connect_to_remote_hosts = True
+        session.cluster.get_core_connections_per_host.return_value = core
+        session.cluster.get_max_connections_per_host.return_value = max_conns
+        session.cluster.get_min_requests_per_connection.return_value = min_reqs
+        session.cluster.get_max_requests_per_connection.return_value = max_reqs
+        session.cluster.signal_connection_failure.return_value = False
+        return session
+
+    def make_connection(self, in_flight=0):
+        conn = NonCallableMagicMock(spec=Connection, in_flight=in_flight, is_defunct=False, is_closed=False,
+                                    max_request_id=100, signaled_error=False)
+        conn.lock = RLock()
+        if in_flight > conn.max_request_id:
+            conn.get_request_id.return_value = None
+        return conn
+
+    def make_host(self):
+        return Host('ip1', SimpleConvictionPolicy)
+
+    def test_opens_core_connections(self):
+        host = self.make_host()
+        session = self.make_session(core=3)
+        conns = [self.make_connection() for _ in range(3)]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        self.assertEqual(3, session.cluster.connection_factory.call_count)
+        self.assertEqual(conns, pool.get_connections())
+        for conn in conns:
+            conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
+        self.assertEqual(3, pool.open_count)
+        self.assertEqual([0, 0, 0], pool.get_state()['in_flights'])
+
+    def test_borrow_least_busy(self):
+        host = self.make_host()
+        session = self.make_session(core=3)
+        conns = [self.make_connection(in_flight=n) for n in (5, 2, 7)]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        c, request_id = pool.borrow_connection(timeout=0.01)
+        self.assertIs(conns[1], c)
+        c.get_request_id.assert_called_once_with()
+        self.assertEqual(c.get_request_id.return_value, request_id)
+
+    def test_borrow_all_saturated(self):
+        host = self.make_host()
+        session = self.make_session(core=2, max_conns=2)
+        conns = [self.make_connection(in_flight=101) for _ in range(2)]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        self.assertRaises(NoConnectionsAvailable, pool.borrow_connection, 0.01)
+
+    def test_borrow_waits_for_request_id(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=1)
+        conn = self.make_connection(in_flight=101)
+        session.cluster.connection_factory.return_value = conn
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        condition = pool._stream_available_condition
+
+        def wait(timeout):
+            self.assertEqual(1, pool._waiters)
+            conn.in_flight = 100
+            conn.get_request_id.return_value = 100
+            pool.return_connection(conn)
+
+        with patch.object(condition, 'notify') as notify, patch.object(condition, 'wait', side_effect=wait):
+            # returns only signal when a borrower is waiting
+            pool.return_connection(conn)
+            notify.assert_not_called()
+
+            self.assertEqual((conn, 100), pool.borrow_connection(timeout=1.0))
+            notify.assert_called_once_with()
+        self.assertEqual(0, pool._waiters)
+
+    def test_enqueue_drained_on_return(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=1)
+        conn = self.make_connection(in_flight=101)
+        session.cluster.connection_factory.return_value = conn
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        callbacks = [Mock(), Mock()]
+        for callback in callbacks:
+            pool.enqueue_borrow(callback, 2, 1.0)
+        self.assertEqual(2, pool.pending_count)
+        self.assertEqual(2, pool.get_state()['pending_requests'])
+        self.assertRaises(NoConnectionsAvailable, pool.enqueue_borrow, Mock(), 2, 1.0)
+        for callback in callbacks:
+            callback.assert_not_called()
+
+        # a freed request ID goes to the oldest queued request
+        conn.in_flight = 100
+        conn.get_request_id.side_effect = [100, None]
+        pool.return_connection(conn)
+        callbacks[0].assert_called_once_with(conn, 100)
+        callbacks[1].assert_not_called()
+        self.assertEqual(1, pool.pending_count)
+        timer = session.cluster._create_request_timer.return_value
+        timer.cancel.assert_called_once_with()
+
+    def test_enqueue_timeout(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=1)
+        conn = self.make_connection(in_flight=101)
+        session.cluster.connection_factory.return_value = conn
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        callback = Mock()
+        pool.enqueue_borrow(callback, 1, 0.5)
+        # scheduled like other request timers, on the timing wheel if enabled
+        timeout, expire = session.cluster._create_request_timer.call_args[0]
+        self.assertEqual(0.5, timeout)
+        session.cluster.connection_class.create_timer.assert_not_called()
+
+        expire()
+        self.assertEqual(0, pool.pending_count)
+        conn_arg, exc = callback.call_args[0]
+        self.assertIsNone(conn_arg)
+        self.assertIsInstance(exc, NoConnectionsAvailable)
+
+        # expiry after the request was sent is a no-op
+        expire()
+        self.assertEqual(1, callback.call_count)
+
+    def test_shutdown_errors_pending(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=1)
+        session.cluster.connection_factory.return_value = self.make_connection(in_flight=101)
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        callback = Mock()
+        pool.enqueue_borrow(callback, 1, 1.0)
+        pool.shutdown()
+        self.assertIsNone(callback.call_args[0][0])
+        self.assertIsInstance(callback.call_args[0][1], ConnectionException)
+        self.assertRaises(ConnectionException, pool.enqueue_borrow, Mock(), 1, 1.0)
+
+    def test_spawn_when_busy(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=2, max_reqs=10)
+        conn = self.make_connection(in_flight=10)
+        session.cluster.connection_factory.return_value = conn
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        pool.borrow_connection(timeout=0.01)
+        session.submit.assert_called_once_with(pool._create_new_connection)
+
+        # further borrows do not schedule more than max connections
+        pool.borrow_connection(timeout=0.01)
+        session.submit.assert_called_once_with(pool._create_new_connection)
+
+        new_conn = self.make_connection()
+        session.cluster.connection_factory.return_value = new_conn
+        pool._create_new_connection()
+        self.assertEqual([conn, new_conn], pool.get_connections())
+        new_conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
+
+        c, _ = pool.borrow_connection(timeout=0.01)
+        self.assertIs(new_conn, c)
+
+    def test_trash_when_idle(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=2, min_reqs=2)
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        pool._create_new_connection()
+        self.assertEqual(2, len(pool.get_connections()))
+
+        # connections are not trashed immediately after the pool grows
+        c, _ = pool.borrow_connection(timeout=0.01)
+        pool.return_connection(c)
+        self.assertEqual(2, len(pool.get_connections()))
+
+        pool._next_trash_allowed_at = 0
+        c, _ = pool.borrow_connection(timeout=0.01)
+        other = conns[1] if c is conns[0] else conns[0]
+        other.in_flight = 1
+        pool.return_connection(c)
+        self.assertEqual([other], pool.get_connections())
+        c.close.assert_called_once_with()
+        other.close.assert_not_called()
+
+    def test_trashed_connection_closed_when_drained(self):
+        host = self.make_host()
+        session = self.make_session(core=1, max_conns=2, min_reqs=2)
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        pool._create_new_connection()
+        conn = conns[1]
+        conn.in_flight = 2
+        pool._maybe_trash_connection(conn)
+        self.assertEqual([conns[0]], pool.get_connections())
+        conn.close.assert_not_called()
+
+        # connections free request IDs before returning themselves to the pool
+        conn.in_flight = 1
+        pool.return_connection(conn)
+        conn.close.assert_not_called()
+        conn.in_flight = 0
+        pool.return_connection(conn)
+        conn.close.assert_called_once_with()
+
+    def test_replace_defunct(self):
+        host = self.make_host()
+        session = self.make_session(core=2)
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        c, _ = pool.borrow_connection(timeout=0.01)
+        c.is_defunct = True
+        pool.return_connection(c)
+        session.cluster.signal_connection_failure.assert_called_once_with(host, c.last_error, is_host_addition=False)
+        self.assertTrue(c.signaled_error)
+        self.assertNotIn(c, pool.get_connections())
+        c.close.assert_called_once_with()
+        session.submit.assert_called_once_with(pool._retrying_replace)
+
+        new_conn = self.make_connection()
+        session.cluster.connection_factory.side_effect = None
+        session.cluster.connection_factory.return_value = new_conn
+        pool._retrying_replace()
+        self.assertIn(new_conn, pool.get_connections())
+        self.assertEqual(2, len(pool.get_connections()))
+        self.assertEqual(0, pool._scheduled_for_creation)
+
+    def test_host_down_shuts_pool(self):
+        host = self.make_host()
+        session = self.make_session(core=2)
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+        session.cluster.signal_connection_failure.return_value = True
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        c, _ = pool.borrow_connection(timeout=0.01)
+        c.is_defunct = True
+        pool.return_connection(c)
+        self.assertTrue(pool.is_shutdown)
+        for conn in conns:
+            conn.close.assert_called_once_with()
+
+    def test_ensure_core_connections(self):
+        host = self.make_host()
+        session = self.make_session(core=1)
+        session.cluster.connection_factory.return_value = self.make_connection()
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        session.cluster.get_core_connections_per_host.return_value = 3
+        pool.ensure_core_connections()
+        self.assertEqual(2, session.submit.call_count)
+        pool.ensure_core_connections()
+        self.assertEqual(2, session.submit.call_count)
+
+    def test_set_keyspace_for_all_conns(self):
+        host = self.make_host()
+        session = self.make_session(core=2)
+        conns = [self.make_connection(), self.make_connection()]
+        session.cluster.connection_factory.side_effect = conns
+
+        pool = HostConnection(host, HostDistance.LOCAL, session)
+        callback = Mock()
+        pool._set_keyspace_for_all_conns('newks', callback)
+        self.assertEqual('newks', pool._keyspace)
+        for conn in conns:
+            conn.set_keyspace_async.assert_called_once_with('newks', conn.set_keyspace_async.call_args[0][1])
+
+        conns[0].set_keyspace_async.call_args[0][1](conns[0], None)
+        callback.assert_not_called()
+        error = Exception()
+        conns[1].set_keyspace_async.call_args[0][1](conns[1], error)
+        callback.assert_called_once_with(pool, [error])
+
+
+class ClusterPoolSettingsTests(unittest.TestCase):
+
+    def test_defaults(self):
+        cluster = Cluster()
+        self.assertEqual(1, cluster.get_core_connections_per_host(HostDistance.LOCAL))
+        self.assertEqual(8, cluster.get_max_connections_per_host(HostDistance.LOCAL))
+        self.assertEqual(1, cluster.get_core_connections_per_host(HostDistance.REMOTE))
+        self.assertEqual(2, cluster.get_max_connections_per_host(HostDistance.REMOTE))
+
+    def test_settings_per_instance(self):
+        cluster = Cluster()
+        cluster.set_max_connections_per_host(HostDistance.LOCAL, 4)
+        cluster.set_core_connections_per_host(HostDistance.LOCAL, 4)
+        self.assertEqual(4, cluster.get_core_connections_per_host(HostDistance.LOCAL))
+        self.assertEqual(1, Cluster().get_core_connections_per_host(HostDistance.LOCAL))
+
+    def test_invalid_settings(self):
+        cluster = Cluster()
+        self.assertRaises(ValueError, cluster.set_core_connections_per_host, HostDistance.LOCAL, 9)
+        self.assertRaises(ValueError, cluster.set_max_connections_per_host, HostDistance.LOCAL, 0)
+        self.assertRaises(ValueError, cluster.set_min_requests_per_connection, HostDistance.LOCAL, 2000)
+        self.assertRaises(ValueError, cluster.set_max_requests_per_connection, HostDistance.LOCAL, 10)
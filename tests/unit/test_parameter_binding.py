@@ -131,6 +131,15 @@ class BoundStatementTestV3(unittest.TestCase):
         bound_statement = BoundStatement(prepared_statement=prepared_statement)
         self.assertEqual(1234, bound_statement.fetch_size)
 
+    def test_inherit_column_projection(self):
+        prepared_statement = PreparedStatement(column_metadata=[], query_id=None, routing_key_indexes=[],
+                                               query=None, keyspace='keyspace1',
+                                               protocol_version=self.protocol_version, result_metadata=None)
+        prepared_statement.column_projection = ['foo1']
+        self.assertEqual(['foo1'], BoundStatement(prepared_statement=prepared_statement).column_projection)
+        self.assertEqual(['foo2'], BoundStatement(prepared_statement=prepared_statement,
+                                                  column_projection=['foo2']).column_projection)
+
     def test_too_few_parameters_for_routing_key(self):
         self.assertRaises(ValueError, self.prepared.bind, (1,))
 
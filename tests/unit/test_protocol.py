@@ -4,11 +4,14 @@ except ImportError:
     import unittest # noqa
 
 from mock import Mock
-
-from dse import ProtocolVersion
-from dse.protocol import (PrepareMessage, QueryMessage, ExecuteMessage, UnsupportedOperation,
-    _PAGING_OPTIONS_FLAG, _WITH_SERIAL_CONSISTENCY_FLAG, _PAGE_SIZE_FLAG, _WITH_PAGING_STATE_FLAG)
-from dse.marshal import uint32_unpack
+import struct
+
+from dse import DriverException, ProtocolVersion
+from dse.cqltypes import Int32Type, UTF8Type
+from dse.protocol import (PrepareMessage, QueryMessage, ExecuteMessage, UnsupportedOperation, _ProtocolHandler,
+    _PAGING_OPTIONS_FLAG, _WITH_SERIAL_CONSISTENCY_FLAG, _PAGE_SIZE_FLAG, _WITH_PAGING_STATE_FLAG,
+    COMPRESSED_FLAG, CUSTOM_PAYLOAD_FLAG, TRACING_FLAG, ColumnMetadata, ResultMessage, RESULT_KIND_ROWS)
+from dse.marshal import int32_unpack, uint32_unpack, header_unpack
 from dse.cluster import ContinuousPagingOptions
 
 
@@ -128,4 +131,43 @@ class MessageTest(unittest.TestCase):
                 # self.assertEqual(uint32_unpack(io.write.mock_calls[2][1][0]) & _WITH_SERIAL_CONSISTENCY_FLAG, 1)
             else:
                 self.assertEqual(len(io.write.mock_calls), 2)
-            io.reset_mock()
\ No newline at end of file
+            io.reset_mock()
+
+    def test_encode_message(self):
+        """
+        Test the frame header is written ahead of the body, with the body length
+        """
+        message = QueryMessage("SELECT * FROM t", 1)
+        message.tracing = True
+        message.custom_payload = {'k': b'v'}
+        frame = _ProtocolHandler.encode_message(message, 3, 4, None, False)
+
+        version, flags, stream_id, opcode = header_unpack(frame[:5])
+        self.assertEqual((version, stream_id, opcode), (4, 3, QueryMessage.opcode))
+        self.assertEqual(flags, TRACING_FLAG | CUSTOM_PAYLOAD_FLAG)
+        self.assertEqual(int32_unpack(frame[5:9]), len(frame) - 9)
+
+        body = frame[9:]
+        compressor = Mock(return_value=b'compressed')
+        frame = _ProtocolHandler.encode_message(message, 3, 4, compressor, False)
+        compressor.assert_called_once_with(body)
+        self.assertEqual(header_unpack(frame[:5])[1], TRACING_FLAG | CUSTOM_PAYLOAD_FLAG | COMPRESSED_FLAG)
+        self.assertEqual(frame[5:], b'\x00\x00\x00\x0acompressed')
+
+    def test_decode_column_projection(self):
+        """
+        Test the values of columns left out of a column projection are not decoded
+        """
+        result_metadata = [ColumnMetadata('ks', 'cf', 'k', Int32Type),
+                           ColumnMetadata('ks', 'cf', 'v', UTF8Type)]
+        body = struct.pack('>iiii', RESULT_KIND_ROWS, ResultMessage._NO_METADATA_FLAG, 2, 2)
+        # not valid utf-8
+        body += struct.pack('>iii', 4, 1, 1) + b'\xff'
+        body += struct.pack('>iii', 4, 2, -1)
+
+        msg = _ProtocolHandler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata,
+                                              column_projection=frozenset(['k', 'unknown']))
+        self.assertEqual(['k', 'v'], msg.column_names)
+        self.assertEqual([(1, None), (2, None)], msg.parsed_rows)
+        self.assertRaises(DriverException, _ProtocolHandler.decode_message,
+                          4, {}, 0, 0, ResultMessage.opcode, body, None, result_metadata)
@@ -14,7 +14,12 @@ except ImportError:
 
 import six
 
-from dse.query import BatchStatement, SimpleStatement
+from mock import patch
+
+from dse import query
+from dse.query import (BatchStatement, SimpleStatement, named_tuple_factory, dict_factory,
+                       ordered_dict_factory, tuple_factory)
+from dse.util import OrderedDict
 
 
 class BatchStatementTest(unittest.TestCase):
@@ -68,3 +73,44 @@ class BatchStatementTest(unittest.TestCase):
             batch.add_all(statements=['%s'] * n,
                           parameters=[(i,) for i in range(n)])
             self.assertEqual(len(batch), n)
+
+
+class RowFactoryTest(unittest.TestCase):
+
+    colnames = ('k', 'value', 'func(v)')
+    rows = [(1, u'a', None), (2, u'b', 3.0)]
+
+    def test_named_tuple_factory(self):
+        rows = named_tuple_factory(self.colnames, self.rows)
+        self.assertEqual(self.rows, rows)
+        self.assertEqual(u'b', rows[1].value)
+        self.assertEqual(3.0, rows[1].func_v)
+        self.assertEqual(('k', 'value', 'func_v'), rows[0]._fields)
+
+        # rows that are not tuples, e.g. from a lazy parser
+        rows = named_tuple_factory(self.colnames, (list(row) for row in self.rows))
+        self.assertEqual(self.rows, rows)
+
+        self.assertRaises(TypeError, named_tuple_factory, self.colnames, [(1, 2)])
+
+    def test_row_class_cache(self):
+        first = named_tuple_factory(self.colnames, self.rows)[0]
+        second = named_tuple_factory(list(self.colnames), self.rows)[0]
+        self.assertIs(type(first), type(second))
+        self.assertIsNot(type(first), type(named_tuple_factory(('k',), [(1,)])[0]))
+
+        with patch.object(query, '_row_class_cache', OrderedDict()), \
+                patch.object(query, '_row_class_cache_size', 2):
+            for name in ('a', 'b', 'a', 'c'):
+                named_tuple_factory((name,), [(1,)])
+            self.assertEqual([('a',), ('c',)], list(query._row_class_cache))
+
+    def test_dict_factories(self):
+        self.assertEqual([{'k': 1, 'value': u'a', 'func(v)': None}, {'k': 2, 'value': u'b', 'func(v)': 3.0}],
+                         dict_factory(self.colnames, self.rows))
+        self.assertEqual([{'k': 1, 'value': u'a', 'func(v)': None}],
+                         dict_factory(self.colnames, [list(self.rows[0])]))
+        rows = ordered_dict_factory(self.colnames, self.rows)
+        self.assertIsInstance(rows[0], OrderedDict)
+        self.assertEqual(list(self.colnames), list(rows[1]))
+        self.assertEqual(self.rows, tuple_factory(self.colnames, self.rows))
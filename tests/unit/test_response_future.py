@@ -15,17 +15,18 @@ except ImportError:
 from mock import Mock, MagicMock, ANY
 
 from dse import ConsistencyLevel, Unavailable, SchemaTargetType, SchemaChangeType
-from dse.cluster import Session, ResponseFuture, NoHostAvailable
+from dse.cluster import Cluster, Session, ResponseFuture, NoHostAvailable
 from dse.connection import Connection, ConnectionException
 from dse.protocol import (ReadTimeoutErrorMessage, WriteTimeoutErrorMessage,
                                 UnavailableErrorMessage, ResultMessage, QueryMessage,
                                 OverloadedErrorMessage, IsBootstrappingErrorMessage,
                                 PreparedQueryNotFound, PrepareMessage,
-                                RESULT_KIND_ROWS, RESULT_KIND_SET_KEYSPACE,
+                                RESULT_KIND_ROWS, RESULT_KIND_SET_KEYSPACE, RESULT_KIND_PREPARED,
                                 RESULT_KIND_SCHEMA_CHANGE, ProtocolHandler)
-from dse.policies import RetryPolicy
-from dse.hosts import NoConnectionsAvailable
+from dse.policies import RetryPolicy, SimpleConvictionPolicy
+from dse.hosts import Host, NoConnectionsAvailable
 from dse.query import SimpleStatement
+from tests.unit.utils import mock_session_pools
 
 
 class ResponseFutureTests(unittest.TestCase):
@@ -33,6 +34,8 @@ class ResponseFutureTests(unittest.TestCase):
     def make_basic_session(self):
         s = Mock(spec=Session)
         s.cluster._default_row_factory = lambda col_names, rows: [(col_names, rows)]
+        s.cluster.max_pending_requests_per_host = 0
+        s.cluster.pending_request_timeout = 2.0
         return s
 
     def make_session(self):
@@ -71,6 +74,21 @@ class ResponseFutureTests(unittest.TestCase):
         result = rf.result()[0]
         self.assertEqual(result, expected_result)
 
+    def test_column_projection(self):
+        session = self.make_session()
+        pool = session._pools.get.return_value
+        connection = Mock(spec=Connection)
+        pool.borrow_connection.return_value = (connection, 1)
+
+        query = SimpleStatement("SELECT * FROM foo", column_projection=['a', 'b'])
+        message = QueryMessage(query=query, consistency_level=ConsistencyLevel.ONE)
+        rf = ResponseFuture(session, message, query, 1)
+        rf.send_request()
+
+        decoder = connection.send_msg.call_args[1]['decoder']
+        self.assertEqual(ProtocolHandler.decode_message, decoder.func)
+        self.assertEqual({'column_projection': frozenset(['a', 'b'])}, decoder.keywords)
+
     def test_unknown_result_class(self):
         session = self.make_session()
         pool = session._pools.get.return_value
@@ -329,6 +347,114 @@ class ResponseFutureTests(unittest.TestCase):
         # make sure the exception is recorded correctly
         self.assertEqual(rf._errors, {'ip1': exc})
 
+    def test_queued_when_connections_saturated(self):
+        session = self.make_session()
+        session.cluster.max_pending_requests_per_host = 10
+        pool = session._pools.get.return_value
+        pool.borrow_connection.side_effect = NoConnectionsAvailable()
+
+        rf = self.make_response_future(session)
+        rf.send_request()
+        pool.borrow_connection.assert_called_once_with(timeout=0)
+        send_queued, max_pending, timeout = pool.enqueue_borrow.call_args[0]
+        self.assertEqual((10, 2.0), (max_pending, timeout))
+        self.assertIsNone(rf._req_id)
+
+        connection = Mock(spec=Connection)
+        send_queued(connection, 3)
+        self.assertEqual(3, rf._req_id)
+        connection.send_msg.assert_called_once_with(
+            rf.message, 3, cb=ANY, encoder=ANY, decoder=ANY, result_metadata=ANY)
+
+        expected_result = (object(), object())
+        rf._set_result(None, None, None, self.make_mock_response(expected_result[0], expected_result[1]))
+        self.assertEqual(rf.result()[0], expected_result)
+
+    def test_queued_request_timeout_moves_to_next_host(self):
+        session = self.make_session()
+        session.cluster.max_pending_requests_per_host = 10
+        first_pool = Mock(is_shutdown=False)
+        first_pool.borrow_connection.side_effect = NoConnectionsAvailable()
+        second_pool = Mock(is_shutdown=False)
+        connection = Mock(spec=Connection)
+        second_pool.borrow_connection.return_value = (connection, 1)
+        session._pools.get.side_effect = [first_pool, second_pool]
+
+        rf = self.make_response_future(session)
+        rf.send_request()
+        second_pool.borrow_connection.assert_not_called()
+
+        exc = NoConnectionsAvailable()
+        send_queued = first_pool.enqueue_borrow.call_args[0][0]
+        send_queued(None, exc)
+        self.assertEqual(rf._errors, {'ip1': exc})
+        connection.send_msg.assert_called_once_with(
+            rf.message, 1, cb=ANY, encoder=ANY, decoder=ANY, result_metadata=ANY)
+
+    def test_queue_full_moves_to_next_host(self):
+        session = self.make_session()
+        session.cluster.max_pending_requests_per_host = 10
+        first_pool = Mock(is_shutdown=False)
+        first_pool.borrow_connection.side_effect = NoConnectionsAvailable()
+        exc = NoConnectionsAvailable()
+        first_pool.enqueue_borrow.side_effect = exc
+        second_pool = Mock(is_shutdown=False)
+        second_pool.borrow_connection.return_value = (Mock(spec=Connection), 1)
+        session._pools.get.side_effect = [first_pool, second_pool]
+
+        rf = self.make_response_future(session)
+        rf.send_request()
+        self.assertEqual(rf._errors, {'ip1': exc})
+        self.assertEqual(1, rf._req_id)
+
+    def test_queued_prepare_failure_reported_to_callback(self):
+        session = self.make_session()
+        session.cluster.max_pending_requests_per_host = 10
+        pool = session._pools.get.return_value
+        pool.borrow_connection.side_effect = NoConnectionsAvailable()
+
+        rf = self.make_response_future(session)
+        rf.send_request()
+        rf._req_id = 1
+        rf.send_request = Mock()
+        prepare_message = PrepareMessage(query="SELECT * FROM foo")
+
+        # the queued PREPARE expires
+        cb = Mock()
+        self.assertIsNotNone(rf._query('ip1', prepare_message, cb=cb))
+        send_queued = pool.enqueue_borrow.call_args[0][0]
+        send_queued(None, NoConnectionsAvailable())
+        self.assertIsInstance(cb.call_args[0][0], ConnectionException)
+        rf.send_request.assert_not_called()
+
+        # the queued PREPARE gets a connection but cannot be sent
+        cb = Mock()
+        rf._query('ip1', prepare_message, cb=cb)
+        send_queued = pool.enqueue_borrow.call_args[0][0]
+        connection = Mock(spec=Connection)
+        connection.send_msg.side_effect = ConnectionException("closed")
+        send_queued(connection, 2)
+        self.assertIsInstance(cb.call_args[0][0], ConnectionException)
+        rf.send_request.assert_not_called()
+
+        # a sent PREPARE does not take over the request id of the original request
+        cb = Mock()
+        rf._query('ip1', prepare_message, cb=cb)
+        send_queued = pool.enqueue_borrow.call_args[0][0]
+        connection = Mock(spec=Connection)
+        send_queued(connection, 3)
+        connection.send_msg.assert_called_once_with(
+            prepare_message, 3, cb=cb, encoder=ANY, decoder=ANY, result_metadata=ANY)
+        cb.assert_not_called()
+        self.assertEqual(1, rf._req_id)
+
+        # a request completed while waiting on the PREPARE is not sent again
+        rf._set_final_result(None)
+        rf._execute_after_prepare('ip1', None, None, ConnectionException("timed out"))
+        rf._execute_after_prepare('ip1', None, None, Mock(spec=ResultMessage, kind=RESULT_KIND_PREPARED))
+        rf.send_request.assert_not_called()
+        self.assertEqual(4, pool.borrow_connection.call_count)
+
     def test_callback(self):
         session = self.make_session()
         rf = self.make_response_future(session)
@@ -486,9 +612,87 @@ class ResponseFutureTests(unittest.TestCase):
 
         self.assertTrue(session.submit.call_args)
         args, kwargs = session.submit.call_args
-        self.assertEqual(rf._reprepare, args[-5])
-        self.assertIsInstance(args[-4], PrepareMessage)
-        self.assertEqual(args[-4].query, "SELECT * FROM foobar")
+        self.assertEqual(rf._reprepare, args[0])
+        self.assertEqual('a' * 16, args[1])
+        self.assertIsInstance(args[3], PrepareMessage)
+        self.assertEqual(args[3].query, "SELECT * FROM foobar")
+
+    @mock_session_pools
+    def test_prepared_query_not_found_single_flight(self):
+        cluster = Cluster(protocol_version=4, reprepare_timeout=3.0)
+        cluster._create_request_timer = Mock()
+        session = Session(cluster, [Host('127.0.0.1', SimpleConvictionPolicy)])
+        session.submit = Mock()
+
+        class Statement(object):
+            query_string = "SELECT * FROM foobar"
+            keyspace = None
+
+        prepared_statement = Statement()
+        query_id = 'a' * 16
+        cluster.add_prepared(query_id, prepared_statement)
+
+        def unprepared(host):
+            rf = ResponseFuture(session, QueryMessage(query="SELECT * FROM foobar", consistency_level=ConsistencyLevel.ONE),
+                                SimpleStatement("SELECT * FROM foobar"), 1)
+            rf._connection = Mock(keyspace=None)
+            rf._set_result(host, None, None, Mock(spec=PreparedQueryNotFound, info=query_id))
+            return rf
+
+        def submitted():
+            calls = [args for args, _ in session.submit.call_args_list]
+            session.submit.reset_mock()
+            return calls
+
+        # one PREPARE per host
+        futures = [unprepared(host) for host in ('ip1', 'ip1', 'ip1', 'ip2')]
+        reprepares = submitted()
+        self.assertEqual([futures[0]._reprepare, futures[3]._reprepare], [args[0] for args in reprepares])
+        self.assertEqual(['ip1', 'ip2'], [args[4] for args in reprepares])
+
+        # the PREPARE on ip1 is sent, and never answered
+        futures[0]._query = Mock(return_value=1)
+        futures[0]._reprepare(*reprepares[0][1:])
+        late_response = futures[0]._query.call_args[1]['cb']
+        timeout, expire = cluster._create_request_timer.call_args[0]
+        self.assertEqual(3.0, timeout)
+        futures.append(unprepared('ip1'))
+        self.assertFalse(submitted())
+
+        # once the wait times out, the waiting requests move on to the next host
+        expire()
+        calls = submitted()
+        self.assertEqual([(rf._execute_after_prepare, 'ip1', None, None) for rf in futures[:3] + futures[4:]],
+                         [args[:4] for args in calls])
+        for args in calls:
+            self.assertIsInstance(args[4], ConnectionException)
+        self.assertEqual({('ip2', query_id)}, set(session._pending_reprepares))
+
+        # later requests re-prepare again, unaffected by the late response
+        rf = unprepared('ip1')
+        args, = submitted()
+        self.assertEqual(rf._reprepare, args[0])
+        late_response(Mock(spec=ResultMessage, kind=RESULT_KIND_PREPARED))
+        self.assertFalse(submitted())
+        self.assertEqual({('ip1', query_id), ('ip2', query_id)}, set(session._pending_reprepares))
+
+        # an answered PREPARE re-executes its requests and cancels the timer
+        rf._query = Mock(return_value=1)
+        rf._reprepare(*args[1:])
+        timer = cluster._create_request_timer.return_value
+        timer.reset_mock()
+        response = Mock(spec=ResultMessage, kind=RESULT_KIND_PREPARED)
+        rf._query.call_args[1]['cb'](response)
+        self.assertEqual([(rf._execute_after_prepare, 'ip1', None, None, response)], submitted())
+        timer.cancel.assert_called_once_with()
+
+        # a PREPARE that cannot be sent also moves the waiting requests on
+        futures[3]._query = Mock(return_value=None)
+        futures[3]._reprepare(*reprepares[1][1:])
+        args, = submitted()
+        self.assertEqual((futures[3]._execute_after_prepare, 'ip2', None, None), args[:4])
+        self.assertIsInstance(args[4], ConnectionException)
+        self.assertFalse(session._pending_reprepares)
 
     def test_prepared_query_not_found_bad_keyspace(self):
         session = self.make_session()
@@ -15,7 +15,14 @@ except ImportError:
 
 from mock import Mock, PropertyMock
 
-from dse.cluster import ResultSet
+try:
+    import asyncio
+except ImportError:
+    asyncio = None  # NOQA
+
+from dse import DriverException
+from dse.cluster import ResultSet, _asyncio_result
+from tests.unit.cython.utils import numpytest
 
 
 class ResultSetTests(unittest.TestCase):
@@ -182,3 +189,129 @@ class ResultSetTests(unittest.TestCase):
         for applied in (True, False):
             rs = ResultSet(Mock(row_factory=row_factory), [{'[applied]': applied}])
             self.assertEqual(rs.was_applied, applied)
+
+
+class AsyncioResultSetTests(unittest.TestCase):
+
+    def setUp(self):
+        if asyncio is None:
+            raise unittest.SkipTest("asyncio is not available")
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def make_response_future(self, has_more_pages=False):
+        response_future = Mock(has_more_pages=has_more_pages, _continuous_paging_session=None)
+        response_future._event.is_set.return_value = False
+        return response_future
+
+    def collect(self, itr):
+        rows = []
+        while True:
+            try:
+                rows.append(self.loop.run_until_complete(itr.__anext__()))
+            except StopAsyncIteration:
+                return rows
+
+    def test_aiter_non_paged(self):
+        expected = list(range(10))
+        rs = ResultSet(self.make_response_future(), expected)
+        self.assertListEqual(self.collect(rs.__aiter__()), expected)
+
+    def test_aiter_paged(self):
+        expected = list(range(10))
+        response_future = self.make_response_future(has_more_pages=True)
+        rs = ResultSet(response_future, expected[:5])
+        itr = rs.__aiter__()
+        rows = [self.loop.run_until_complete(itr.__anext__()) for _ in range(5)]
+
+        future = itr.__anext__()
+        response_future.start_fetching_next_page.assert_called_once_with()
+        self.assertFalse(future.done())
+        response_future.has_more_pages = False
+        response_future.add_callbacks.call_args[0][0](expected[5:])
+        rows.append(self.loop.run_until_complete(future))
+
+        rows.extend(self.collect(itr))
+        self.assertListEqual(rows, expected)
+
+    def test_aiter_page_error(self):
+        response_future = self.make_response_future(has_more_pages=True)
+        rs = ResultSet(response_future, [])
+        future = rs.__aiter__().__anext__()
+        error = Exception()
+        response_future.add_callbacks.call_args[0][1](error)
+        with self.assertRaises(Exception) as cm:
+            self.loop.run_until_complete(future)
+        self.assertIs(error, cm.exception)
+
+    def test_asyncio_result(self):
+        response_future = self.make_response_future()
+        future = _asyncio_result(response_future)
+        response_future.add_callbacks.call_args[0][0]([1, 2])
+        rs = self.loop.run_until_complete(future)
+        self.assertIsInstance(rs, ResultSet)
+        self.assertListEqual(list(rs), [1, 2])
+
+        response_future = self.make_response_future()
+        future = _asyncio_result(response_future)
+        response_future.add_callbacks.call_args[0][1](ValueError())
+        self.assertRaises(ValueError, self.loop.run_until_complete, future)
+
+
+class AllColumnsTests(unittest.TestCase):
+
+    def paged_result_set(self, pages):
+        pages = list(pages)
+
+        class PagedResponseFuture(object):
+            _continuous_paging_session = None
+            _col_names = _col_types = None
+            message = Mock(fetch_size=2)
+
+            @property
+            def has_more_pages(self):
+                return bool(pages)
+
+            def start_fetching_next_page(self):
+                pass
+
+            def result(self):
+                return ResultSet(Mock(), pages.pop(0))
+
+        return ResultSet(PagedResponseFuture(), pages.pop(0))
+
+    def test_requires_columns(self):
+        rs = ResultSet(Mock(has_more_pages=False), [(1, 2)])
+        self.assertRaises(DriverException, rs.all_columns)
+        self.assertEqual({}, ResultSet(Mock(has_more_pages=False), []).all_columns())
+
+    @numpytest
+    def test_pages_concatenated(self):
+        import numpy as np
+
+        def page(keys, texts):
+            return {'k': np.ma.MaskedArray(np.array([k or 0 for k in keys], dtype='i4'),
+                                           mask=[k is None for k in keys]),
+                    't': np.array(texts, dtype='S')}
+
+        pages = [page([1, 2], [b'a', b'bb']), page([3, None], [b'ccc', b'']), page([5], [b'e'])]
+        columns = self.paged_result_set(pages).all_columns()
+
+        self.assertEqual(['k', 't'], list(columns))
+        self.assertEqual(5, len(columns['k']))
+        self.assertEqual([False, False, False, True, False], list(columns['k'].mask))
+        self.assertEqual([1, 2, 3, 5], list(columns['k'].compressed()))
+        self.assertEqual(np.dtype('S3'), columns['t'].dtype)
+        self.assertEqual([b'a', b'bb', b'ccc', b'', b'e'], list(columns['t']))
+
+    @numpytest
+    def test_object_columns(self):
+        import numpy as np
+
+        pages = [{'v': np.array([u'a', None], dtype='O')}, {'v': np.array([u'c'], dtype='O')}]
+        columns = self.paged_result_set(pages).all_columns(expected_rows=10)
+        self.assertEqual([u'a', None, u'c'], list(columns['v']))